@@ -8,8 +8,11 @@ import pandas as pd
 from datetime import datetime
 from typing import Optional
 from fyers_client import FyersClient
-from data_processor import calculate_pnl_summary
-from ui_components import render_live_indicator, render_pnl_card, render_styled_metric
+from async_fyers_client import get_async_client, gather_sync
+from data_processor import calculate_pnl_summary, mark_to_market
+from tick_feed import get_market_stream
+from ui_components import (NEUTRAL_CSS, render_live_indicator, render_pnl_card, render_styled_metric,
+                           render_styled_table, sign_rule)
 
 
 def render_account_page(client: Optional[FyersClient]):
@@ -27,11 +30,26 @@ def render_account_page(client: Optional[FyersClient]):
         if st.button("🔄 Refresh", type="primary", use_container_width=True):
             st.rerun()
     
-    # Fetch account data
+    # Fetch account data (all three endpoints concurrently)
     with st.spinner("Loading account data..."):
-        funds_data = client.fetch_funds()
-        holdings_data = client.fetch_holdings()
-        positions_data = client.fetch_positions()
+        aclient = get_async_client(client)
+        funds_data, holdings_data, positions_data = gather_sync(
+            aclient.fetch_funds(),
+            aclient.fetch_holdings(),
+            aclient.fetch_positions()
+        )
+    
+    # Revalue at streamed prices when the tick feed is live
+    stream = get_market_stream(client)
+    if stream is not None:
+        symbols = [h.get("symbol") for h in (holdings_data or {}).get("holdings", [])]
+        symbols += [p.get("symbol") for p in (positions_data or {}).get("netPositions", [])]
+        symbols = [s for s in dict.fromkeys(symbols) if s]
+        stream.feed.subscribe(symbols)
+        if stream.live:
+            holdings_data, positions_data = mark_to_market(
+                holdings_data, positions_data, stream.table.prices(symbols))
+            st.caption("⚡ P&L marked to streamed prices")
     
     # Calculate P&L
     pnl_summary = calculate_pnl_summary(holdings_data, positions_data)
@@ -130,20 +148,8 @@ def render_holdings_section(holdings_data: dict, holdings_pnl: float):
             if holdings_display:
                 df_h = pd.DataFrame(holdings_display)
                 
-                def color_pnl(val):
-                    try:
-                        v = float(val)
-                        if v > 0:
-                            return 'color: #00cc96; font-weight: bold'
-                        elif v < 0:
-                            return 'color: #ef553b; font-weight: bold'
-                        else:
-                            return 'color: white'
-                    except:
-                        return 'color: white'
-                
-                styled = df_h.style.applymap(color_pnl, subset=['P&L', 'P&L %'])
-                st.dataframe(styled, use_container_width=True, height=350)
+                pnl = sign_rule(zero=NEUTRAL_CSS)
+                render_styled_table(df_h, {'P&L': pnl, 'P&L %': pnl}, height=350)
                 st.success(f"✅ Total Holdings P&L: ₹{holdings_pnl:,.2f}")
             else:
                 st.info("No holdings data")
@@ -189,20 +195,8 @@ def render_positions_section(positions_data: dict, positions_pnl: float):
             if pos_display:
                 df_p = pd.DataFrame(pos_display)
                 
-                def color_pnl(val):
-                    try:
-                        v = float(val)
-                        if v > 0:
-                            return 'color: #00cc96; font-weight: bold'
-                        elif v < 0:
-                            return 'color: #ef553b; font-weight: bold'
-                        else:
-                            return 'color: white'
-                    except:
-                        return 'color: white'
-                
-                styled = df_p.style.applymap(color_pnl, subset=['P&L', 'P&L %'])
-                st.dataframe(styled, use_container_width=True, height=350)
+                pnl = sign_rule(zero=NEUTRAL_CSS)
+                render_styled_table(df_p, {'P&L': pnl, 'P&L %': pnl}, height=350)
                 st.success(f"✅ Total Positions P&L: ₹{positions_pnl:,.2f}")
             else:
                 st.info("No position data")
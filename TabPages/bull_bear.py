@@ -3,14 +3,20 @@ Bull/Bear Dashboard Page Module
 Handles sector analysis and bull/bear stock screening
 """
 
+import numpy as np
 import streamlit as st
 import pandas as pd
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 from fyers_client import FyersClient
-from config import SECTOR_INDICES, SCAN_SYMBOLS, AVAILABLE_SECTORS
-from data_processor import build_df_from_quotes, classify_row_advanced, apply_filters
-from ui_components import render_live_indicator
+from config import SECTOR_INDICES, AVAILABLE_SECTORS, SCANNER_MAX_AGE
+from data_processor import apply_filters, build_sector_df
+from market_snapshot import get_market_refresher
+from screener import get_screen_set
+from tick_feed import live_quotes
+from universe_scan import UniverseScanner, get_universe_scanner
+from ui_components import (NEGATIVE_CSS, POSITIVE_CSS, constant_rule, flag_rule, render_live_indicator,
+                           render_snapshot_age, render_styled_table, sign_rule)
 
 
 def render_sector_performance(client: FyersClient):
@@ -18,48 +24,23 @@ def render_sector_performance(client: FyersClient):
     st.subheader("📊 Live Sector Performance")
     
     try:
-        sector_symbols = list(SECTOR_INDICES.values())
-        resp = client.fetch_quotes(sector_symbols)
-        
-        sector_data = []
-        for item in resp.get("d", []):
-            v = item.get("v", {})
-            symbol = item.get("n", "")
-            
-            sector_name = None
-            for name, sym in SECTOR_INDICES.items():
-                if sym in symbol:
-                    sector_name = name
-                    break
-            
-            if sector_name:
-                ltp = float(v.get("lp") or v.get("ltp") or 0)
-                prev = float(v.get("prev_close_price", ltp) or ltp)
-                chg = ltp - prev
-                chg_pct = (chg / prev * 100) if prev > 0 else 0
-                
-                sector_data.append({
-                    'Sector': sector_name,
-                    'Last': round(ltp, 2),
-                    'Change': round(chg, 2),
-                    'Change %': round(chg_pct, 2),
-                    'Status': '🟢 Bullish' if chg_pct > 0.5 else '🔴 Bearish' if chg_pct < -0.5 else '⚪ Neutral'
-                })
+        streamed = live_quotes(client, list(SECTOR_INDICES.values()))
+        if streamed is not None:
+            df_sectors = build_sector_df(streamed)
+        else:
+            snapshot = get_market_refresher(client).wait_for(lambda s: s.version > 0)
+            if "quotes" in snapshot.errors:
+                st.error(f"Quotes fetch error: {snapshot.errors['quotes']}")
+            df_sectors = snapshot.sectors
         
-        if sector_data:
-            df_sectors = pd.DataFrame(sector_data)
-            df_sectors = df_sectors.sort_values('Change %', ascending=False)
-            
-            def color_sector(val):
-                try:
-                    v = float(val)
-                    color = '#00cc96' if v > 0 else '#ef553b' if v < 0 else 'white'
-                    return f'color: {color}; font-weight: bold'
-                except:
-                    return ''
+        if not df_sectors.empty:
+            if streamed is not None:
+                st.caption("⚡ Streaming sector prices")
+            else:
+                render_snapshot_age(snapshot)
             
-            styled = df_sectors.style.applymap(color_sector, subset=['Change', 'Change %'])
-            st.dataframe(styled, use_container_width=True, height=400)
+            change = sign_rule(zero='color: white; font-weight: bold')
+            render_styled_table(df_sectors, {'Change': change, 'Change %': change}, height=400)
     except Exception as e:
         st.error(f"Sector data error: {e}")
 
@@ -68,7 +49,7 @@ def render_stock_scanner(client: FyersClient):
     """Render stock scanner section"""
     st.subheader("🎯 Stock Analysis Scanner")
     
-    col_filter1, col_filter2 = st.columns([2, 2])
+    col_filter1, col_filter2, col_filter3 = st.columns([2, 2, 1])
     with col_filter1:
         sector_filter = st.multiselect(
             "🔍 Filter by Sector (Optional)",
@@ -79,44 +60,146 @@ def render_stock_scanner(client: FyersClient):
     with col_filter2:
         min_volume_ratio = st.slider("Min Volume Ratio", 1.0, 5.0, 2.0, 0.5)
     
+    with col_filter3:
+        scope = st.radio("Scope", ["Scan List", "F&O Universe"])
+    
     st.markdown("---")
     
+    if scope == "F&O Universe":
+        render_universe_scan(client, sector_filter, min_volume_ratio)
+        return
+    
     with st.spinner("🔍 Scanning for TODAY'S breakouts..."):
         try:
-            resp = client.fetch_quotes(SCAN_SYMBOLS)
-            df = build_df_from_quotes(resp, client)
+            # Scan results come from the shared snapshot (in-dashboard scanner or scanner.py)
+            refresher = get_market_refresher(client)
+            snapshot = refresher.wait_for(lambda s: s.scan is not None or not refresher.runs_scanner)
+            scan = snapshot.scan
+            if scan is None:
+                st.info("⏳ No scan results yet - the scanner is still warming up (or start `python scanner.py`)")
+                return
             
-            if not df.empty:
-                # Apply classification logic
-                df["daily_tag"] = df.apply(lambda r: classify_row_advanced(r), axis=1)
-                
-                # Apply filters
-                df = apply_filters(df, sector_filter, min_volume_ratio)
-                
-                # Show summary metrics
-                render_summary_metrics(df)
-                
-                st.markdown("---")
-                
-                # View selector
-                view_type = st.radio(
-                    "View",
-                    ["🟢 Bullish Breakouts", "🔴 Bearish Breakouts", "📊 Both"],
-                    horizontal=True
-                )
-                
-                if view_type == "🟢 Bullish Breakouts":
-                    render_bullish_stocks(df)
-                elif view_type == "🔴 Bearish Breakouts":
-                    render_bearish_stocks(df)
-                else:
-                    render_both_views(df)
-            else:
-                st.warning("No data available")
+            st.caption(f"📡 Scan v{scan.version} · {scan.age:.0f}s old · {scan.duration:.1f}s to run")
+            if scan.age > SCANNER_MAX_AGE:
+                st.warning(f"Scan results are stale ({scan.age:.0f}s old)")
+            if scan.error:
+                st.error(f"Last scan failed: {scan.error}")
+            render_scan_results(scan.df, sector_filter, min_volume_ratio)
         except Exception as e:
             st.error(f"Error: {e}")
 
 
+def render_universe_scan(client: FyersClient, sector_filter: List[str], min_volume_ratio: float):
+    """Start universe scans and show the latest one; a running scan is polled by a fragment"""
+    scanner = get_universe_scanner(client)
+    
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        workers = f"{scanner.workers} worker process{'es' if scanner.workers > 1 else ''}"
+        st.caption(f"Scans every F&O stock, sharded across {workers}")
+    with col2:
+        if st.button("🚀 Scan Universe", disabled=scanner.running, use_container_width=True):
+            scanner.start()
+    
+    st.fragment(run_every=1 if scanner.running else None)(render_universe_results)(
+        scanner, sector_filter, min_volume_ratio)
+
+
+def render_universe_results(scanner: UniverseScanner, sector_filter: List[str], min_volume_ratio: float):
+    """Progress of a running universe scan, then the latest result and its shard timings"""
+    if scanner.running:
+        fetched, done, total = scanner.progress
+        st.progress((fetched + done) / (2 * total) if total else 0.0,
+                    text=f"Scanning the F&O universe... fetched {fetched}/{total} shards, scanned {done}/{total}")
+        st.session_state["universe_scan_polling"] = True
+    elif st.session_state.pop("universe_scan_polling", False):
+        st.rerun()  # Scan finished: rerun the page so the fragment stops polling
+    
+    if scanner.error:
+        st.error(f"Last universe scan failed: {scanner.error}")
+    result = scanner.result
+    if result is None:
+        if not scanner.running:
+            st.info("Press **Scan Universe** to scan every F&O stock")
+        return
+    
+    st.caption(f"🌐 {len(result.df)} symbols · {result.age:.0f}s old · {result.duration:.1f}s to run · "
+               f"{result.cpu_seconds:.1f}s of worker time")
+    if result.errors:
+        with st.expander(f"⚠️ {len(result.errors)} fetch errors"):
+            for key, message in result.errors.items():
+                st.write(f"{key}: {message}")
+    with st.expander("⏱️ Shard Timings"):
+        st.dataframe(result.timings_df(), hide_index=True, use_container_width=True)
+    render_scan_results(result.df, sector_filter, min_volume_ratio)
+
+
+def render_scan_results(df: pd.DataFrame, sector_filter: List[str], min_volume_ratio: float):
+    """Filtered summary metrics and breakout tables for a scan frame"""
+    if df.empty:
+        st.warning("No data available")
+        return
+    
+    # Apply filters
+    df = apply_filters(df, sector_filter, min_volume_ratio)
+    
+    # Show summary metrics
+    render_summary_metrics(df)
+    
+    st.markdown("---")
+    
+    # View selector
+    view_type = st.radio(
+        "View",
+        ["🟢 Bullish Breakouts", "🔴 Bearish Breakouts", "📊 Both", "🧪 Screens"],
+        horizontal=True
+    )
+    
+    if view_type == "🟢 Bullish Breakouts":
+        render_bullish_stocks(df)
+    elif view_type == "🔴 Bearish Breakouts":
+        render_bearish_stocks(df)
+    elif view_type == "📊 Both":
+        render_both_views(df)
+    else:
+        render_screen_matches(df)
+
+
+def render_screen_matches(df: pd.DataFrame):
+    """Match counts for every configured screen and the stocks matching all selected ones"""
+    screen_set = get_screen_set()
+    screens = [name for name in screen_set.screens if name in df.columns]
+    if not screens:
+        st.info("These scan results have no screen tags yet")
+        return
+    
+    matches = df[screens].to_numpy(dtype=bool)
+    counts = pd.DataFrame({
+        "Screen": screens,
+        "Matches": matches.sum(axis=0),
+        "Rule": [screen_set.expressions[name] for name in screens],
+    })
+    st.dataframe(counts, hide_index=True, use_container_width=True)
+    
+    selected = st.multiselect("Stocks matching all of", screens, default=screens[:1])
+    if not selected:
+        return
+    
+    hits = df[df[selected].all(axis=1)].copy()
+    if hits.empty:
+        st.info("No stocks match every selected screen")
+        return
+    
+    names = np.array(screens)
+    hits['Price Chg %'] = ((hits["current_close"] - hits["prev_close"]) / hits["prev_close"] * 100).round(2)
+    hits['Screens'] = [", ".join(names[row]) for row in hits[screens].to_numpy(dtype=bool)]
+    hits_display = hits[["symbol", "name", "sector", "current_close", "Price Chg %", "Screens"]]
+    hits_display.columns = ["Symbol", "Name", "Sector", "LTP", "Price Chg %", "Screens"]
+    
+    st.success(f"✅ {len(hits)} stocks match {', '.join(selected)}")
+    render_styled_table(hits_display, {'Price Chg %': sign_rule()}, height=450)
+
+
 def render_summary_metrics(df: pd.DataFrame):
     """Render summary metrics"""
     st.subheader("📊 Today's Breakout Stocks")
@@ -154,17 +237,9 @@ def render_bullish_stocks(df: pd.DataFrame):
         
         st.success(f"✅ {len(bulls)} Fresh BULLISH Breakouts Today")
         
-        def color_bull(val):
-            try:
-                if isinstance(val, bool):
-                    return 'color: #00cc96; font-weight: bold' if val else ''
-                v = float(val)
-                return 'color: #00cc96; font-weight: bold' if v > 0 else ''
-            except:
-                return ''
-        
-        styled = bulls_display.style.applymap(color_bull, subset=['Price Chg %', 'Vol (x Avg)', 'OI Chg %', 'Breakout'])
-        st.dataframe(styled, use_container_width=True, height=500)
+        gain = sign_rule(negative='')
+        render_styled_table(bulls_display, {'Price Chg %': gain, 'Vol (x Avg)': gain, 'OI Chg %': gain,
+                                            'Breakout': flag_rule(POSITIVE_CSS)}, height=500)
         
         # Export option
         csv = bulls_display.to_csv(index=False)
@@ -198,17 +273,9 @@ def render_bearish_stocks(df: pd.DataFrame):
         
         st.error(f"⚠️ {len(bears)} Fresh BEARISH Breakdowns Today")
         
-        def color_bear(val):
-            try:
-                if isinstance(val, bool):
-                    return 'color: #ef553b; font-weight: bold' if val else ''
-                v = float(val)
-                return 'color: #ef553b; font-weight: bold' if v < 0 else ''
-            except:
-                return ''
-        
-        styled = bears_display.style.applymap(color_bear, subset=['Price Chg %', 'Vol (x Avg)', 'OI Chg %', 'Breakdown'])
-        st.dataframe(styled, use_container_width=True, height=500)
+        loss = sign_rule(positive='')
+        render_styled_table(bears_display, {'Price Chg %': loss, 'Vol (x Avg)': loss, 'OI Chg %': loss,
+                                            'Breakdown': flag_rule(NEGATIVE_CSS)}, height=500)
         
         # Export option
         csv = bears_display.to_csv(index=False)
@@ -242,11 +309,8 @@ def render_both_views(df: pd.DataFrame):
             
             st.success(f"✅ {len(bulls)} stocks")
             
-            def color_pos(val):
-                return 'color: #00cc96; font-weight: bold'
-            
-            styled = bulls_display.style.applymap(color_pos, subset=['Chg %', 'Vol x'])
-            st.dataframe(styled, use_container_width=True, height=450)
+            green = constant_rule(POSITIVE_CSS)
+            render_styled_table(bulls_display, {'Chg %': green, 'Vol x': green}, height=450)
         else:
             st.info("No bullish breakouts today")
     
@@ -263,11 +327,8 @@ def render_both_views(df: pd.DataFrame):
             
             st.error(f"⚠️ {len(bears)} stocks")
             
-            def color_neg(val):
-                return 'color: #ef553b; font-weight: bold'
-            
-            styled = bears_display.style.applymap(color_neg, subset=['Chg %', 'Vol x'])
-            st.dataframe(styled, use_container_width=True, height=450)
+            red = constant_rule(NEGATIVE_CSS)
+            render_styled_table(bears_display, {'Chg %': red, 'Vol x': red}, height=450)
         else:
             st.info("No bearish breakouts today")
     
@@ -289,6 +350,9 @@ def render_bull_bear_page(client: Optional[FyersClient]):
         st.caption("Only showing TODAY'S fresh breakouts based on: Price vs Weekly High/Low + 2x Volume + 10% OI Change")
     with col2:
         if st.button("🔄 Scan Now", type="primary", use_container_width=True):
+            if client:
+                with st.spinner("🔍 Scanning..."):
+                    get_market_refresher(client).refresh_now()
             st.rerun()
     
     st.markdown("---")
@@ -4,12 +4,22 @@ Handles option chain data display and analysis
 """
 
 import streamlit as st
+import numpy as np
 import pandas as pd
 from datetime import datetime
 from typing import Optional
 from fyers_client import FyersClient
-from utils import get_expiry_dates
-from ui_components import render_live_indicator
+from chain_analytics import ChainAnalytics, chain_analytics
+from data_processor import build_term_structure_df
+from market_snapshot import get_market_refresher
+from oi_recorder import get_oi_recorder
+from option_chain_data import OptionChain
+from option_greeks import atm_iv
+from utils import expiry_date
+from ui_components import render_live_indicator, render_snapshot_age
+
+OPTION_INDICES = ["NIFTY50", "BANKNIFTY", "FINNIFTY"]
+TERM_EXPIRIES = 4
 
 
 def render_option_chain_page(client: Optional[FyersClient]):
@@ -20,20 +30,29 @@ def render_option_chain_page(client: Optional[FyersClient]):
         st.warning("🔌 Connect to Fyers API to view option chain")
         return
     
+    view = st.radio("View", ["Single Chain", "Term Structure"], horizontal=True)
+    if view == "Term Structure":
+        render_term_structure(client)
+        return
+    
     # Controls
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        symbol = st.selectbox("Index", ["NIFTY50", "BANKNIFTY", "FINNIFTY"])
+        symbol = st.selectbox("Index", OPTION_INDICES)
         st.session_state['selected_option_symbol'] = symbol
     
-    with col2:
-        expiries = get_expiry_dates(4)
-        expiry = st.selectbox("Expiry", expiries)
-    
     with col3:
         strike_count = st.selectbox("Strikes", [10, 20, 30, 40, 50], index=2)
     
+    with col2:
+        # The nearest chain lists the underlying's live expiries
+        refresher = get_market_refresher(client)
+        nearest = refresher.track_option_chain(symbol, "", strike_count)
+        nearest_chain = refresher.wait_for(lambda s: s.covers([nearest])).option_chains.get(nearest)
+        expiries = nearest_chain.expiries if nearest_chain is not None else []
+        expiry = st.selectbox("Expiry", expiries, format_func=expiry_date)
+    
     with col4:
         if st.button("🔄 Fetch Chain", type="primary", use_container_width=True):
             st.rerun()
@@ -43,137 +62,161 @@ def render_option_chain_page(client: Optional[FyersClient]):
     # Fetch and display option chain
     with st.spinner("Loading option chain..."):
         try:
-            option_data = client.fetch_option_chain(symbol, expiry, strike_count)
+            # Chains are fetched and parsed once per refresh by the shared refresher
+            key = nearest
+            if expiries and expiry != expiries[0]:
+                key = refresher.track_option_chain(symbol, expiry, strike_count)
+            snapshot = refresher.wait_for(lambda s: s.covers([key]))
+            chain = snapshot.option_chains.get(key)
             
-            if option_data.get("s") == "ok":
-                chain_data = option_data.get("data", {})
-                options = chain_data.get("optionsChain", [])
-                
-                if options:
+            if chain is not None:
+                if chain.size:
                     render_live_indicator()
+                    render_snapshot_age(snapshot)
                     
-                    # Parse option data
-                    calls, puts = parse_option_data(options, strike_count)
+                    calls, puts = build_chain_tables(chain, strike_count)
                     
                     # Display call and put tables
                     col_call, col_put = st.columns(2)
                     
                     with col_call:
                         st.markdown("### 📞 CALL Options")
-                        df_calls = pd.DataFrame(calls)
-                        st.dataframe(df_calls, use_container_width=True, height=600)
+                        st.dataframe(calls, use_container_width=True, height=600)
                     
                     with col_put:
                         st.markdown("### 📉 PUT Options")
-                        df_puts = pd.DataFrame(puts)
-                        st.dataframe(df_puts, use_container_width=True, height=600)
+                        st.dataframe(puts, use_container_width=True, height=600)
                     
                     # Display summary
-                    render_option_summary(calls, puts)
+                    render_option_summary(chain_analytics(chain), atm_iv(chain))
+                    render_oi_history(symbol, chain.expiry)
                 else:
                     st.warning("No option chain data available")
             else:
-                st.error(f"❌ API Error: {option_data.get('message', 'Unknown error')}")
+                st.error(f"❌ API Error: {snapshot.errors.get(key, 'Option chain not loaded yet')}")
         except Exception as e:
             st.error(f"Error: {e}")
 
 
-def parse_option_data(options: list, strike_count: int) -> tuple:
-    """Parse option chain data into calls and puts"""
-    # Create a mapping strike -> {'call': {...}, 'put': {...}}
-    strikes_map = {}
+def render_oi_history(symbol: str, expiry: str):
+    """Render CE/PE OI change near spot from the recorded intraday OI history"""
+    st.markdown("---")
+    st.subheader("⏱️ Intraday OI Change (±2% of spot)")
+    minutes = st.selectbox("Window (minutes)", [5, 15, 30, 60, 120], index=2)
+    
+    df = get_oi_recorder().oi_change(symbol, expiry, minutes=minutes, pct=0.02)
+    if df.empty:
+        st.info("OI history builds up while this chain is open (one snapshot per minute)")
+        return
+    
+    since = datetime.fromtimestamp(df.attrs["since"]).strftime("%H:%M")
+    until = datetime.fromtimestamp(df.attrs["until"]).strftime("%H:%M")
+    st.caption(f"Change from {since} to {until}")
+    st.dataframe(df, use_container_width=True, hide_index=True)
 
-    for opt in options:
-        strike = opt.get("strike_price")
-        # Skip entries which are underlying or invalid
-        if strike is None or (isinstance(strike, (int, float)) and strike <= 0):
-            continue
 
-        # Handle nested structure: opt contains 'call' and/or 'put'
-        if "call" in opt or "put" in opt:
-            call_data = opt.get("call") or {}
-            put_data = opt.get("put") or {}
-            if call_data:
-                strikes_map.setdefault(strike, {})["call"] = {
-                    "ltp": call_data.get("ltp", 0),
-                    "oi": call_data.get("oi", 0),
-                    "volume": call_data.get("volume", 0),
-                    "iv": call_data.get("iv", 0),
-                }
-            if put_data:
-                strikes_map.setdefault(strike, {})["put"] = {
-                    "ltp": put_data.get("ltp", 0),
-                    "oi": put_data.get("oi", 0),
-                    "volume": put_data.get("volume", 0),
-                    "iv": put_data.get("iv", 0),
-                }
-        else:
-            # Flat structure: opt itself is an option with option_type
-            opt_type = (opt.get("option_type") or "").upper()
-            if opt_type == "CE":
-                strikes_map.setdefault(strike, {})["call"] = {
-                    "ltp": opt.get("ltp", 0),
-                    "oi": opt.get("oi", 0),
-                    "volume": opt.get("volume", 0),
-                    "iv": opt.get("iv", 0),
-                }
-            elif opt_type == "PE":
-                strikes_map.setdefault(strike, {})["put"] = {
-                    "ltp": opt.get("ltp", 0),
-                    "oi": opt.get("oi", 0),
-                    "volume": opt.get("volume", 0),
-                    "iv": opt.get("iv", 0),
-                }
+def render_term_structure(client: FyersClient):
+    """Render PCR, max OI strikes and ATM IV for each index across the next expiries"""
+    col1, col2, col3 = st.columns([2, 1, 1])
+    
+    with col1:
+        symbols = st.multiselect("Indices", OPTION_INDICES, default=OPTION_INDICES)
+    
+    with col2:
+        strike_count = st.selectbox("Strikes", [10, 20, 30, 40, 50], index=2, key="term_strike_count")
+    
+    with col3:
+        if st.button("🔄 Fetch Chains", type="primary", use_container_width=True):
+            st.rerun()
+    
+    st.markdown("---")
+    
+    if not symbols:
+        st.info("Select at least one index")
+        return
+    
+    with st.spinner("Loading option chains..."):
+        try:
+            # Every index x listed expiry chain is fetched concurrently by the shared refresher
+            refresher = get_market_refresher(client)
+            keys = refresher.track_expiry_chains(symbols, strike_count, TERM_EXPIRIES)
+            snapshot = refresher.wait_for(lambda s: s.covers(keys))
+            chains = {key: snapshot.option_chains[key] for key in keys if key in snapshot.option_chains}
+            term = build_term_structure_df(chains)
+            
+            if not term.empty:
+                render_live_indicator()
+                render_snapshot_age(snapshot)
+                st.dataframe(term, use_container_width=True, hide_index=True)
+                
+                st.subheader("📈 ATM IV by Expiry")
+                st.line_chart(term.pivot(index="Expiry", columns="Underlying", values="ATM IV"))
             else:
-                # Unknown entry type - skip
-                continue
-
-    # Build paired lists for display (sorted by strike)
-    calls = []
-    puts = []
-
-    strikes_sorted = sorted(strikes_map.keys())[:strike_count]
-    for strike in strikes_sorted:
-        data = strikes_map.get(strike, {})
-        call = data.get("call", {})
-        put = data.get("put", {})
+                st.warning("No option chain data available")
+            
+            failed = {key: snapshot.errors[key] for key in keys if key in snapshot.errors}
+            if failed:
+                with st.expander(f"⚠️ {len(failed)} chain(s) failed to load"):
+                    for (symbol, expiry, _), message in failed.items():
+                        st.write(f"{symbol} {expiry_date(expiry) if expiry else 'nearest expiry'}: {message}")
+        except Exception as e:
+            st.error(f"Error: {e}")
 
-        calls.append({
-            "Strike": strike,
-            "CE LTP": call.get("ltp", 0),
-            "CE OI": call.get("oi", 0),
-            "CE Volume": call.get("volume", 0),
-            "CE IV": call.get("iv", 0),
-        })
 
-        puts.append({
-            "Strike": strike,
-            "PE LTP": put.get("ltp", 0),
-            "PE OI": put.get("oi", 0),
-            "PE Volume": put.get("volume", 0),
-            "PE IV": put.get("iv", 0),
+def build_chain_tables(chain: OptionChain, strike_count: int) -> tuple:
+    """Build CALL and PUT display tables for the lowest strike_count strikes"""
+    rows = chain.head(strike_count)
+    strikes = chain.strikes[rows]
+    
+    tables = []
+    for side, prefix in ((chain.ce, "CE"), (chain.pe, "PE")):
+        table = pd.DataFrame({
+            "Strike": strikes,
+            f"{prefix} LTP": side["ltp"][rows],
+            f"{prefix} OI": side["oi"][rows],
+            f"{prefix} Volume": side["volume"][rows],
+            f"{prefix} IV": side["iv"][rows],
         })
-
-    return calls, puts
+        if chain.greeks is not None:
+            greeks = chain.greeks[prefix.lower()]
+            # Solved IV where the LTP allows one, the API's iv otherwise
+            solved = greeks["iv"][rows]
+            table[f"{prefix} IV"] = np.where(np.isfinite(solved), solved, table[f"{prefix} IV"])
+            for field in ("delta", "gamma", "theta", "vega"):
+                table[f"{prefix} {field.capitalize()}"] = greeks[field][rows]
+        tables.append(table)
+    return tuple(tables)
 
 
-def render_option_summary(calls: list, puts: list):
-    """Render option chain summary metrics"""
+def render_option_summary(stats: ChainAnalytics, atm_iv: Optional[float] = None):
+    """Render option chain summary metrics, max pain, support/resistance and OI walls"""
     st.markdown("---")
     st.subheader("📊 Option Chain Summary")
-    # Sum safely, tolerating None values
-    total_call_oi = sum([ (c.get("CE OI") or 0) for c in calls ])
-    total_put_oi = sum([ (p.get("PE OI") or 0) for p in puts ])
-    pcr = total_put_oi / total_call_oi if total_call_oi > 0 else 0
     
-    col1, col2, col3, col4 = st.columns(4)
+    col1, col2, col3, col4, col5 = st.columns(5)
     
     with col1:
-        st.metric("Call OI", f"{total_call_oi:,.0f}")
+        st.metric("Call OI", f"{stats.total_ce_oi:,.0f}")
     with col2:
-        st.metric("Put OI", f"{total_put_oi:,.0f}")
+        st.metric("Put OI", f"{stats.total_pe_oi:,.0f}")
     with col3:
-        st.metric("PCR", f"{pcr:.2f}")
+        st.metric("PCR", f"{stats.pcr:.2f}")
     with col4:
-        sentiment = "🟢 Bullish" if pcr > 1.2 else "🔴 Bearish" if pcr < 0.8 else "⚪ Neutral"
+        sentiment = "🟢 Bullish" if stats.pcr > 1.2 else "🔴 Bearish" if stats.pcr < 0.8 else "⚪ Neutral"
         st.metric("Sentiment", sentiment)
+    with col5:
+        st.metric("ATM IV", f"{atm_iv:.1f}%" if atm_iv is not None else "N/A")
+    
+    col1, col2, col3, col4 = st.columns(4)
+    
+    with col1:
+        st.metric("Spot", f"{stats.spot:,.2f}" if stats.spot is not None else "N/A")
+    with col2:
+        st.metric("Max Pain", f"{stats.max_pain:,.0f}" if stats.max_pain is not None else "N/A")
+    with col3:
+        st.metric("Support (PE OI)", f"{stats.support:,.0f}" if stats.support is not None else "N/A")
+    with col4:
+        st.metric("Resistance (CE OI)", f"{stats.resistance:,.0f}" if stats.resistance is not None else "N/A")
+    
+    st.markdown("#### 🧱 OI Walls")
+    st.dataframe(stats.walls_table(), use_container_width=True, hide_index=True)
@@ -4,13 +4,18 @@ Handles live watchlist functionality with search and symbol management
 """
 
 import streamlit as st
+import numpy as np
 import pandas as pd
 import time
 from datetime import datetime
-from typing import Optional
+from typing import Dict, Optional
 from fyers_client import FyersClient
-from config import STOCK_UNIVERSE
-from ui_components import render_live_indicator, render_search_suggestions
+from market_snapshot import get_market_refresher
+from tick_feed import get_market_stream, live_quotes
+from config import STREAM_REFRESH_INTERVAL, WATCHLIST_REFRESH_INTERVAL
+from symbol_master import get_symbol_master
+from ui_components import (render_live_indicator, render_search_suggestions, render_snapshot_age, sign_rule,
+                           table_css)
 
 
 def render_watchlist_page(client: Optional[FyersClient]):
@@ -31,55 +36,16 @@ def render_watchlist_page(client: Optional[FyersClient]):
             st.rerun()
     
     # Smart suggestions
-    render_search_suggestions(search_term, list(STOCK_UNIVERSE.keys()))
+    render_search_suggestions(search_term, get_symbol_master().names("EQ"))
     
     st.markdown("---")
     st.subheader("📋 Live Watchlist")
     
     if st.session_state.watchlist_symbols and client:
-        watchlist_placeholder = st.empty()
-        
-        try:
-            # Fetch quotes for watchlist symbols
-            fyers_symbols = [f"NSE:{s}-EQ" for s in st.session_state.watchlist_symbols]
-            resp = client.fetch_quotes(fyers_symbols)
-            
-            watchlist_data = []
-            for item in resp.get("d", []):
-                v = item.get("v", {})
-                symbol = item.get("n", "").split(":")[-1].replace("-EQ", "")
-                ltp = float(v.get("lp") or v.get("ltp") or 0)
-                prev = float(v.get("prev_close_price", ltp) or ltp)
-                chg = ltp - prev
-                chg_pct = (chg / prev * 100) if prev > 0 else 0
-                
-                watchlist_data.append({
-                    'Symbol': symbol,
-                    'LTP': round(ltp, 2),
-                    'Prev Close': round(prev, 2),
-                    'Change': round(chg, 2),
-                    'Change (%)': round(chg_pct, 2),
-                    'Status': '🟢 Bull' if chg_pct > 1 else '🔴 Bear' if chg_pct < -1 else '⚪ Neutral'
-                })
-            
-            if watchlist_data:
-                df_watch = pd.DataFrame(watchlist_data)
-                
-                with watchlist_placeholder:
-                    render_live_indicator()
-                    
-                    def color_chg(val):
-                        try:
-                            v = float(val)
-                            color = '#00cc96' if v > 0 else '#ef553b' if v < 0 else 'white'
-                            return f'color: {color}; font-weight: bold'
-                        except:
-                            return ''
-                    
-                    styled = df_watch.style.applymap(color_chg, subset=['Change', 'Change (%)'])
-                    st.dataframe(styled, use_container_width=True, height=400)
-        except Exception as e:
-            st.error(f"Error loading watchlist: {e}")
+        # Only the table reruns on the timer; search, sidebar and navigation are left alone
+        stream = get_market_stream(client)
+        interval = STREAM_REFRESH_INTERVAL if stream is not None and stream.live else WATCHLIST_REFRESH_INTERVAL
+        st.fragment(run_every=interval)(render_watchlist_table)(client)
     elif not client:
         st.warning("🔌 Connect to Fyers API to view live data")
     
@@ -99,3 +65,94 @@ def render_watchlist_page(client: Optional[FyersClient]):
                 st.success(f"Removed {remove_sym}")
                 time.sleep(0.5)
                 st.rerun()
+
+
+def render_watchlist_table(client: FyersClient):
+    """Render the live watchlist table (runs as a fragment on its own timer)"""
+    symbols = st.session_state.watchlist_symbols
+    if not symbols:
+        return
+    
+    try:
+        # Streamed prices when the tick feed is live, else the shared market snapshot
+        fyers_symbols = [f"NSE:{s}-EQ" for s in symbols]
+        resp = live_quotes(client, fyers_symbols)
+        snapshot = None
+        if resp is None:
+            refresher = get_market_refresher(client)
+            refresher.track_quotes(fyers_symbols)
+            snapshot = refresher.wait_for(lambda s: s.covers(fyers_symbols))
+            if "quotes" in snapshot.errors:
+                st.error(f"Quotes fetch error: {snapshot.errors['quotes']}")
+            resp = snapshot.quotes_response(fyers_symbols)
+        
+        df_watch = build_watchlist_frame(resp)
+        if df_watch.empty:
+            return
+        
+        # Cells that moved since this session's previous tick are highlighted
+        changed = changed_cells(st.session_state.get('watchlist_frame'), df_watch)
+        st.session_state['watchlist_frame'] = df_watch
+        
+        if snapshot is None:
+            render_live_indicator("STREAMING")
+        else:
+            render_live_indicator()
+            render_snapshot_age(snapshot)
+        st.dataframe(style_watchlist(df_watch, changed), use_container_width=True, height=400)
+    except Exception as e:
+        st.error(f"Error loading watchlist: {e}")
+
+
+def build_watchlist_frame(resp: Dict) -> pd.DataFrame:
+    """Watchlist table from a fetch_quotes-shaped response, one row per symbol"""
+    items = resp.get("d", [])
+    values = [item.get("v", {}) for item in items]
+    ltp = np.array([float(v.get("lp") or v.get("ltp") or 0) for v in values])
+    prev = np.array([float(v.get("prev_close_price", l) or l) for v, l in zip(values, ltp.tolist())])
+    chg = ltp - prev
+    with np.errstate(divide="ignore", invalid="ignore"):
+        chg_pct = np.where(prev > 0, chg / prev * 100, 0.0)
+    
+    return pd.DataFrame({
+        'Symbol': [item.get("n", "").split(":")[-1].replace("-EQ", "") for item in items],
+        'LTP': ltp.round(2),
+        'Prev Close': prev.round(2),
+        'Change': chg.round(2),
+        'Change (%)': chg_pct.round(2),
+        'Status': np.select([chg_pct > 1, chg_pct < -1], ['🟢 Bull', '🔴 Bear'], '⚪ Neutral'),
+    })
+
+
+def changed_cells(previous: Optional[pd.DataFrame], latest: pd.DataFrame) -> pd.DataFrame:
+    """
+    Per-cell tick direction of latest vs. previous, matched by Symbol
+    
+    1 where a value went up, -1 where it went down (or changed, for text),
+    0 where unchanged or the symbol is new.
+    """
+    direction = pd.DataFrame(0, index=latest.index, columns=latest.columns)
+    if previous is None or previous.empty:
+        return direction
+    
+    old = previous.drop_duplicates('Symbol').set_index('Symbol').reindex(latest['Symbol'])
+    known = old['LTP'].notna().to_numpy()
+    for col in latest.columns.drop('Symbol'):
+        new_values, old_values = latest[col].to_numpy(), old[col].to_numpy()
+        if col == 'Status':
+            moved = np.where(known & (new_values != old_values), -1, 0)
+        else:
+            moved = np.sign(np.where(known, new_values - old_values, 0.0)).astype(int)
+        direction[col] = moved
+    return direction
+
+
+def style_watchlist(df: pd.DataFrame, changed: pd.DataFrame):
+    """Green/red change columns, with a flash behind cells that moved this tick"""
+    change = sign_rule(zero='color: white; font-weight: bold')
+    css = table_css(df, {'Change': change, 'Change (%)': change}).to_numpy()
+    flash = changed.to_numpy()
+    background = np.where(flash > 0, 'background-color: rgba(0, 204, 150, 0.25)',
+                          np.where(flash < 0, 'background-color: rgba(239, 85, 59, 0.25)', ''))
+    css = css + np.where((css != '') & (background != ''), '; ', '') + background
+    return df.style.apply(lambda _: pd.DataFrame(css, index=df.index, columns=df.columns), axis=None)
@@ -0,0 +1,172 @@
+"""
+Async Fyers API Client Module
+Non-blocking counterpart of FyersClient built on aiohttp, plus a sync bridge
+so Streamlit pages can run several endpoint calls concurrently
+"""
+
+import asyncio
+import threading
+from typing import Any, Awaitable, Dict, List, Optional
+
+import aiohttp
+
+from candle_data import to_candles
+from config import FYERS_BASE, HTTP_POOL_SIZE, RATE_LIMIT_GROUPS, RATE_LIMITS
+from fyers_client import FyersClient, resolve_option_symbol
+from rate_limiter import PRIORITY_HIGH, PRIORITY_NORMAL, RequestScheduler
+
+
+class AsyncFyersClient:
+    """
+    Async client for Fyers data/account endpoints with a reused connection pool
+
+    Requests are paced by a RequestScheduler, normally the sync client's, so
+    both clients draw on the same rate limits. Waiting for the scheduler
+    blocks, so it happens on the loop's default executor.
+    """
+
+    def __init__(self, client_id: str, access_token: str, pool_size: int = HTTP_POOL_SIZE,
+                 base_url: str = FYERS_BASE, scheduler: Optional[RequestScheduler] = None):
+        self.client_id = client_id
+        self.access_token = access_token
+        self.base_url = base_url
+        self.pool_size = pool_size
+        self.scheduler = scheduler or RequestScheduler(RATE_LIMITS, RATE_LIMIT_GROUPS)
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    @classmethod
+    def from_client(cls, client: FyersClient) -> "AsyncFyersClient":
+        """Build an async client sharing credentials, base URL and rate limiter with a sync client"""
+        return cls(client.client_id, client.access_token, base_url=client.base_url,
+                   scheduler=client.scheduler)
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Create the pooled session lazily, inside the running event loop"""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.pool_size, keepalive_timeout=60)
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                headers={"Authorization": f"{self.client_id}:{self.access_token}"},
+            )
+        return self._session
+
+    async def _get(self, endpoint: str, path: str, params: Optional[Dict] = None, timeout: float = 10,
+                   priority: int = PRIORITY_NORMAL) -> Dict:
+        """
+        Paced GET of a JSON endpoint: waits for the endpoint's rate limit and
+        retries once after HTTP 429; returns an {"s": "error"} dict on failure
+        """
+        try:
+            session = self._get_session()
+            loop = asyncio.get_running_loop()
+            for attempt in range(2):
+                await loop.run_in_executor(None, self.scheduler.acquire, endpoint, priority)
+                async with session.get(f"{self.base_url}{path}", params=params,
+                                       timeout=aiohttp.ClientTimeout(total=timeout)) as resp:
+                    if resp.status == 429 and attempt == 0:
+                        self.scheduler.record_throttle(endpoint)
+                        continue
+                    resp.raise_for_status()
+                    return await resp.json(content_type=None)
+        except Exception as e:
+            return {"s": "error", "message": str(e)}
+
+    async def fetch_quotes(self, symbols: List[str]) -> Dict:
+        """Fetch live quotes from Fyers API"""
+        return await self._get("quotes", "/data/quotes", {"symbols": ",".join(symbols)})
+
+    async def fetch_history(self, symbol: str, resolution: str, date_from: str,
+                            date_to: str) -> Dict:
+        """Fetch historical data for volume and price analysis"""
+        params = {
+            "symbol": symbol,
+            "resolution": resolution,  # "5" for 5 minute
+            "date_format": "0",  # range_from/range_to are epoch seconds
+            "range_from": date_from,
+            "range_to": date_to,
+            "cont_flag": "1"
+        }
+        resp = await self._get("history", "/data/history", params, timeout=15)
+        if resp.get("s") == "ok":
+            resp["candles"] = to_candles(resp.get("candles"))
+        return resp
+
+    async def fetch_funds(self) -> Dict:
+        """Fetch account funds"""
+        return await self._get("account", "/api/v3/funds", priority=PRIORITY_HIGH)
+
+    async def fetch_holdings(self) -> Dict:
+        """Fetch holdings"""
+        return await self._get("account", "/api/v3/holdings", priority=PRIORITY_HIGH)
+
+    async def fetch_positions(self) -> Dict:
+        """Fetch positions"""
+        return await self._get("account", "/api/v3/positions", priority=PRIORITY_HIGH)
+
+    async def fetch_option_chain(self, symbol: str, expiry_date: str, strike_count: int = 50) -> Dict:
+        """Fetch option chain data"""
+        params = {
+            "symbol": resolve_option_symbol(symbol),
+            "strikecount": strike_count,
+            "timestamp": expiry_date  # Expiry timestamp from the response's expiryData; "" = nearest expiry
+        }
+        return await self._get("option_chain", "/data/options-chain-v3", params)
+
+    async def close(self):
+        """Close pooled connections"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+
+
+class _LoopThread:
+    """Event loop running forever on a daemon thread"""
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, name="fyers-async", daemon=True)
+        self._thread.start()
+
+    def run(self, coro: Awaitable) -> Any:
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result()
+
+
+_loop_thread: Optional[_LoopThread] = None
+_loop_lock = threading.Lock()
+
+
+def _get_loop_thread() -> _LoopThread:
+    global _loop_thread
+    with _loop_lock:
+        if _loop_thread is None:
+            _loop_thread = _LoopThread()
+        return _loop_thread
+
+
+def run_sync(coro: Awaitable) -> Any:
+    """Run a coroutine on the shared background loop and block for its result"""
+    return _get_loop_thread().run(coro)
+
+
+def gather_sync(*coros: Awaitable) -> List[Any]:
+    """
+    Run several coroutines concurrently and return their results in order
+
+    Example:
+        funds, holdings = gather_sync(aclient.fetch_funds(), aclient.fetch_holdings())
+    """
+    async def _gather():
+        return await asyncio.gather(*coros)
+    return run_sync(_gather())
+
+
+_shared_clients: Dict[tuple, AsyncFyersClient] = {}
+
+
+def get_async_client(client: FyersClient) -> AsyncFyersClient:
+    """Process-wide async client matching a sync client's credentials and rate limiter"""
+    key = (client.client_id, client.access_token, client.base_url)
+    with _loop_lock:
+        aclient = _shared_clients.get(key)
+        if aclient is None or aclient.scheduler is not client.scheduler:
+            aclient = _shared_clients[key] = AsyncFyersClient.from_client(client)
+        return aclient
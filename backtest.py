@@ -0,0 +1,286 @@
+"""
+Backtest Module
+Replays the breakout screens over stored 5-minute candles for many symbols
+with whole-array operations and reports hit rate and PnL per holding period
+
+Usage:
+    python backtest.py --days 365
+    python backtest.py --symbol NSE:TCS-EQ --symbol NSE:INFY-EQ --hold 6 --hold 24
+
+Only candles already in the candle store (CANDLE_STORE_PATH) are used;
+nothing is fetched. They are read through a snapshot of the store
+(BACKTEST_SNAPSHOT_PATH), brought up to date at the start of every run.
+"""
+
+import argparse
+import sys
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from candle_data import CANDLE_DTYPE
+from candle_store import CandleSnapshot, CandleStore, refresh_snapshot
+from config import (BACKTEST_COST_PCT, BACKTEST_HOLDS, BACKTEST_SCREENS, BACKTEST_SNAPSHOT_PATH, CANDLE_STORE_PATH,
+                    INDICATOR_VOL_WINDOW, SCREEN_VALUES)
+from resampler import bucket_starts, in_session
+from screener import ScreenSet
+
+# Trade direction of each backtest screen
+SIDES = {"bull": 1, "bear": -1}
+
+
+def load_candles(snapshot: CandleSnapshot, symbols: Sequence[str], date_from: int,
+                 date_to: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    In-session candles of every symbol back to back, plus each bar's symbol index
+
+    Symbols follow the given order and each one's candles are oldest first,
+    so every symbol, session day and week is one contiguous run.
+    """
+    parts = [snapshot.load(symbol, date_from, date_to) for symbol in symbols]
+    candles = np.concatenate(parts) if parts else np.zeros(0, dtype=CANDLE_DTYPE)
+    symbol_ids = np.repeat(np.arange(len(parts)), [len(p) for p in parts])
+    keep = in_session(candles["ts"])
+    return candles[keep], symbol_ids[keep]
+
+
+def _runs(*keys: np.ndarray) -> np.ndarray:
+    """Start index of every run of equal consecutive keys"""
+    if not len(keys[0]):
+        return np.zeros(0, dtype=np.int64)
+    change = np.zeros(len(keys[0]), dtype=bool)
+    change[0] = True
+    for key in keys:
+        change[1:] |= key[1:] != key[:-1]
+    return np.flatnonzero(change)
+
+
+def _previous_run(values: np.ndarray, starts: np.ndarray, symbol_ids: np.ndarray, length: int) -> np.ndarray:
+    """Per bar, the value of the run before its own (NaN for a symbol's first run)"""
+    run_symbols = symbol_ids[starts]
+    previous = np.full(len(values), np.nan)
+    previous[1:] = np.where(run_symbols[1:] == run_symbols[:-1], values[:-1], np.nan)
+    return np.repeat(previous, np.diff(np.append(starts, length)))
+
+
+def bar_frame(candles: np.ndarray, symbol_ids: np.ndarray, vol_window: int = INDICATOR_VOL_WINDOW) -> pd.DataFrame:
+    """
+    Scan frame fields for every bar, as the live scan would have seen them at its close
+
+    current_close is the bar close and vol_current its volume, vol_20_avg
+    the mean volume over the last vol_window bars including it. open and
+    prev_close are the session's open and the previous session's close;
+    prev_day_* / prev_week_* come from the previous session / Monday-based
+    week. Day and week extremes are reduceat over their contiguous runs,
+    the volume average a difference of cumulative sums.
+    """
+    n = len(candles)
+    ts, high, low = candles["ts"], candles["high"], candles["low"]
+    volume = candles["volume"]
+
+    day_starts = _runs(symbol_ids, bucket_starts(ts, "D"))
+    week_starts = _runs(symbol_ids, bucket_starts(ts, "W"))
+    day_ends = np.append(day_starts[1:], n) - 1
+    day_lengths = np.diff(np.append(day_starts, n))
+
+    symbol_starts = _runs(symbol_ids)
+    first_bar = np.repeat(symbol_starts, np.diff(np.append(symbol_starts, n)))
+    sums = np.concatenate([[0.0], np.cumsum(volume)])
+    index = np.arange(n)
+    vol_avg = (sums[index + 1] - sums[np.maximum(index + 1 - vol_window, 0)]) / vol_window
+    vol_avg[index - first_bar < vol_window - 1] = np.nan  # Not enough bars yet, as IndicatorEngine
+
+    if not n:
+        empty = np.zeros(0)
+        day_high = day_low = day_close = week_high = week_low = empty
+    else:
+        day_high, day_low = np.maximum.reduceat(high, day_starts), np.minimum.reduceat(low, day_starts)
+        day_close = candles["close"][day_ends]
+        week_high, week_low = np.maximum.reduceat(high, week_starts), np.minimum.reduceat(low, week_starts)
+
+    return pd.DataFrame({
+        "symbol_id": symbol_ids,
+        "ts": ts,
+        "bar_open": candles["open"],
+        "current_close": candles["close"],
+        "open": np.repeat(candles["open"][day_starts], day_lengths),
+        "prev_close": _previous_run(day_close, day_starts, symbol_ids, n),
+        "prev_day_high": _previous_run(day_high, day_starts, symbol_ids, n),
+        "prev_day_low": _previous_run(day_low, day_starts, symbol_ids, n),
+        "prev_week_high": _previous_run(week_high, week_starts, symbol_ids, n),
+        "prev_week_low": _previous_run(week_low, week_starts, symbol_ids, n),
+        "vol_current": volume,
+        "vol_20_avg": vol_avg,
+        "day": np.repeat(np.arange(len(day_starts)), day_lengths),
+    })
+
+
+def fresh_signals(bars: pd.DataFrame, mask: np.ndarray) -> np.ndarray:
+    """Bar indexes where a screen first holds on each symbol's session day"""
+    hits = np.flatnonzero(mask)
+    days = bars["day"].to_numpy()[hits]
+    return hits[np.r_[True, days[1:] != days[:-1]]] if len(hits) else hits
+
+
+def simulate(bars: pd.DataFrame, signals: Dict[str, np.ndarray], holds: Sequence[int],
+             cost_pct: float = BACKTEST_COST_PCT) -> pd.DataFrame:
+    """
+    One trade per signal and holding period
+
+    Entry is the next bar's open, exit the close `hold` bars after entry
+    (the entry bar counts as the first). Trades that would run past a
+    symbol's last stored bar are dropped. PnL is in percent of the entry
+    after cost_pct round-trip costs.
+    """
+    symbol_ids = bars["symbol_id"].to_numpy()
+    bar_open, close, ts = bars["bar_open"].to_numpy(), bars["current_close"].to_numpy(), bars["ts"].to_numpy()
+    n = len(bars)
+    frames = []
+    for screen, signal in signals.items():
+        side = SIDES[screen]
+        for hold in holds:
+            entry = signal + 1
+            exit_ = signal + hold
+            ok = exit_ < n
+            ok[ok] = symbol_ids[exit_[ok]] == symbol_ids[signal[ok]]
+            entry, exit_, signal_ok = entry[ok], exit_[ok], signal[ok]
+            entry_price, exit_price = bar_open[entry], close[exit_]
+            frames.append(pd.DataFrame({
+                "screen": screen,
+                "hold": hold,
+                "symbol_id": symbol_ids[signal_ok],
+                "signal_ts": ts[signal_ok],
+                "exit_ts": ts[exit_],
+                "entry": entry_price,
+                "exit": exit_price,
+                "pnl_pct": side * (exit_price - entry_price) / entry_price * 100.0 - cost_pct,
+            }))
+    if not frames:
+        return pd.DataFrame(columns=["screen", "hold", "symbol_id", "signal_ts", "exit_ts", "entry", "exit",
+                                     "pnl_pct"])
+    return pd.concat(frames, ignore_index=True)
+
+
+def summarize(trades: pd.DataFrame) -> pd.DataFrame:
+    """Trade count, hit rate and PnL distribution per screen and holding period"""
+    if trades.empty:
+        return pd.DataFrame()
+    grouped = trades.groupby(["screen", "hold"], sort=True)["pnl_pct"]
+    summary = grouped.agg(["count", "mean", "median", "std", "sum"])
+    summary.insert(1, "hit_rate", grouped.apply(lambda pnl: (pnl > 0).mean() * 100.0))
+    quantiles = grouped.quantile([0.05, 0.25, 0.75, 0.95]).unstack()
+    quantiles.columns = ["p5", "p25", "p75", "p95"]
+    summary = summary.join(quantiles)
+    summary.columns = ["Trades", "Hit Rate %", "Mean %", "Median %", "Std %", "Total %",
+                       "P5 %", "P25 %", "P75 %", "P95 %"]
+    return summary.round(3)
+
+
+class BacktestResult:
+    """Trades, their summary and timings of one backtest run"""
+
+    def __init__(self, symbols: List[str], bars: int, trades: pd.DataFrame, summary: pd.DataFrame,
+                 timings: Dict[str, float]):
+        self.symbols = symbols
+        self.bars = bars
+        self.trades = trades
+        self.summary = summary
+        self.timings = timings
+
+    def pnl_histogram(self, screen: str, hold: int, bins: int = 40) -> pd.DataFrame:
+        """Trade counts per PnL bucket for one screen and holding period"""
+        pnl = self.trades.loc[(self.trades["screen"] == screen) & (self.trades["hold"] == hold), "pnl_pct"]
+        counts, edges = np.histogram(pnl, bins=bins)
+        return pd.DataFrame({"PnL %": ((edges[:-1] + edges[1:]) / 2).round(3), "Trades": counts})
+
+
+def run_backtest(symbols: Optional[Sequence[str]] = None, date_from: Optional[int] = None,
+                 date_to: Optional[int] = None, holds: Sequence[int] = BACKTEST_HOLDS,
+                 screens: Dict[str, str] = BACKTEST_SCREENS, cost_pct: float = BACKTEST_COST_PCT,
+                 store: Optional[CandleStore] = None,
+                 snapshot_path: str = BACKTEST_SNAPSHOT_PATH) -> BacktestResult:
+    """
+    Backtest screens over stored 5-minute candles
+
+    Args:
+        symbols: Full Fyers tickers (default: every symbol in the store)
+        date_from: Range start as epoch seconds (default: 365 days ago)
+        date_to: Range end as epoch seconds (default: now)
+        holds: Holding periods in 5-minute bars
+        screens: "bull" / "bear" entry screens (screener expressions)
+        cost_pct: Round-trip costs in percent of the entry price
+        store: Candle store to read (default: CANDLE_STORE_PATH)
+        snapshot_path: Where the store's 5-minute candles are snapshotted
+    """
+    unknown = [name for name in screens if name not in SIDES]
+    if unknown:
+        raise ValueError(f"backtest screens must be named {' or '.join(SIDES)}, not {', '.join(unknown)}")
+    if any(hold < 1 for hold in holds):
+        raise ValueError("holding periods must be at least one bar")
+    screen_set = ScreenSet(screens, SCREEN_VALUES)
+    own_store = store is None
+    store = store or CandleStore(CANDLE_STORE_PATH)
+    date_to = int(date_to if date_to is not None else time.time())
+    date_from = int(date_from if date_from is not None else date_to - 365 * 86400)
+    timings = {}
+    try:
+        start = time.perf_counter()
+        snapshot = refresh_snapshot(store, "5", snapshot_path)
+        symbols = list(symbols) if symbols is not None else snapshot.symbols
+        candles, symbol_ids = load_candles(snapshot, symbols, date_from, date_to)
+        timings["load"] = time.perf_counter() - start
+    finally:
+        if own_store:
+            store.close()
+
+    start = time.perf_counter()
+    bars = bar_frame(candles, symbol_ids)
+    timings["fields"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    masks = screen_set.evaluate(bars)
+    signals = {name: fresh_signals(bars, masks[name].to_numpy()) for name in screens}
+    timings["signals"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    trades = simulate(bars, signals, holds, cost_pct)
+    trades.insert(0, "symbol", np.asarray(symbols, dtype=object)[trades["symbol_id"].to_numpy(dtype=int)]
+                  if len(trades) else [])
+    trades = trades.drop(columns="symbol_id")
+    summary = summarize(trades)
+    timings["simulate"] = time.perf_counter() - start
+    return BacktestResult(symbols, len(bars), trades, summary, timings)
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Backtest the breakout screens over stored candles")
+    parser.add_argument("--symbol", action="append", default=None,
+                        help="Ticker to include, e.g. NSE:TCS-EQ (repeatable; default: every stored symbol)")
+    parser.add_argument("--days", type=int, default=365, help="Days of history to replay")
+    parser.add_argument("--hold", type=int, action="append", default=None,
+                        help="Holding period in 5-minute bars (repeatable)")
+    parser.add_argument("--cost", type=float, default=BACKTEST_COST_PCT, help="Round-trip costs in percent")
+    parser.add_argument("--store", default=CANDLE_STORE_PATH, help="Candle store to read")
+    parser.add_argument("--snapshot", default=BACKTEST_SNAPSHOT_PATH, help="Snapshot of the store to keep")
+    parser.add_argument("--trades", default=None, help="Write every trade to this CSV file")
+    args = parser.parse_args(argv)
+
+    now = int(time.time())
+    result = run_backtest(args.symbol, now - args.days * 86400, now, args.hold or BACKTEST_HOLDS,
+                          cost_pct=args.cost, store=CandleStore(args.store), snapshot_path=args.snapshot)
+    timings = ", ".join(f"{name} {seconds:.2f}s" for name, seconds in result.timings.items())
+    print(f"{len(result.symbols)} symbols, {result.bars} bars, {len(result.trades)} trades ({timings})")
+    if result.summary.empty:
+        print("No trades")
+    else:
+        with pd.option_context("display.width", 200, "display.max_columns", None):
+            print(result.summary)
+    if args.trades:
+        result.trades.to_csv(args.trades, index=False)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,166 @@
+"""
+Backtest: vectorized replay of the breakout screens over a year of candles
+
+Fills a temporary candle store with synthetic session 5-minute bars
+(random walks with occasional volume bursts), then:
+  - checks bar_frame fields and the trades against a bar-by-bar replay
+    (SymbolIndicators for the volume average, resample() for the previous
+    day / week, a Python loop for signals and exits) on a few symbols
+  - times run_backtest over the whole store, split into loading candles,
+    computing fields, evaluating screens and simulating trades: first
+    building the candle snapshot, then with it up to date, then after a
+    new session was appended for a tenth of the symbols
+  - times reading every candle straight from SQLite, for comparison
+
+Usage: python benchmarks/bench_backtest.py [symbols] [days]
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backtest import SIDES, bar_frame, load_candles, run_backtest
+from candle_data import empty_candles
+from candle_store import ALL_TIME, CandleStore, refresh_snapshot
+from config import BACKTEST_COST_PCT, BACKTEST_HOLDS, INDICATOR_VOL_WINDOW
+from indicators import SymbolIndicators
+from resampler import IST_OFFSET, SESSION_OPEN, resample
+
+DAY = 86400
+
+
+def session_days(days: int, end: int) -> np.ndarray:
+    """Epoch session opens of the weekdays among the last `days` days"""
+    last = (end + IST_OFFSET) // DAY
+    local_days = np.arange(last - days + 1, last + 1)
+    weekdays = local_days[(local_days + 3) % 7 < 5]  # 1970-01-01 was a Thursday
+    return weekdays * DAY + SESSION_OPEN - IST_OFFSET
+
+
+def make_history(opens: np.ndarray, seed: int) -> np.ndarray:
+    """75 session bars a day: a random walk with fat-tailed moves and volume bursts"""
+    rng = np.random.default_rng(seed)
+    ts = (opens[:, None] + np.arange(75) * 300).ravel()
+    n = len(ts)
+    steps = rng.standard_t(3, n) * 0.002
+    close = rng.uniform(100, 3000) * np.exp(np.cumsum(steps))
+    open_ = np.r_[close[0], close[:-1]] * (1 + rng.normal(0, 0.0005, n))
+    spread = np.abs(rng.normal(0, 0.001, n)) * close
+    candles = empty_candles(n)
+    candles["ts"] = ts
+    candles["open"], candles["close"] = open_, close
+    candles["high"] = np.maximum(open_, close) + spread
+    candles["low"] = np.minimum(open_, close) - spread
+    burst = np.where(rng.random(n) < 0.02, rng.uniform(3, 8, n), 1.0)
+    candles["volume"] = np.round(rng.lognormal(9, 0.5, n) * burst)
+    return candles
+
+
+def replay(candles: np.ndarray, holds, cost_pct: float) -> list:
+    """Trades for one symbol, bar by bar"""
+    candles = candles.copy()
+    engine = SymbolIndicators()
+    days, weeks = resample(candles, "D"), resample(candles, "W")
+    trades, traded = [], set()
+    for i, bar in enumerate(candles):
+        engine.add(tuple(bar.tolist()))
+        values = engine.values()
+        d = np.searchsorted(days["ts"], bar["ts"], side="right") - 1
+        w = np.searchsorted(weeks["ts"], bar["ts"], side="right") - 1
+        if values is None or d < 1 or w < 1:
+            continue
+        vol_avg = values[0]
+        vol_ratio = bar["volume"] / vol_avg if vol_avg > 0 else 0.0
+        hits = {"bull": bar["close"] > weeks["high"][w - 1] and vol_ratio >= 2,
+                "bear": bar["close"] < weeks["low"][w - 1] and vol_ratio >= 2}
+        for screen, hit in hits.items():
+            if not hit or (screen, d) in traded:
+                continue
+            traded.add((screen, d))
+            for hold in holds:
+                if i + hold < len(candles):
+                    entry, exit_ = candles["open"][i + 1], candles["close"][i + hold]
+                    pnl = SIDES[screen] * (exit_ - entry) / entry * 100.0 - cost_pct
+                    trades.append((screen, hold, int(bar["ts"]), pnl))
+    return trades
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    days = int(sys.argv[2]) if len(sys.argv) > 2 else 365
+    symbols = [f"NSE:SYM{i:03d}-EQ" for i in range(count)]
+    end = int(time.time())
+    opens = session_days(days, end)
+
+    workdir = tempfile.mkdtemp(prefix="bench_backtest_")
+    try:
+        store = CandleStore(os.path.join(workdir, "candles.sqlite3"))
+        start = time.perf_counter()
+        for k, symbol in enumerate(symbols):
+            store.append(symbol, "5", make_history(opens, k))
+        print(f"{count} symbols x {len(opens)} sessions x 75 bars = {count * len(opens) * 75} bars "
+              f"(store filled in {time.perf_counter() - start:.1f} s)")
+
+        snapshot_path = os.path.join(workdir, "snapshot.bin")
+        checked = symbols[:3]
+        candles, ids = load_candles(refresh_snapshot(store, "5", snapshot_path), checked, 0, end)
+        bars = bar_frame(candles, ids)
+        for k, symbol in enumerate(checked):
+            own = candles[ids == k]
+            engine = SymbolIndicators()
+            expected = []
+            for bar in own[:500]:
+                engine.add(tuple(bar.tolist()))
+                values = engine.values()
+                expected.append(np.nan if values is None else values[0])
+            got = bars.loc[ids == k, "vol_20_avg"].to_numpy()[:500]
+            np.testing.assert_allclose(got, expected, rtol=1e-9)
+            assert np.isnan(got[:INDICATOR_VOL_WINDOW - 1]).all()
+
+        result = run_backtest(checked, 0, end, BACKTEST_HOLDS, store=store, snapshot_path=snapshot_path)
+        expected = pd.DataFrame([(s,) + t for s in checked for t in replay(store.load(s, "5", 0, end),
+                                                                          BACKTEST_HOLDS, BACKTEST_COST_PCT)],
+                                columns=["symbol", "screen", "hold", "signal_ts", "pnl_pct"])
+        key = ["symbol", "screen", "hold", "signal_ts"]
+        got = result.trades[key + ["pnl_pct"]].sort_values(key, ignore_index=True)
+        expected = expected.sort_values(key, ignore_index=True)
+        pd.testing.assert_frame_equal(got, expected, check_dtype=False)
+        print(f"  {len(checked)} symbols: fields and {len(got)} trades match the bar-by-bar replay")
+
+        os.remove(snapshot_path)
+        appended = session_days(days + 7, end + 7 * DAY)[-1:]
+        for label in ("building the snapshot", "snapshot up to date", f"new session for {count // 10} symbols"):
+            if label.startswith("new session"):
+                for k, symbol in enumerate(symbols[:count // 10]):
+                    store.append(symbol, "5", make_history(appended, k))
+            start = time.perf_counter()
+            result = run_backtest(None, 0, end + 7 * DAY, store=store, snapshot_path=snapshot_path)
+            wall = time.perf_counter() - start
+            timings = ", ".join(f"{name} {seconds:.2f} s" for name, seconds in result.timings.items())
+            print(f"  run_backtest, {label}: {wall:.2f} s for {result.bars} bars, {len(result.trades)} trades "
+                  f"({timings})")
+        store.mark_covered(symbols[-1], "5", int(opens[0]))  # Coverage moved: reread in full
+        snapshot = refresh_snapshot(store, "5", snapshot_path)
+        for symbol in symbols[-1:] + symbols[:count // 10 + 1]:
+            assert np.array_equal(snapshot.load(symbol, *ALL_TIME), store.load(symbol, "5", *ALL_TIME))
+
+        start = time.perf_counter()
+        for symbol in symbols:
+            store.load(symbol, "5", 0, end + 7 * DAY)
+        print(f"  every candle read from SQLite instead: {time.perf_counter() - start:.2f} s")
+        store.close()
+        with pd.option_context("display.width", 200, "display.max_columns", None):
+            print(result.summary)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
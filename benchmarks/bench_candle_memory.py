@@ -0,0 +1,76 @@
+"""
+Memory and access cost of candle representations
+
+500 symbols x 30 sessions x 75 five-minute bars (09:15-15:30), held as
+parsed JSON lists of lists (the old layout), as candle_data structured
+arrays, and, for reference, a float32 OHLCV layout. Memory is measured
+with tracemalloc; access is the 20-bar volume average plus 288-bar
+high/low for every symbol.
+
+Usage: python benchmarks/bench_candle_memory.py [symbols] [sessions]
+"""
+
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from candle_data import to_candles
+from mock_fyers_server import make_candles
+
+BARS_PER_SESSION = 75
+
+FLOAT32_DTYPE = np.dtype([("ts", "<i8"), ("open", "<f4"), ("high", "<f4"), ("low", "<f4"),
+                          ("close", "<f4"), ("volume", "<f4")])
+
+
+def measure(build):
+    gc.collect()
+    tracemalloc.start()
+    data = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return data, current
+
+
+def main():
+    symbols = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    sessions = int(sys.argv[2]) if len(sys.argv) > 2 else 30
+    bars = sessions * BARS_PER_SESSION
+    payloads = [json.dumps({"s": "ok", "candles": make_candles(f"S{i}", bars)}) for i in range(symbols)]
+    total = symbols * bars
+    print(f"{symbols} symbols x {sessions} sessions x {BARS_PER_SESSION} bars = {total:,} candles")
+
+    lists, list_bytes = measure(lambda: [json.loads(p)["candles"] for p in payloads])
+    arrays, array_bytes = measure(lambda: [to_candles(rows) for rows in lists])
+    _, f32_bytes = measure(lambda: [a.astype(FLOAT32_DTYPE) for a in arrays])
+
+    for label, size in (("lists of lists", list_bytes), ("structured f8", array_bytes),
+                        ("structured f4", f32_bytes)):
+        print(f"  {label:15s} {size / 2**20:8.1f} MiB  {size / total:6.1f} B/candle"
+              f"  ({list_bytes / size:4.1f}x vs lists)")
+
+    start = time.perf_counter()
+    for rows in lists:
+        sum(c[5] for c in rows[-20:]) / 20
+        max(c[2] for c in rows[-288:])
+        min(c[3] for c in rows[-288:])
+    list_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for a in arrays:
+        a["volume"][-20:].mean()
+        a["high"][-288:].max()
+        a["low"][-288:].min()
+    array_time = time.perf_counter() - start
+    print(f"Window reads for all symbols: lists {list_time * 1000:.1f} ms, arrays {array_time * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
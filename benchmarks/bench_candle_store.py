@@ -0,0 +1,60 @@
+"""
+History payload per scan: no store vs. cold store vs. warm store
+
+Runs build_df_from_quotes over SCAN_SYMBOLS against the local stand-in
+server and reports the history bytes it served. The warm run only asks
+for candles after the newest stored one.
+
+Usage: python benchmarks/bench_candle_store.py
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from candle_store import CandleStore
+from config import SCAN_SYMBOLS
+from data_processor import build_df_from_quotes
+from fyers_client import FyersClient
+from indicators import IndicatorEngine
+from mock_fyers_server import start_mock_server
+from rate_limiter import RequestScheduler
+from resampler import TimeframeCache
+
+
+def run_scan(server, client: FyersClient, label: str, baseline: int = None) -> int:
+    quotes = client.fetch_quotes(SCAN_SYMBOLS)
+    before = server.bytes_sent
+    start = time.perf_counter()
+    # Fresh indicators, so every run fetches what the store (not a warm engine) lacks
+    df = build_df_from_quotes(quotes, client, engine=IndicatorEngine(), timeframes=TimeframeCache())
+    elapsed = time.perf_counter() - start
+    sent = server.bytes_sent - before
+    saved = f"  ({100 - sent / baseline * 100:.1f}% less)" if baseline else ""
+    print(f"  {label:<18} {sent / 1024:10.1f} KiB  {elapsed:6.2f} s  rows={len(df)}{saved}")
+    return sent
+
+
+def main():
+    server, base_url = start_mock_server(latency=0.0, candle_count=2250)
+    with tempfile.TemporaryDirectory() as tmp:
+        store = CandleStore(os.path.join(tmp, "candles.sqlite3"))
+        plain = FyersClient(client_id="BENCH-100", access_token="token")
+        cached = FyersClient(client_id="BENCH-100", access_token="token", candle_store=store)
+        plain.base_url = cached.base_url = base_url
+        plain.scheduler = cached.scheduler = RequestScheduler({})  # Don't pace the stand-in
+        try:
+            print(f"History payload for {len(SCAN_SYMBOLS)} symbols (30 days of 5-minute candles)")
+            baseline = run_scan(server, plain, "no store")
+            run_scan(server, cached, "cold store", baseline)
+            run_scan(server, cached, "warm store", baseline)
+        finally:
+            store.close()
+            server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Chain analytics: max pain, OI walls and option confirmation from one pass
+
+Builds random 100-strike chains, then:
+  - checks max pain against the per-strike payout sum, the walls against a
+    plain sort, and resistance/support weakening against the near-spot
+    oi_change_pct scan for many prices
+  - times building ChainAnalytics against the Python max-pain/wall loops,
+    and classifier confirmation for 500 candidate rows with and without
+    the cached analytics
+
+Usage: python benchmarks/bench_chain_analytics.py [strikes] [rows]
+"""
+
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from chain_analytics import ChainAnalytics
+from config import CHAIN_WALLS_TOP_N
+from option_chain_data import OPTION_FIELDS, OptionChain, oi_change_pct
+
+SPOT = 22000.0
+STEP = 50.0
+
+
+def make_chain(rng, strike_count: int) -> OptionChain:
+    strikes = SPOT + (np.arange(strike_count) - strike_count // 2) * STEP
+    sides = []
+    for _ in range(2):
+        side = {field: np.zeros(strike_count) for field in OPTION_FIELDS}
+        side["oi"] = rng.integers(0, 5e6, strike_count).astype(float)
+        side["prev_oi"] = np.maximum(side["oi"] * rng.normal(1, 0.15, strike_count), 0).round()
+        sides.append(side)
+    return OptionChain(strikes, sides[0], sides[1], SPOT)
+
+
+def python_stats(chain: OptionChain):
+    """Reference: max pain and walls with plain loops over the strikes"""
+    strikes = chain.strikes.tolist()
+    ce, pe = chain.ce["oi"].tolist(), chain.pe["oi"].tolist()
+    pain = [sum(c * max(s - k, 0) + p * max(k - s, 0) for k, c, p in zip(strikes, ce, pe))
+            for s in strikes]
+    max_pain = strikes[pain.index(min(pain))]
+    ce_walls = [k for k, oi in sorted(zip(strikes, ce), key=lambda x: -x[1])[:CHAIN_WALLS_TOP_N] if oi > 0]
+    pe_walls = [k for k, oi in sorted(zip(strikes, pe), key=lambda x: -x[1])[:CHAIN_WALLS_TOP_N] if oi > 0]
+    return pain, max_pain, ce_walls, pe_walls
+
+
+def scan_weakening(chain: OptionChain, price: float):
+    """Reference: the classifier's previous per-row near-spot scan"""
+    call_chg, put_chg = oi_change_pct(chain, chain.near_spot(price, 0.02))
+    return (bool(np.any((put_chg > 10) | (call_chg < -10))),
+            bool(np.any((call_chg > 10) | (put_chg < -10))))
+
+
+def main():
+    strike_count = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    rows = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    rng = np.random.default_rng(7)
+    chains = [make_chain(rng, strike_count) for _ in range(20)]
+    prices = rng.uniform(SPOT * 0.85, SPOT * 1.15, rows)
+
+    for chain in chains:
+        stats = ChainAnalytics(chain)
+        pain, max_pain, ce_walls, pe_walls = python_stats(chain)
+        assert np.allclose(stats.pain, pain, rtol=1e-12)
+        assert stats.max_pain == max_pain
+        assert stats.ce_walls.tolist() == ce_walls and stats.pe_walls.tolist() == pe_walls
+        for price in prices.tolist():
+            expected = scan_weakening(chain, price)
+            assert (stats.resistance_weakening(price), stats.support_weakening(price)) == expected
+    print(f"{len(chains)} chains x {strike_count} strikes, {rows} prices each")
+    print("  max pain, OI walls and weakening checks match the loop references")
+
+    chain = chains[0]
+    runs = []
+    for _ in range(200):
+        start = time.perf_counter()
+        ChainAnalytics(chain)
+        runs.append(time.perf_counter() - start)
+    vector_time = statistics.median(runs)
+
+    start = time.perf_counter()
+    for _ in range(5):
+        python_stats(chain)
+    loop_time = (time.perf_counter() - start) / 5
+
+    price_list = prices.tolist()
+    start = time.perf_counter()
+    for price in price_list:
+        scan_weakening(chain, price)
+    scan_time = time.perf_counter() - start
+
+    stats = ChainAnalytics(chain)
+    start = time.perf_counter()
+    for price in price_list:
+        stats.resistance_weakening(price)
+        stats.support_weakening(price)
+    cached_time = time.perf_counter() - start
+
+    print(f"  ChainAnalytics (one pass):  {vector_time * 1000:8.3f} ms median")
+    print(f"  Python max pain + walls:    {loop_time * 1000:8.3f} ms  ({loop_time / vector_time:.0f}x)")
+    print(f"  {rows} row confirmations, per-row scan:  {scan_time * 1000:7.2f} ms")
+    print(f"  {rows} row confirmations, cached:        {cached_time * 1000:7.2f} ms"
+          f"  ({scan_time / cached_time:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Row-wise vs. columnar bull/bear classification
+
+Checks that classify_frame_advanced / classify_frame_score give the same
+tags as classify_row_advanced / main.py's classify_row on synthetic scan
+frames (including zero/NaN edge cases), then times both paths.
+
+Usage: python benchmarks/bench_classifier.py
+"""
+
+import ast
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from data_processor import (classify_row_advanced, classify_frame_advanced,
+                            classify_frame_score, percent_change)
+
+
+def load_legacy_classify_row():
+    """Pull classify_row out of main.py without executing the Streamlit script"""
+    with open(os.path.join(ROOT, "main.py"), encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    func = next(n for n in tree.body if isinstance(n, ast.FunctionDef) and n.name == "classify_row")
+    namespace = {"percent_change": percent_change}
+    exec(compile(ast.Module(body=[func], type_ignores=[]), "main.py", "exec"), namespace)
+    return namespace["classify_row"]
+
+
+def make_frame(rows: int, seed: int = 7) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    prev_close = rng.uniform(50, 5000, rows)
+    current = prev_close * (1 + rng.normal(0, 0.03, rows))
+    oi_prev = rng.uniform(0, 1e7, rows)
+    df = pd.DataFrame({
+        "current_close": current,
+        "prev_close": prev_close,
+        "prev_week_high": prev_close * rng.uniform(0.97, 1.05, rows),
+        "prev_week_low": prev_close * rng.uniform(0.95, 1.03, rows),
+        "oi_prev": oi_prev,
+        "oi_current": oi_prev * (1 + rng.normal(0, 0.15, rows)),
+        "vol_20_avg": rng.uniform(0, 2e5, rows),
+        "vol_current": rng.uniform(0, 6e5, rows),
+    })
+    # Edge cases the scalar helpers special-case
+    df.loc[df.index[::50], "oi_prev"] = 0
+    df.loc[df.index[::70], "vol_20_avg"] = 0
+    df.loc[df.index[::90], "vol_current"] = np.nan
+    return df
+
+
+def same_tags(a: pd.Series, b: pd.Series) -> bool:
+    """Tag equality treating None/NaN alike (pandas 3 infers a str dtype for apply results)"""
+    return a.astype(object).where(a.notna(), None).equals(b.astype(object).where(b.notna(), None))
+
+
+def timed(fn, repeat: int = 3) -> tuple:
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000, result
+
+
+def main():
+    classify_row = load_legacy_classify_row()
+    for rows in (200, 2000, 20000):
+        df = make_frame(rows)
+        t_row, row_tags = timed(lambda: df.apply(lambda r: classify_row_advanced(r), axis=1))
+        t_vec, vec_tags = timed(lambda: classify_frame_advanced(df))
+        assert same_tags(row_tags, vec_tags), "advanced classifier mismatch"
+        s_row, row_scores = timed(lambda: df.apply(lambda r: classify_row(r, "daily"), axis=1))
+        s_vec, vec_scores = timed(lambda: classify_frame_score(df))
+        assert same_tags(row_scores, vec_scores), "score classifier mismatch"
+        print(f"{rows:6d} rows | advanced: apply {t_row:8.2f} ms, columnar {t_vec:6.2f} ms (x{t_row / t_vec:5.0f})"
+              f" | score: apply {s_row:8.2f} ms, columnar {s_vec:6.2f} ms (x{s_row / s_vec:5.0f})"
+              f" | bulls={int((vec_tags == 'bull').sum())} bears={int((vec_tags == 'bear').sum())}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Implied volatility and Greeks for a whole option chain
+
+Builds 100-strike chains for 4 weekly expiries with a volatility smile,
+prices rounded to the 0.05 tick, then:
+  - checks that repricing at the solved IV reproduces every LTP and that
+    the Greeks match finite differences of the price
+  - times option_greeks.chain_greeks on all 800 options at once against a
+    per-option scalar Newton/bisection loop
+
+Usage: python benchmarks/bench_greeks.py [strikes] [expiries]
+"""
+
+import math
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from option_chain_data import OPTION_FIELDS, OptionChain
+from option_greeks import bs_price, chain_greeks, greeks, years_to_expiry
+
+SPOT = 22000.0
+STEP = 50.0
+TICK = 0.05
+
+
+def make_chain(strikes: np.ndarray, t: float) -> OptionChain:
+    moneyness = np.log(strikes / SPOT)
+    smile = 0.13 + 0.6 * moneyness ** 2 - 0.1 * moneyness
+    sides = []
+    for is_call in (True, False):
+        side = {field: np.zeros(len(strikes)) for field in OPTION_FIELDS}
+        price = bs_price(SPOT, strikes, t, smile, is_call)
+        side["ltp"] = np.maximum(np.round(price / TICK) * TICK, TICK)
+        sides.append(side)
+    return OptionChain(strikes, sides[0], sides[1], SPOT)
+
+
+def scalar_iv(price, spot, strike, t, is_call, rate=0.065):
+    """Reference: one option at a time with math.erf"""
+    def cdf(x):
+        return 0.5 * math.erfc(-x / math.sqrt(2))
+    phi = 1.0 if is_call else -1.0
+    low, high, sigma = 1e-3, 5.0, 0.3
+    for _ in range(64):
+        vol_t = sigma * math.sqrt(t)
+        d1 = (math.log(spot / strike) + (rate + 0.5 * sigma * sigma) * t) / vol_t
+        d2 = d1 - vol_t
+        diff = phi * (spot * cdf(phi * d1) - strike * math.exp(-rate * t) * cdf(phi * d2)) - price
+        if abs(diff) < 1e-6:
+            return sigma
+        if diff > 0:
+            high = sigma
+        else:
+            low = sigma
+        vega = spot * math.exp(-0.5 * d1 * d1) / math.sqrt(2 * math.pi) * math.sqrt(t)
+        step = sigma - diff / vega if vega > 0 else low
+        sigma = step if low < step < high else 0.5 * (low + high)
+    return float("nan")
+
+
+def main():
+    strike_count = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    expiry_count = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    strikes = SPOT + (np.arange(strike_count) - strike_count // 2) * STEP
+    now = time.time()
+    expiries = [str(int(now) + (3 + 7 * i) * 86400) for i in range(expiry_count)]
+    chains = [(make_chain(strikes, years_to_expiry(e, now)), e) for e in expiries]
+    options = 2 * strike_count * expiry_count
+    print(f"{strike_count} strikes x {expiry_count} expiries = {options} options")
+
+    results = chain_greeks(chains, now)
+    solved = repriced_ok = 0
+    for (chain, _), res in zip(chains, results):
+        for side, is_call in ((chain.ce, True), (chain.pe, False)):
+            g = res["ce" if is_call else "pe"]
+            sigma = g["iv"] / 100
+            ok = np.isfinite(sigma)
+            solved += int(ok.sum())
+            price = bs_price(SPOT, chain.strikes, res["t"], sigma, is_call)
+            repriced_ok += int((np.abs(price - side["ltp"])[ok] < 1e-5).sum())
+            h = 0.01
+            up = bs_price(SPOT + h, chain.strikes, res["t"], sigma, is_call)
+            down = bs_price(SPOT - h, chain.strikes, res["t"], sigma, is_call)
+            assert np.allclose(g["delta"][ok], ((up - down) / (2 * h))[ok], atol=1e-6)
+            bumped = bs_price(SPOT, chain.strikes, res["t"], sigma + 1e-5, is_call)
+            assert np.allclose(g["vega"][ok], ((bumped - price) / 1e-3)[ok], atol=1e-3)
+    assert repriced_ok == solved
+    print(f"  solved {solved}/{options}; the rest are quoted at or below intrinsic"
+          f" / min tick, where no volatility fits")
+    print("  repricing at solved IV matches LTP; delta and vega match finite differences")
+
+    runs = []
+    for _ in range(200):
+        start = time.perf_counter()
+        chain_greeks(chains, now)
+        runs.append(time.perf_counter() - start)
+    vector_time = statistics.median(runs)
+
+    start = time.perf_counter()
+    for (chain, expiry), res in zip(chains, results):
+        t = res["t"]
+        for side, is_call in ((chain.ce, True), (chain.pe, False)):
+            for strike, price in zip(chain.strikes.tolist(), side["ltp"].tolist()):
+                sigma = scalar_iv(price, SPOT, strike, t, is_call)
+                greeks(SPOT, strike, t, sigma, is_call)
+    scalar_time = time.perf_counter() - start
+
+    print(f"  chain_greeks (one batch): {vector_time * 1000:7.2f} ms median")
+    print(f"  per-option scalar loop:   {scalar_time * 1000:7.2f} ms  ({scalar_time / vector_time:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
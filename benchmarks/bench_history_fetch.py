@@ -0,0 +1,52 @@
+"""
+Scan wall-clock: serial vs. concurrent history fetch
+
+Runs build_df_from_quotes over SCAN_SYMBOLS against the local stand-in
+server, once with a single worker (the old serial path) and once with
+the configured worker pool.
+
+Usage: python benchmarks/bench_history_fetch.py [latency_seconds]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import SCAN_SYMBOLS, HISTORY_FETCH_WORKERS
+from data_processor import build_df_from_quotes
+from fyers_client import FyersClient
+from mock_fyers_server import start_mock_server
+from rate_limiter import RequestScheduler
+
+
+def time_scan(client: FyersClient, workers: int) -> tuple:
+    start = time.perf_counter()
+    quotes = client.fetch_quotes(SCAN_SYMBOLS)
+    df = build_df_from_quotes(quotes, client, max_workers=workers)
+    return time.perf_counter() - start, len(df)
+
+
+def main():
+    latency = float(sys.argv[1]) if len(sys.argv) > 1 else 0.1
+    server, base_url = start_mock_server(latency=latency)
+    client = FyersClient(client_id="BENCH-100", access_token="token")
+    client.base_url = base_url
+    client.scheduler = RequestScheduler({})  # Time the fetch path, not Fyers rate limits
+
+    try:
+        time_scan(client, HISTORY_FETCH_WORKERS)  # warm the server's canned responses
+        print(f"Symbols: {len(SCAN_SYMBOLS)} | simulated latency: {latency * 1000:.0f} ms/request")
+        serial, rows = time_scan(client, 1)
+        print(f"  serial (1 worker):       {serial:7.2f} s  ({rows} rows)")
+        for workers in sorted({4, HISTORY_FETCH_WORKERS, 16}):
+            elapsed, rows = time_scan(client, workers)
+            print(f"  concurrent ({workers:2d} workers): {elapsed:7.2f} s  ({rows} rows)  "
+                  f"speedup x{serial / elapsed:.1f}")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
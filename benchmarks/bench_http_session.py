@@ -0,0 +1,72 @@
+"""
+Per-call latency: bare requests.get vs. FyersClient's pooled session
+
+Hits the /api/v3/funds endpoint of a local HTTPS stand-in server. The
+bare path rebuilds headers and opens a new TCP+TLS connection per call
+(the old FyersClient behaviour); the pooled path reuses keep-alive
+connections from FyersClient.session.
+
+Usage: python benchmarks/bench_http_session.py [calls]
+"""
+
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fyers_client import FyersClient
+from mock_fyers_server import make_self_signed_cert, start_mock_server
+from rate_limiter import RequestScheduler
+
+
+def measure(call, calls: int) -> list:
+    samples = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        call()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def report(label: str, samples: list):
+    samples = sorted(samples)
+    p95 = samples[int(len(samples) * 0.95) - 1]
+    print(f"  {label:<22} mean {statistics.mean(samples):6.2f} ms | "
+          f"median {statistics.median(samples):6.2f} ms | p95 {p95:6.2f} ms")
+
+
+def main():
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    with tempfile.TemporaryDirectory() as tmp:
+        certfile, keyfile = make_self_signed_cert(tmp)
+        server, base_url = start_mock_server(latency=0, certfile=certfile, keyfile=keyfile)
+        client = FyersClient(client_id="BENCH-100", access_token="token")
+        client.base_url = base_url
+        client.scheduler = RequestScheduler({})  # Don't pace the stand-in
+        client.session.verify = certfile
+        client.session.trust_env = False  # REQUESTS_CA_BUNDLE would override verify
+        url = f"{base_url}/api/v3/funds"
+
+        def bare_call():
+            headers = {"Authorization": f"{client.client_id}:{client.access_token}"}
+            resp = requests.get(url, headers=headers, timeout=10, verify=certfile)
+            resp.raise_for_status()
+            return resp.json()
+
+        try:
+            assert client.fetch_funds().get("s") == "ok", "stand-in server unreachable"
+            print(f"{calls} calls against {base_url}")
+            report("bare requests.get", measure(bare_call, calls))
+            report("pooled session", measure(client.fetch_funds, calls))
+        finally:
+            client.close()
+            server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Incremental indicator engine vs. recomputing from 30 days of candles
+
+1. Equivalence: random candle streams, fed in random chunks with the last
+   candle revised between refreshes, must give the same vol_20_avg and
+   weekly high/low as slicing the full history (the old scanner code).
+2. CPU per refresh: each symbol gains one candle; the old path rescans its
+   full history, the engine takes the new candle and reads its state.
+3. End to end: build_df_from_quotes against the stand-in server, cold and
+   then warm, reporting history bytes transferred.
+
+Usage: python benchmarks/bench_indicators.py [symbols] [candles]
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from candle_data import to_candles
+from config import SCAN_SYMBOLS
+from data_processor import build_df_from_quotes
+from fyers_client import FyersClient
+from indicators import IndicatorEngine
+from mock_fyers_server import make_candles, start_mock_server
+from rate_limiter import RequestScheduler
+
+
+def full_recompute(candles):
+    """The pre-engine computation from build_df_from_quotes"""
+    if len(candles) < 20:
+        return None
+    vol_20_avg = sum(c[5] for c in candles[-20:]) / 20
+    return vol_20_avg, max(c[2] for c in candles[-288:]), min(c[3] for c in candles[-288:])
+
+
+def check_equivalence(trials: int = 300):
+    rng = random.Random(3)
+    for _ in range(trials):
+        candles = make_candles("X", rng.randint(1, 1500), start_ts=1700000000)
+        engine = IndicatorEngine()
+        i = 0
+        while i < len(candles):
+            j = min(len(candles), i + rng.choice([rng.randint(1, 40), rng.randint(1, 700)]))
+            seen = candles[:j]
+            # Refetch from the last seen timestamp, with the last candle still forming
+            revised = [list(c) for c in seen[i - 1 if i else 0:]]
+            revised[-1][5] *= rng.uniform(0.5, 1.0)
+            engine.update("X", revised[:-1] + [revised[-1]])
+            engine.update("X", seen[-1:])
+            expected = full_recompute(seen)
+            got = engine.values("X")
+            assert (expected is None) == (got is None), (expected, got)
+            if expected is not None:
+                assert all(abs(a - b) <= 1e-6 * max(1.0, abs(a)) for a, b in zip(expected, got)), (expected, got)
+            i = j
+    print(f"equivalence: {trials} random streams match the full recompute")
+
+
+def bench_cpu(symbols: int, count: int, refreshes: int = 20):
+    histories = {f"S{i}": make_candles(f"S{i}", count + refreshes) for i in range(symbols)}
+    arrays = {s: to_candles(candles) for s, candles in histories.items()}
+    engine = IndicatorEngine()
+    for s, candles in arrays.items():
+        engine.update(s, candles[:count])
+
+    start = time.perf_counter()
+    for r in range(refreshes):
+        for candles in histories.values():
+            full_recompute(candles[:count + r + 1])
+    old = (time.perf_counter() - start) / refreshes
+
+    start = time.perf_counter()
+    for r in range(refreshes):
+        for s, candles in arrays.items():
+            engine.update(s, candles[count + r:count + r + 1])
+            engine.values(s)
+    new = (time.perf_counter() - start) / refreshes
+    print(f"CPU per refresh, {symbols} symbols x {count} candles:")
+    print(f"  full recompute: {old * 1000:8.2f} ms")
+    print(f"  incremental:    {new * 1000:8.2f} ms  ({old / new:.0f}x)")
+
+
+def bench_end_to_end(count: int):
+    server, base_url = start_mock_server(latency=0.0, candle_count=count)
+    try:
+        client = FyersClient(client_id="BENCH-100", access_token="token")
+        client.base_url = base_url
+        client.scheduler = RequestScheduler({})
+        quotes = client.fetch_quotes(SCAN_SYMBOLS)
+        engine = IndicatorEngine()
+        print(f"build_df_from_quotes, {len(SCAN_SYMBOLS)} symbols, no candle store:")
+        for label in ("cold", "warm"):
+            before = server.bytes_sent
+            start = time.perf_counter()
+            df = build_df_from_quotes(quotes, client, engine=engine)
+            elapsed = time.perf_counter() - start
+            print(f"  {label}: {elapsed * 1000:7.1f} ms  {(server.bytes_sent - before) / 1024:8.1f} KiB history"
+                  f"  ({len(df)} rows)")
+    finally:
+        server.shutdown()
+
+
+def main():
+    symbols = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    check_equivalence()
+    bench_cpu(symbols, count)
+    bench_end_to_end(count)
+
+
+if __name__ == "__main__":
+    main()
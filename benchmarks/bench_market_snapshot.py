@@ -0,0 +1,89 @@
+"""
+Per-session pipelines vs. one shared market snapshot
+
+Simulates concurrent dashboard sessions rerendering the Bull/Bear page
+(sector quotes + bull/bear scan) against the local stand-in server, first
+with every session running its own fetch -> build -> classify pipeline,
+then with all sessions reading the process-wide MarketRefresher snapshot.
+Reports upstream requests and process CPU time for each.
+
+Option chains go through the fyers SDK and are not exercised here.
+
+Usage: python benchmarks/bench_market_snapshot.py [sessions] [reruns]
+"""
+
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import SCAN_SYMBOLS, SECTOR_INDICES
+from data_processor import build_sector_df
+from fyers_client import FyersClient
+from market_snapshot import MarketRefresher
+from mock_fyers_server import start_mock_server
+from rate_limiter import RequestScheduler
+from response_cache import ResponseCache
+from scanner import run_scan
+
+
+def make_client(base_url: str) -> FyersClient:
+    client = FyersClient(client_id="BENCH-100", access_token="token", cache=ResponseCache())
+    client.base_url = base_url
+    client.scheduler = RequestScheduler({})  # Count calls, don't pace them
+    return client
+
+
+def per_session(client: FyersClient, reruns: int):
+    for _ in range(reruns):
+        build_sector_df(client.fetch_quotes(list(SECTOR_INDICES.values())))
+        run_scan(client, SCAN_SYMBOLS)
+        time.sleep(0.5)
+
+
+def shared(refresher: MarketRefresher, reruns: int):
+    for _ in range(reruns):
+        snapshot = refresher.wait_for(lambda s: s.scan is not None)
+        assert not snapshot.sectors.empty and not snapshot.scan.df.empty
+        time.sleep(0.5)
+
+
+def measure(server, target, args_list) -> tuple:
+    before = server.request_count
+    cpu, wall = time.process_time(), time.perf_counter()
+    threads = [threading.Thread(target=target, args=args) for args in args_list]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return server.request_count - before, time.process_time() - cpu, time.perf_counter() - wall
+
+
+def main():
+    sessions = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    reruns = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    server, base_url = start_mock_server(latency=0.02, candle_count=500)
+    try:
+        print(f"{sessions} sessions x {reruns} reruns of the Bull/Bear page")
+
+        client = make_client(base_url)
+        calls, cpu, wall = measure(server, per_session, [(client, reruns)] * sessions)
+        print(f"  per-session pipeline: {calls:6d} upstream calls  {cpu:6.2f} s CPU  {wall:6.2f} s wall")
+
+        client = make_client(base_url)
+        refresher = MarketRefresher(client, interval=2)
+        refresher.start()
+        try:
+            calls, cpu, wall = measure(server, shared, [(refresher, reruns)] * sessions)
+        finally:
+            refresher.stop()
+        print(f"  shared snapshot:      {calls:6d} upstream calls  {cpu:6.2f} s CPU  {wall:6.2f} s wall"
+              f"  (v{refresher.snapshot().version})")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
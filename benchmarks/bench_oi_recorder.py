@@ -0,0 +1,149 @@
+"""
+Intraday OI history: footprint and query speed of oi_recorder
+
+Simulates a full session (375 one-minute snapshots) of 100-strike chains
+for NIFTY50 / BANKNIFTY / FINNIFTY, with the strike window following a
+random-walk spot and OI drifting every minute. Then:
+  - checks 30-minute OI-change queries (±2% of spot) against a plain
+    per-snapshot reference, and that a fresh recorder replaying the
+    on-disk log answers identically
+  - reports memory and disk use against keeping every snapshot as
+    float64 arrays or as the raw JSON responses
+  - times record() and the query
+
+Usage: python benchmarks/bench_oi_recorder.py [strikes] [snapshots]
+"""
+
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from option_chain_data import OPTION_FIELDS, OptionChain
+from oi_recorder import OIRecorder
+from resampler import IST_OFFSET
+
+INDICES = {"NIFTY50": (22000.0, 50.0), "BANKNIFTY": (48000.0, 100.0), "FINNIFTY": (21000.0, 50.0)}
+EXPIRY = "2026-10-22"
+
+
+def simulate(seed: int, spot: float, step: float, strike_count: int, snapshots: int):
+    """Yield (spot, strikes, ce_oi, pe_oi) per minute"""
+    rng = np.random.default_rng(seed)
+    oi = {}
+    for _ in range(snapshots):
+        spot *= 1 + rng.normal(0, 0.0008)
+        atm = round(spot / step) * step
+        strikes = atm + (np.arange(strike_count) - strike_count // 2) * step
+        ce, pe = [], []
+        for k in strikes.tolist():
+            c, p = oi.get(k, (rng.integers(1e4, 5e6), rng.integers(1e4, 5e6)))
+            c = max(0, c + int(rng.normal(0, 0.01) * c))
+            p = max(0, p + int(rng.normal(0, 0.01) * p))
+            oi[k] = (c, p)
+            ce.append(c)
+            pe.append(p)
+        yield spot, strikes, np.array(ce, dtype=float), np.array(pe, dtype=float)
+
+
+def make_chain(spot, strikes, ce_oi, pe_oi) -> OptionChain:
+    ce = {f: np.zeros(len(strikes)) for f in OPTION_FIELDS}
+    pe = {f: np.zeros(len(strikes)) for f in OPTION_FIELDS}
+    ce["oi"], pe["oi"] = ce_oi, pe_oi
+    return OptionChain(strikes, ce, pe, spot)
+
+
+def reference_change(history, now, minutes, pct):
+    """OI change per strike from plain snapshots, with the recorder's carry-forward rules"""
+    times = [h[0] for h in history]
+    start = max(int(np.searchsorted(times, now - minutes * 60, side="right")) - 1, 0)
+    spot = history[-1][1]
+
+    def as_of(i):
+        seen = {}
+        for _, _, strikes, ce, pe in history[:i + 1]:
+            for k, c, p in zip(strikes.tolist(), ce.tolist(), pe.tolist()):
+                seen[k] = (c, p)
+        first = {}
+        for _, _, strikes, ce, pe in reversed(history):
+            for k, c, p in zip(strikes.tolist(), ce.tolist(), pe.tolist()):
+                first[k] = (c, p)
+        return {k: seen.get(k, first[k]) for k in first}
+
+    old, new = as_of(start), as_of(len(history) - 1)
+    band = abs(spot) * pct
+    return {k: (new[k][0] - old[k][0], new[k][1] - old[k][1])
+            for k in sorted(new) if spot - band <= k <= spot + band}
+
+
+def main():
+    strike_count = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    snapshots = int(sys.argv[2]) if len(sys.argv) > 2 else 375
+    # Today's 09:15 IST session open, so a new recorder replays the log on start
+    now = time.time()
+    t0 = int(now - (now + IST_OFFSET) % 86400) + 9 * 3600 + 15 * 60
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "oi.sqlite3")
+        recorder = OIRecorder(path=path, retention_days=10 ** 5)
+        history = {name: [] for name in INDICES}
+        json_bytes = 0
+        record_times = []
+        for seed, (name, (spot, step)) in enumerate(INDICES.items()):
+            for minute, (s, strikes, ce, pe) in enumerate(simulate(seed, spot, step, strike_count, snapshots)):
+                ts = t0 + minute * 60
+                history[name].append((ts, s, strikes, ce, pe))
+                json_bytes += len(json.dumps({"optionsChain": [
+                    {"strike_price": k, "option_type": t, "oi": int(v)}
+                    for k, c, p in zip(strikes.tolist(), ce.tolist(), pe.tolist())
+                    for t, v in (("CE", c), ("PE", p))]}))
+                start = time.perf_counter()
+                recorder.record(name, EXPIRY, make_chain(s, strikes, ce, pe), ts=ts)
+                record_times.append(time.perf_counter() - start)
+
+        now = t0 + (snapshots - 1) * 60
+        for name in INDICES:
+            for minutes in (5, 30, 120):
+                df = recorder.oi_change(name, EXPIRY, minutes=minutes, now=now)
+                expected = reference_change(history[name], now, minutes, 0.02)
+                assert list(df["Strike"]) == list(expected), name
+                assert all(df["CE OI Chg"] == [v[0] for v in expected.values()]), name
+                assert all(df["PE OI Chg"] == [v[1] for v in expected.values()]), name
+        print(f"{len(INDICES)} indices x {snapshots} one-minute snapshots x {strike_count} strikes")
+        print("  30/5/120-minute ±2% OI changes match the per-snapshot reference")
+
+        query_times = []
+        for _ in range(200):
+            start = time.perf_counter()
+            recorder.oi_change("NIFTY50", EXPIRY, minutes=30, now=now)
+            query_times.append(time.perf_counter() - start)
+
+        memory = sum(recorder.series(name, EXPIRY).nbytes for name in INDICES)
+        recorder.close()
+
+        replayed = OIRecorder(path=path, retention_days=10 ** 5)
+        for name in INDICES:
+            a = replayed.oi_change(name, EXPIRY, minutes=30, now=now)
+            b = reference_change(history[name], now, 30, 0.02)
+            assert list(a["CE OI Chg"]) == [v[0] for v in b.values()], name
+            assert list(a["PE OI Chg"]) == [v[1] for v in b.values()], name
+        replayed.close()
+        print("  a new recorder replaying the on-disk log answers identically")
+
+        disk = os.path.getsize(path)
+        raw = sum(len(h[2]) * 3 * 8 for rows in history.values() for h in rows)
+        print(f"  in memory (int32 deltas): {memory / 1024:8.1f} KiB")
+        print(f"  on disk (packed deltas):  {disk / 1024:8.1f} KiB")
+        print(f"  float64 snapshots:        {raw / 1024:8.1f} KiB")
+        print(f"  raw JSON responses:       {json_bytes / 1024:8.1f} KiB")
+        print(f"  record(): {statistics.median(record_times) * 1000:.2f} ms median (incl. SQLite commit)")
+        print(f"  30-minute ±2% query: {statistics.median(query_times) * 1000:.3f} ms median")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Serial vs. concurrent loading of the option chain term structure
+
+Fetches NIFTY50 / BANKNIFTY / FINNIFTY x the next four expiries from the
+stand-in server (with per-request latency), once one chain at a time as the
+page used to and once through load_option_chains, then prints the
+cross-expiry summary built from the result.
+
+Usage: python benchmarks/bench_option_chains.py [latency_seconds] [strikes]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+from data_processor import build_term_structure_df, load_option_chains
+from fyers_client import FyersClient
+from mock_fyers_server import start_mock_server
+from option_chain_data import OptionChain
+from rate_limiter import RequestScheduler
+
+INDICES = ["NIFTY50", "BANKNIFTY", "FINNIFTY"]
+
+
+def main():
+    latency = float(sys.argv[1]) if len(sys.argv) > 1 else 0.25
+    strikes = int(sys.argv[2]) if len(sys.argv) > 2 else 40
+    server, base_url = start_mock_server(latency=latency)
+    try:
+        client = FyersClient(client_id="BENCH-100", access_token="token")
+        client.base_url = base_url
+        client.scheduler = RequestScheduler({})
+        # Expiries as listed by each index's nearest chain, as the option chain page does
+        nearest, _ = load_option_chains(client, [(symbol, "", strikes) for symbol in INDICES])
+        keys = [(symbol, expiry, strikes) for (symbol, _, _), chain in nearest.items() for expiry in chain.expiries]
+        print(f"{len(keys)} chains ({len(INDICES)} indices x 4 expiries, {strikes} strikes),"
+              f" {latency * 1000:.0f} ms per request")
+
+        start = time.perf_counter()
+        serial = {key: OptionChain.from_response(client.fetch_option_chain(*key)) for key in keys}
+        serial_time = time.perf_counter() - start
+
+        before = server.request_count
+        start = time.perf_counter()
+        chains, errors = load_option_chains(client, keys)
+        batch_time = time.perf_counter() - start
+        assert not errors and len(chains) == len(serial) == len(keys), errors
+
+        print(f"  serial fetch + parse:         {serial_time * 1000:7.0f} ms")
+        print(f"  load_option_chains (+Greeks): {batch_time * 1000:7.0f} ms"
+              f"  ({server.request_count - before} requests, {serial_time / batch_time:.1f}x)")
+
+        start = time.perf_counter()
+        term = build_term_structure_df(chains)
+        print(f"  term structure summary:       {(time.perf_counter() - start) * 1000:7.1f} ms\n")
+        with pd.option_context("display.width", 160, "display.max_columns", 20):
+            print(term.round(2).to_string(index=False))
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Multi-timeframe bars from one base resolution
+
+Builds 30 sessions of 5-minute candles (with pre-open/post-close rows that
+must be dropped) for many symbols, checks resampler output against a
+pandas resample anchored to the NSE session, then times:
+  - pandas resample per symbol per timeframe
+  - resampler.resample (vectorized reduceat)
+  - TimeframeCache refresh: one new candle per symbol, then either all four
+    timeframes read or only the previous day/week bars (what the scan reads)
+
+Usage: python benchmarks/bench_resampler.py [symbols] [sessions]
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from candle_data import empty_candles
+from resampler import TIMEFRAMES, TimeframeCache, resample
+
+PANDAS_RULES = {
+    "15": dict(rule="15min", origin="start_day", offset="9h15min"),
+    "60": dict(rule="60min", origin="start_day", offset="9h15min"),
+    "D": dict(rule="1D"),
+    "W": dict(rule="W-SUN", label="left", closed="left"),
+}
+AGG = {"open": "first", "high": "max", "low": "min", "close": "last", "volume": "sum"}
+
+
+def make_sessions(seed: int, sessions: int) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    days = pd.bdate_range(end="2026-09-25", periods=sessions)
+    # 09:00 to 15:35 so out-of-session rows are present
+    offsets = np.arange(80) * 300 + 9 * 3600
+    ts = (np.array([pd.Timestamp(d.date(), tz="Asia/Kolkata").timestamp() for d in days], dtype=np.int64)[:, None]
+          + offsets).ravel()
+    candles = empty_candles(len(ts))
+    candles["ts"] = ts
+    price = 1000 + np.cumsum(rng.normal(0, 1, len(ts)))
+    candles["open"] = price
+    candles["close"] = price + rng.normal(0, 1, len(ts))
+    candles["high"] = np.maximum(candles["open"], candles["close"]) + 1
+    candles["low"] = np.minimum(candles["open"], candles["close"]) - 1
+    candles["volume"] = rng.integers(1, 100000, len(ts))
+    return candles
+
+
+def pandas_resample(candles: np.ndarray, timeframe: str) -> pd.DataFrame:
+    df = pd.DataFrame(candles)
+    df.index = pd.DatetimeIndex(pd.to_datetime(df["ts"], unit="s", utc=True)).tz_convert("Asia/Kolkata")
+    df = df.between_time("09:15", "15:29:59")
+    return df.resample(**PANDAS_RULES[timeframe]).agg(AGG).dropna()
+
+
+def main():
+    symbols = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    sessions = int(sys.argv[2]) if len(sys.argv) > 2 else 30
+    data = [make_sessions(i, sessions) for i in range(symbols)]
+    print(f"{symbols} symbols x {sessions} sessions of 5-minute candles -> {', '.join(TIMEFRAMES)}")
+
+    for tf in TIMEFRAMES:
+        ours, ref = resample(data[0], tf), pandas_resample(data[0], tf)
+        assert len(ours) == len(ref) and all(np.allclose(ours[f], ref[f]) for f in AGG), tf
+    print("  matches pandas session-anchored resample")
+
+    start = time.perf_counter()
+    for candles in data:
+        for tf in TIMEFRAMES:
+            pandas_resample(candles, tf)
+    pandas_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for candles in data:
+        for tf in TIMEFRAMES:
+            resample(candles, tf)
+    numpy_time = time.perf_counter() - start
+
+    def refresh(read):
+        cache = TimeframeCache(retention_days=sessions * 2)
+        for i, candles in enumerate(data):
+            cache.update(str(i), candles[:-3])
+            for tf in TIMEFRAMES:
+                cache.bars(str(i), tf)
+        now = int(data[0]["ts"][-1])
+        start = time.perf_counter()
+        for i, candles in enumerate(data):
+            cache.update(str(i), candles[-4:-1])  # Refetched forming candle + new ones
+            read(cache, str(i), now)
+        elapsed = time.perf_counter() - start
+        # Lazily refreshed bars must equal a full resample
+        for tf in TIMEFRAMES:
+            assert np.array_equal(cache.bars("0", tf), resample(data[0][:-1], tf)), tf
+        return elapsed
+
+    all_time = refresh(lambda cache, sym, now: [cache.bars(sym, tf) for tf in TIMEFRAMES])
+    prev_time = refresh(lambda cache, sym, now: (cache.previous_bar(sym, "D", now),
+                                                 cache.previous_bar(sym, "W", now)))
+
+    print(f"  pandas resample:        {pandas_time * 1000:8.1f} ms")
+    print(f"  vectorized resample:    {numpy_time * 1000:8.1f} ms  ({pandas_time / numpy_time:.0f}x)")
+    print(f"  refresh, read all 4:    {all_time * 1000:8.1f} ms")
+    print(f"  refresh, prev D/W bars: {prev_time * 1000:8.1f} ms")
+    print(f"  extra history calls for D/W bars: 0 (vs {2 * symbols} fetching those resolutions)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Upstream quote calls with and without the shared response cache
+
+Simulates concurrent dashboard sessions polling overlapping symbol sets
+(sector indices, the scan list and small watchlists) against the local
+stand-in server and reports how many /data/quotes requests reached it.
+
+Usage: python benchmarks/bench_response_cache.py [users] [rounds]
+"""
+
+import os
+import random
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import SCAN_SYMBOLS, SECTOR_INDICES
+from fyers_client import FyersClient
+from mock_fyers_server import start_mock_server
+from rate_limiter import RequestScheduler
+from response_cache import ResponseCache
+
+
+def user_session(client: FyersClient, seed: int, rounds: int):
+    rng = random.Random(seed)
+    watchlist = rng.sample(SCAN_SYMBOLS, 5)
+    for _ in range(rounds):
+        client.fetch_quotes(list(SECTOR_INDICES.values()))
+        client.fetch_quotes(SCAN_SYMBOLS)
+        client.fetch_quotes(watchlist)
+        time.sleep(rng.uniform(0.05, 0.15))
+
+
+def run(server, base_url: str, users: int, rounds: int, cache) -> tuple:
+    client = FyersClient(client_id="BENCH-100", access_token="token", cache=cache)
+    client.base_url = base_url
+    client.scheduler = RequestScheduler({})  # Count calls, don't pace them
+    before = server.request_count
+    start = time.perf_counter()
+    threads = [threading.Thread(target=user_session, args=(client, i, rounds)) for i in range(users)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return server.request_count - before, time.perf_counter() - start
+
+
+def main():
+    users = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    server, base_url = start_mock_server(latency=0.05)
+    try:
+        print(f"{users} sessions x {rounds} rounds x 3 quote requests = {users * rounds * 3} lookups")
+        calls, elapsed = run(server, base_url, users, rounds, None)
+        print(f"  no cache:   {calls:5d} upstream calls  {elapsed:5.2f} s")
+        cache = ResponseCache()
+        calls, elapsed = run(server, base_url, users, rounds, cache)
+        print(f"  with cache: {calls:5d} upstream calls  {elapsed:5.2f} s")
+        print(f"  cache stats: {cache.stats()}")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
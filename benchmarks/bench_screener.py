@@ -0,0 +1,126 @@
+"""
+Screener: configured screens as compiled column expressions
+
+On synthetic scan frames:
+  - checks a few configured screens against hand-written pandas masks
+  - times compiling SCREENS / SCREEN_VALUES
+  - times tagging every configured screen, and 48 screens (the configured
+    ones plus threshold variants), in one shared pass vs. one pass per
+    screen (each screen in its own ScreenSet, so nothing is shared)
+    vs. evaluating each screen's expression row by row with Python eval
+
+Usage: python benchmarks/bench_screener.py [rows ...]
+"""
+
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import SCREEN_VALUES, SCREENS
+from screener import ScreenSet, screen_tags
+
+
+def make_frame(rows: int, seed: int = 11) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    prev_close = rng.uniform(50, 5000, rows)
+    oi_prev = rng.uniform(1e4, 1e7, rows)
+    return pd.DataFrame({
+        "current_close": prev_close * (1 + rng.normal(0, 0.03, rows)),
+        "open": prev_close * (1 + rng.normal(0, 0.01, rows)),
+        "prev_close": prev_close,
+        "prev_day_high": prev_close * rng.uniform(1.0, 1.02, rows),
+        "prev_day_low": prev_close * rng.uniform(0.98, 1.0, rows),
+        "prev_week_high": prev_close * rng.uniform(0.97, 1.05, rows),
+        "prev_week_low": prev_close * rng.uniform(0.95, 1.03, rows),
+        "oi_prev": oi_prev,
+        "oi_current": oi_prev * (1 + rng.normal(0, 0.15, rows)),
+        "iv_prev_high": rng.uniform(10, 40, rows),
+        "iv_current": rng.uniform(10, 45, rows),
+        "vol_20_avg": rng.uniform(1e3, 2e5, rows),
+        "vol_current": rng.uniform(0, 6e5, rows),
+    })
+
+
+def variants() -> dict:
+    """The configured screens plus threshold variants, 48 in all"""
+    screens = dict(SCREENS)
+    for k in range(48 - len(screens)):
+        screens[f"variant_{k}"] = (f"price_chg > {k % 6 * 0.5} and vol_ratio >= {1 + k % 4 * 0.5} "
+                                   f"and oi_chg > {k % 3 * 5} and bull_score >= {k % 5}")
+    return screens
+
+
+def row_wise(df: pd.DataFrame, screens: dict) -> pd.DataFrame:
+    """Each expression (compiled to Python bytecode once) evaluated per row over that row's fields"""
+    values = {name: compile(expr, name, "eval") for name, expr in SCREEN_VALUES.items()}
+    codes = {name: compile(expr, name, "eval") for name, expr in screens.items()}
+    pct = lambda old, new: 0.0 if old == 0 else (new - old) / abs(old) * 100.0
+
+    def score(x, *steps):
+        return next((p for t, p in zip(steps[0::2], steps[1::2]) if x > t), 0)
+
+    out = {name: [] for name in screens}
+    for r in df.itertuples(index=False):
+        env = {"ltp": r.current_close, "open": r.open, "prev_close": r.prev_close,
+               "prev_day_high": r.prev_day_high, "prev_day_low": r.prev_day_low,
+               "prev_week_high": r.prev_week_high, "prev_week_low": r.prev_week_low,
+               "price_chg": pct(r.prev_close, r.current_close), "gap_pct": pct(r.prev_close, r.open),
+               "vol_ratio": r.vol_current / r.vol_20_avg if r.vol_20_avg > 0 else 0.0,
+               "oi_chg": pct(r.oi_prev, r.oi_current), "iv_chg": pct(r.iv_prev_high, r.iv_current),
+               "score": score, "abs": abs}
+        for name, code in values.items():
+            env[name] = eval(code, {}, env)
+        for name, code in codes.items():
+            env[name] = bool(eval(code, {}, env))
+            out[name].append(env[name])
+    return pd.DataFrame(out, index=df.index)
+
+
+def timed(fn, runs: int = 5):
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times), result
+
+
+def main():
+    row_counts = [int(a) for a in sys.argv[1:]] or [2000, 20000]
+    compile_time, _ = timed(lambda: ScreenSet(SCREENS, SCREEN_VALUES))
+    many = variants()
+    shared = ScreenSet(many, SCREEN_VALUES)
+    separate = [ScreenSet({name: expr for name, expr in many.items() if name == own or name in SCREENS},
+                          SCREEN_VALUES) for own in many]
+    print(f"compile {len(SCREENS)} screens + {len(SCREEN_VALUES)} values: {compile_time * 1000:.2f} ms")
+
+    for rows in row_counts:
+        df = make_frame(rows)
+        tags = screen_tags(df)
+        pwh, pwl = df["prev_week_high"], df["prev_week_low"]
+        assert tags["gap_up"].equals(df["open"] > df["prev_day_high"])
+        assert tags["near_week_high"].equals((pwh * 0.99 <= df["current_close"]) & (df["current_close"] <= pwh))
+        assert tags["near_week_low"].equals((pwl <= df["current_close"]) & (df["current_close"] <= pwl * 1.01))
+
+        configured, _ = timed(lambda: screen_tags(df))
+        one_pass, result = timed(lambda: shared.evaluate(df))
+        per_screen, _ = timed(lambda: [s.evaluate(df, [name]) for s, name in zip(separate, many)])
+        sample = df.iloc[:500]
+        python, expected = timed(lambda: row_wise(sample, many), runs=1)
+        assert result.iloc[:500].equals(expected), "compiled screens differ from row-wise eval"
+        python *= rows / len(sample)
+        print(f"{rows} rows (compiled screens match row-wise eval)")
+        print(f"  {len(SCREENS)} configured screens, one pass: {configured * 1000:8.2f} ms")
+        print(f"  {len(many)} screens, one shared pass:     {one_pass * 1000:8.2f} ms")
+        print(f"  {len(many)} screens, one pass each:       {per_screen * 1000:8.2f} ms")
+        print(f"  {len(many)} screens, row-wise eval:       {python * 1000:8.0f} ms (from 500 rows)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+Symbol master: CSV parsing vs. the compiled, memory-mapped table
+
+Writes NSE_CM / NSE_FO style CSVs in the Fyers symbol master layout
+(equities, indices, and futures plus a strike ladder of options for every
+F&O underlying), compiles them once, then:
+  - checks short name, sector and lot size of every instrument
+  - times opening the compiled master in fresh processes against parsing
+    the CSVs with pandas
+  - times resolving the short name and sector of 2,000 quote tickers:
+    string splitting + dict, per-ticker id_of, and batched ids_of
+
+Usage: python benchmarks/bench_symbol_master.py [equities] [fo_underlyings]
+"""
+
+import csv
+import multiprocessing
+import os
+import random
+import statistics
+import string
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from symbol_master import SymbolMaster, compile_symbol_master, read_instruments
+
+SECTORS = ["IT", "Private Bank", "Pharma", "Auto", "Metal", "FMCG"]
+
+
+def write_csvs(directory: str, equities: int, fo_count: int, rng: random.Random):
+    """Fyers-layout CSVs; returns (paths, expected {ticker: (short, sector, lot)}, sector_map)"""
+    names = set()
+    while len(names) < equities:
+        names.add("".join(rng.choice(string.ascii_uppercase) for _ in range(rng.randint(3, 10))))
+    names = sorted(names)
+    sector_map = {n: rng.choice(SECTORS) for n in names[: equities // 2]}
+    expected = {}
+
+    def row(name, ticker, lot, expiry="", underlying="", strike="", option_type="XX"):
+        cells = [""] * 21
+        cells[0], cells[1], cells[3], cells[4] = str(rng.randint(10 ** 9, 10 ** 10)), name, str(lot), "0.05"
+        cells[8], cells[9], cells[13], cells[15], cells[16] = expiry, ticker, underlying, strike, option_type
+        return cells
+
+    cm = os.path.join(directory, "NSE_CM.csv")
+    with open(cm, "w", newline="") as f:
+        writer = csv.writer(f)
+        for n in names:
+            writer.writerow(row(f"{n} LTD", f"NSE:{n}-EQ", 1, underlying=n))
+            expected[f"NSE:{n}-EQ"] = (n, sector_map.get(n, "Unknown"), 1)
+        for idx in ("NIFTY50", "NIFTYBANK", "FINNIFTY"):
+            writer.writerow(row(idx, f"NSE:{idx}-INDEX", 1, underlying=idx))
+            expected[f"NSE:{idx}-INDEX"] = (idx, "Index", 1)
+
+    fo = os.path.join(directory, "NSE_FO.csv")
+    with open(fo, "w", newline="") as f:
+        writer = csv.writer(f)
+        for n in names[:fo_count]:
+            lot = rng.choice([25, 50, 75, 125, 250, 500])
+            for month, expiry in (("25OCT", "1761213600"), ("25NOV", "1763632800"), ("25DEC", "1766656800")):
+                fut = f"{n}{month}FUT"
+                writer.writerow(row(f"{n} {month} FUT", f"NSE:{fut}", lot, expiry, n))
+                expected[f"NSE:{fut}"] = (fut, sector_map.get(n, "Unknown"), lot)
+                for k in range(30):
+                    strike = str(100 + 10 * k)
+                    for opt in ("CE", "PE"):
+                        contract = f"{n}{month}{strike}{opt}"
+                        writer.writerow(row(contract, f"NSE:{contract}", lot, expiry, n, strike, opt))
+                        expected[f"NSE:{contract}"] = (contract, sector_map.get(n, "Unknown"), lot)
+    return [cm, fo], expected, sector_map
+
+
+def open_master(path, queue):
+    start = time.perf_counter()
+    master = SymbolMaster(path)
+    master.id_of("NSE:NIFTY50-INDEX")
+    queue.put(time.perf_counter() - start)
+
+
+def parse_csvs(paths, queue):
+    start = time.perf_counter()
+    for p in paths:
+        read_instruments(p)
+    queue.put(time.perf_counter() - start)
+
+
+def in_fresh_processes(target, args, count: int = 4) -> float:
+    """Median time target reports from count separate processes"""
+    ctx = multiprocessing.get_context("spawn")
+    queue = ctx.Queue()
+    procs = [ctx.Process(target=target, args=args + (queue,)) for _ in range(count)]
+    for p in procs:
+        p.start()
+    times = [queue.get() for _ in procs]
+    for p in procs:
+        p.join()
+    return statistics.median(times)
+
+
+def main():
+    equities = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    fo_count = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    rng = random.Random(5)
+    with tempfile.TemporaryDirectory() as tmp:
+        paths, expected, sector_map = write_csvs(tmp, equities, fo_count, rng)
+        path = os.path.join(tmp, "symbol_master.bin")
+        start = time.perf_counter()
+        compile_symbol_master([read_instruments(p) for p in paths], path, paths, sector_map=sector_map)
+        compile_time = time.perf_counter() - start
+
+        master = SymbolMaster(path)
+        tickers = list(expected)
+        ids = master.ids_of(tickers)
+        assert (ids >= 0).all()
+        assert master.short_names(ids) == [v[0] for v in expected.values()]
+        assert master.sectors(ids) == [v[1] for v in expected.values()]
+        assert master.lot_sizes(ids).tolist() == [v[2] for v in expected.values()]
+        assert all(master.id_of(t) == i for t, i in zip(tickers[::97], ids[::97].tolist()))
+        assert master.id_of("NSE:NOSUCH-EQ") == -1
+        print(f"{len(master)} instruments: short name, sector and lot size match for every ticker")
+
+        size = os.path.getsize(path)
+        csv_size = sum(os.path.getsize(p) for p in paths)
+        open_time = in_fresh_processes(open_master, (path,))
+        parse_time = in_fresh_processes(parse_csvs, (paths,))
+        print(f"  compile once: {compile_time * 1000:7.1f} ms ({csv_size / 2 ** 20:.1f} MiB CSV -> "
+              f"{size / 2 ** 20:.1f} MiB table)")
+        print(f"  per process, parse CSVs: {parse_time * 1000:7.1f} ms")
+        print(f"  per process, map table:  {open_time * 1000:7.2f} ms")
+
+        quotes = [f"NSE:{t.split(':')[1]}" for t in rng.sample(tickers[:equities], 2000)]
+        runs = {"split + dict": [], "id_of per ticker": [], "ids_of batch": []}
+        for _ in range(20):
+            start = time.perf_counter()
+            for n in quotes:
+                short = n.split(":")[-1].replace("-EQ", "").replace("-INDEX", "")
+                sector_map.get(short, "Unknown")
+            runs["split + dict"].append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            for n in quotes:
+                i = master.id_of(n)
+                master.table["short"][i], master.table["sector"][i]
+            runs["id_of per ticker"].append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            batch = master.ids_of(quotes)
+            master.short_names(batch), master.sectors(batch)
+            runs["ids_of batch"].append(time.perf_counter() - start)
+        print(f"  resolve {len(quotes)} quote tickers to short name + sector:")
+        for name, times in runs.items():
+            print(f"    {name:17s} {statistics.median(times) * 1000:7.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
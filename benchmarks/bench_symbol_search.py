@@ -0,0 +1,106 @@
+"""
+Watchlist symbol search: list scans vs. the prebuilt symbol_search index
+
+Generates a ~9,000-symbol universe shaped like the NSE master (equities,
+index names, a few long F&O-style tickers), then:
+  - checks the index against a brute-force exact / prefix / substring
+    search with the same ranking for 2,000 random queries
+  - times index build, and per-query latency of the previous
+    utils.search_symbols list scans against the index, queried directly
+    and through utils.search_symbols as the pages do
+
+Usage: python benchmarks/bench_symbol_search.py [symbols] [queries]
+"""
+
+import os
+import random
+import statistics
+import string
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import STOCK_UNIVERSE
+from symbol_search import SymbolIndex
+from utils import search_symbols
+
+
+def make_universe(count: int, rng: random.Random) -> list:
+    symbols = set(STOCK_UNIVERSE)
+    stems = ["BANK", "FIN", "TECH", "POWER", "INFRA", "PHARMA", "STEEL", "AUTO", "NIFTY", "CHEM"]
+    while len(symbols) < count:
+        kind = rng.random()
+        head = "".join(rng.choice(string.ascii_uppercase) for _ in range(rng.randint(2, 6)))
+        if kind < 0.6:
+            symbols.add(head)
+        elif kind < 0.9:
+            symbols.add(head + rng.choice(stems))
+        else:
+            symbols.add(head + rng.choice(stems) + str(rng.randint(1, 99)) + "PP")
+    return list(symbols)
+
+
+def list_scan(search_term: str, symbol_list: list, max_results: int = 10) -> list:
+    """The previous utils.search_symbols"""
+    if not search_term:
+        return []
+    search_upper = search_term.upper().strip()
+    exact_match = [s for s in symbol_list if s == search_upper]
+    starts_with = [s for s in symbol_list if s.startswith(search_upper) and s not in exact_match]
+    contains = [s for s in symbol_list if search_upper in s and s not in exact_match and s not in starts_with]
+    return (exact_match + starts_with + contains)[:max_results]
+
+
+def brute_force(query: str, symbols: list, limit: int = 10) -> list:
+    """Reference with the index's ranking: exact, then prefix and substring by (length, name)"""
+    query = query.upper().strip()
+    exact = [s for s in symbols if s == query]
+    prefix = sorted((s for s in symbols if s.startswith(query) and s != query), key=lambda s: (len(s), s))
+    contains = sorted((s for s in symbols if query in s and not s.startswith(query)), key=lambda s: (len(s), s))
+    return (exact + prefix + contains)[:limit]
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 9000
+    query_count = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    rng = random.Random(3)
+    symbols = make_universe(count, rng)
+
+    start = time.perf_counter()
+    index = SymbolIndex(symbols)
+    build_time = time.perf_counter() - start
+
+    queries = []
+    for _ in range(query_count):
+        s = rng.choice(symbols)
+        i = rng.randint(0, len(s) - 1)
+        queries.append(s[i:i + rng.randint(1, 6)].lower() if rng.random() < 0.5 else s[:rng.randint(1, len(s))])
+    queries += ["", "ZZZZQ", "TCS", " reliance "]
+    ordered = sorted(symbols)
+    for q in queries:
+        assert index.search(q) == (brute_force(q, ordered) if q.strip() else []), q
+    print(f"{len(index)} symbols, {len(queries)} queries: index matches the brute-force ranking")
+
+    def per_query(fn):
+        times = []
+        for q in queries:
+            start = time.perf_counter()
+            fn(q)
+            times.append(time.perf_counter() - start)
+        return statistics.median(times), max(times)
+
+    scan = per_query(lambda q: list_scan(q, symbols))
+    indexed = per_query(lambda q: index.search(q))
+    search_symbols("", symbols)  # Build the process-wide index for this list
+    via_utils = per_query(lambda q: search_symbols(q, symbols))
+    print(f"  index build (once per process): {build_time * 1000:7.1f} ms")
+    print(f"  list scans:  {scan[0] * 1e6:8.1f} us median, {scan[1] * 1e6:8.1f} us max")
+    print(f"  index:       {indexed[0] * 1e6:8.1f} us median, {indexed[1] * 1e6:8.1f} us max"
+          f"  ({scan[0] / indexed[0]:.0f}x)")
+    print(f"  search_symbols: {via_utils[0] * 1e6:5.1f} us median, {via_utils[1] * 1e6:8.1f} us max"
+          f"  ({scan[0] / via_utils[0]:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Table styling: per-cell Styler callbacks vs. the shared vectorized rules
+
+Builds a bull scan display table (the widest styled table) and, for each
+row count, checks that ui_components.style_table produces the same cell
+CSS as the old per-cell applymap callback, then times what st.dataframe
+does with each: computing the styles and serializing them (Streamlit's
+marshall_styler plus the Arrow payload). Tables over STYLED_TABLE_MAX_ROWS
+are rendered without a Styler by render_styled_table, with each colored
+cell marked instead (marked_table); that path is checked against the
+same CSS and timed as "markers".
+
+Usage: python benchmarks/bench_table_styles.py [rows ...]
+"""
+
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from streamlit import dataframe_util
+from streamlit.elements.lib.pandas_styler_utils import marshall_styler
+from streamlit.proto.ArrowData_pb2 import ArrowData
+
+from config import STYLED_TABLE_MAX_ROWS
+from ui_components import CSS_MARKERS, POSITIVE_CSS, flag_rule, marked_table, sign_rule, style_table
+
+STYLED = ['Price Chg %', 'Vol (x Avg)', 'OI Chg %', 'Breakout']
+
+
+def make_table(rows: int) -> pd.DataFrame:
+    rng = np.random.default_rng(rows)
+    return pd.DataFrame({
+        "Symbol": [f"SYM{i}" for i in range(rows)],
+        "Name": [f"Company {i}" for i in range(rows)],
+        "Sector": rng.choice(["IT", "BANK", "AUTO", "PHARMA"], rows),
+        "LTP": rng.uniform(50, 5000, rows).round(2),
+        "Prev Week High": rng.uniform(50, 5000, rows).round(2),
+        "Price Chg %": rng.normal(0, 2, rows).round(2),
+        "Vol (x Avg)": rng.uniform(0, 5, rows).round(2),
+        "OI Chg %": rng.normal(0, 10, rows).round(2),
+        "Breakout": rng.random(rows) > 0.5,
+    })
+
+
+def color_bull(val):
+    """The page's previous per-cell callback"""
+    try:
+        if isinstance(val, bool):
+            return 'color: #00cc96; font-weight: bold' if val else ''
+        v = float(val)
+        return 'color: #00cc96; font-weight: bold' if v > 0 else ''
+    except:
+        return ''
+
+
+def serialize(data) -> int:
+    """What st.dataframe does with a Styler or a plain frame; returns payload bytes"""
+    proto = ArrowData()
+    if isinstance(data, pd.DataFrame):
+        proto.data = dataframe_util.convert_anything_to_arrow_bytes(data)
+    else:
+        marshall_styler(proto, data, "bench")
+        proto.data = dataframe_util.convert_anything_to_arrow_bytes(data.data)
+    return len(proto.SerializeToString())
+
+
+def timed(build, runs: int = 5):
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        size = serialize(build())
+        times.append(time.perf_counter() - start)
+    return statistics.median(times), size
+
+
+def main():
+    row_counts = [int(a) for a in sys.argv[1:]] or [200, 2000]
+    gain = sign_rule(negative='')
+    rules = {'Price Chg %': gain, 'Vol (x Avg)': gain, 'OI Chg %': gain, 'Breakout': flag_rule(POSITIVE_CSS)}
+
+    for rows in row_counts:
+        df = make_table(rows)
+        old = df.style.map(color_bull, subset=STYLED)
+        new = style_table(df, rules)
+        old._compute()
+        new._compute()
+        assert dict(old.ctx) == dict(new.ctx)
+        marked = marked_table(df, rules)
+        for j, col in enumerate(df.columns):
+            if col in rules:
+                css = ["; ".join(f"{k}: {v}" for k, v in new.ctx.get((i, j), [])) for i in range(rows)]
+                assert [CSS_MARKERS.get(c, "") for c in css] == [m[:1] if m[:1] in "🟢🔴" else "" for m in marked[col]]
+
+        callback = timed(lambda: df.style.map(color_bull, subset=STYLED))
+        vectorized = timed(lambda: style_table(df, rules))
+        markers = timed(lambda: marked_table(df, rules))
+        print(f"{rows} rows x {len(df.columns)} columns (style_table CSS and markers match the per-cell callback)")
+        print(f"  per-cell callbacks + Styler: {callback[0] * 1000:8.1f} ms, {callback[1] / 1024:7.1f} KiB")
+        print(f"  vectorized rules + Styler:   {vectorized[0] * 1000:8.1f} ms, {vectorized[1] / 1024:7.1f} KiB")
+        print(f"  markers (> {STYLED_TABLE_MAX_ROWS} rows):      {markers[0] * 1000:8.1f} ms, {markers[1] / 1024:7.1f} KiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Streamed vs. polled watchlist prices
+
+Streams a watchlist from the local tick stand-in through WebSocketTickFeed
+into a LastPriceTable, drops the connection halfway to check reconnect and
+resubscribe, and reports tick throughput, per-symbol latency and how stale
+a reader's price gets compared to polling quotes every 10 seconds.
+
+Usage: python benchmarks/bench_tick_stream.py [symbols] [seconds] [rate]
+"""
+
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import SCAN_SYMBOLS, WATCHLIST_REFRESH_INTERVAL
+from mock_tick_server import start_tick_server
+from tick_feed import MarketStream, WebSocketTickFeed
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 6.0
+    rate = float(sys.argv[3]) if len(sys.argv) > 3 else 5.0
+    symbols = SCAN_SYMBOLS[:count]
+    server, url = start_tick_server(rate=rate)
+    stream = MarketStream(lambda on_tick: WebSocketTickFeed(url, on_tick))
+    stream.start()
+    try:
+        stream.feed.subscribe(symbols)
+        deadline = time.monotonic() + 5
+        while stream.quotes(symbols) is None and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        # Sample reader-visible price age every 50 ms, dropping the socket halfway
+        ages, dropped = [], False
+        start = time.monotonic()
+        ticks_before = stream.table.tick_count
+        while time.monotonic() - start < seconds:
+            if not dropped and time.monotonic() - start > seconds / 2:
+                server.drop_connections()
+                dropped = True
+            now = time.time()
+            for s in symbols:
+                quote = stream.table.get(s)
+                if quote and quote["v"]["tt"]:
+                    ages.append(now - quote["v"]["tt"])
+            time.sleep(0.05)
+        elapsed = time.monotonic() - start
+        ticks = stream.table.tick_count - ticks_before
+
+        latency = stream.table.latency_stats()
+        ewma = sorted(v["ewma_ms"] for v in latency.values())
+        print(f"{len(symbols)} symbols, {rate:g} ticks/s each, {elapsed:.1f} s, one forced disconnect")
+        print(f"  ticks ingested:     {ticks} ({ticks / elapsed:.0f}/s)")
+        print(f"  connections:        {server.connections} (reconnects: {stream.feed.reconnects}, "
+              f"subscribe msgs: {server.subscribe_count})")
+        print(f"  tick latency EWMA:  p50 {ewma[len(ewma) // 2]:.2f} ms  max {ewma[-1]:.2f} ms")
+        print(f"  price age streamed: mean {statistics.mean(ages) * 1000:.0f} ms  "
+              f"max {max(ages) * 1000:.0f} ms (includes reconnect gap)")
+        print(f"  price age polled:   mean {WATCHLIST_REFRESH_INTERVAL * 500:.0f} ms  "
+              f"max {WATCHLIST_REFRESH_INTERVAL * 1000:.0f} ms (every {WATCHLIST_REFRESH_INTERVAL} s)")
+    finally:
+        stream.stop()
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
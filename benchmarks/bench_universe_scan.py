@@ -0,0 +1,117 @@
+"""
+Universe scan: single-process scan vs. the sharded process pool
+
+Scans a universe of symbols against the local stand-in server and:
+  - checks the merged frame and tags match build_df_from_quotes +
+    classify_frame_advanced run in one process
+  - checks UniverseScanner.start() returns at once while a scan runs
+  - times a full scan (fetching included) in one process and with the pool
+Then, on prebuilt quotes and candles, times the CPU stage on its own:
+every shard in this process vs. 1, 2, 4, ... warm worker processes, with
+the per-shard worker time.
+
+Speedup is bounded by the cores on the machine (printed first).
+
+Usage: python benchmarks/bench_universe_scan.py [symbols] [max_workers]
+"""
+
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+from candle_data import to_candles
+from config import SCAN_SYMBOLS
+from data_processor import build_df_from_quotes, classify_frame_advanced
+from fyers_client import FyersClient
+from indicators import IndicatorEngine
+from mock_fyers_server import make_candles, make_quote, start_mock_server
+from rate_limiter import RequestScheduler
+from screener import screen_tags
+from resampler import TimeframeCache
+from symbol_master import get_symbol_master
+from universe_scan import UniverseScanner, _init_worker, _pool_context, scan_shard
+
+
+def serial_scan(client: FyersClient, symbols):
+    """The scanner.run_scan path for every symbol in this process"""
+    frames = []
+    for i in range(0, len(symbols), 50):
+        resp = client.fetch_quotes(symbols[i:i + 50])
+        frames.append(build_df_from_quotes(resp, client, engine=IndicatorEngine(), timeframes=TimeframeCache()))
+    df = pd.concat(frames, ignore_index=True)
+    df["daily_tag"] = classify_frame_advanced(df)
+    return df.join(screen_tags(df))
+
+
+def timed(run, runs: int = 3) -> float:
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    max_workers = int(sys.argv[2]) if len(sys.argv) > 2 else max(4, os.cpu_count() or 1)
+    symbols = (SCAN_SYMBOLS + [f"NSE:SYM{i:03d}-EQ" for i in range(count)])[:count]
+
+    server, base_url = start_mock_server(latency=0.0, candle_count=2000)
+    client = FyersClient(client_id="BENCH-100", access_token="token")
+    client.base_url = base_url
+    client.scheduler = RequestScheduler({})
+    print(f"{count} symbols x 2000 candles, {os.cpu_count()} CPU cores")
+
+    expected = serial_scan(client, symbols)
+    scanner = UniverseScanner(client, workers=2)
+    result = scanner.scan(symbols, confirm_options=False)
+    pd.testing.assert_frame_equal(result.df, expected)
+    print(f"  merged frame matches the single-process scan ({(expected['daily_tag'].notna()).sum()} tagged)")
+
+    start = time.perf_counter()
+    assert scanner.start(symbols)
+    started = time.perf_counter() - start
+    assert scanner.running and not scanner.start(symbols)
+    scanner.shutdown()
+    assert scanner.result is not None and scanner.error is None
+    print(f"  start() returned in {started * 1000:.1f} ms; scan finished on its own thread")
+
+    serial = timed(lambda: serial_scan(client, symbols))
+    scanner = UniverseScanner(client)
+    scanner.scan(symbols)  # Spawn and warm the pool
+    pooled = timed(lambda: scanner.scan(symbols))
+    scanner.shutdown()
+    server.shutdown()
+    print(f"  full scan, single process:      {serial:6.2f} s")
+    print(f"  full scan, pool of {scanner.workers} workers:   {pooled:6.2f} s (fetching included)")
+
+    quotes = [make_quote(s) for s in symbols]
+    candles = {s: to_candles(make_candles(s, 2000, int(time.time()) // 300 * 300 - 1999 * 300)) for s in symbols}
+    shards = [symbols[i:i + 10] for i in range(0, len(symbols), 10)]
+    inputs = [([quotes[symbols.index(s)] for s in shard], {s: candles[s] for s in shard}) for shard in shards]
+    in_process = timed(lambda: [scan_shard(*args) for args in inputs])
+    print(f"  CPU stage, {len(shards)} shards in this process: {in_process:6.2f} s")
+    master = get_symbol_master()
+    workers = 1
+    while workers <= max_workers:
+        with ProcessPoolExecutor(workers, mp_context=_pool_context(),
+                                 initializer=_init_worker, initargs=(master.path,)) as pool:
+            list(pool.map(scan_shard, *zip(*inputs)))  # Spawn and warm the workers
+            results = []
+            wall = timed(lambda: results.append(list(pool.map(scan_shard, *zip(*inputs)))))
+        seconds = [r[1] for r in results[-1]]
+        print(f"    {workers} worker process{'es' if workers > 1 else '  '}: {wall:6.2f} s (x{in_process / wall:4.2f}; "
+              f"{min(seconds) * 1000:.0f}-{max(seconds) * 1000:.0f} ms per shard, "
+              f"{len({r[2] for r in results[-1]})} pids, {sum(seconds):.2f} s worker time)")
+        workers *= 2
+
+
+if __name__ == "__main__":
+    main()
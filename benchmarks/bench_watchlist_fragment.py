@@ -0,0 +1,93 @@
+"""
+Watchlist refresh: full script rerun vs. the table fragment
+
+Runs the dashboard in Streamlit's AppTest harness against the local
+stand-in server (polled quotes, no tick feed), then times:
+  - a full main_new.py rerun with the sidebar balance refetched, which is
+    what every watchlist auto-refresh tick used to cost
+  - a full rerun with the session's cached balance
+  - the watchlist table fragment on its own, which is what a tick costs now
+and counts /api/v3/funds and /api/v3/positions requests for each.
+
+Usage: python benchmarks/bench_watchlist_fragment.py [reruns] [symbols]
+"""
+
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from streamlit.testing.v1 import AppTest
+
+import tick_feed
+from config import STOCK_UNIVERSE
+from fyers_client import get_shared_client
+from mock_fyers_server import start_mock_server
+from rate_limiter import RequestScheduler
+
+CLIENT_ID, TOKEN = "BENCH-100", "token"
+
+
+def fragment_script():
+    from fyers_client import get_shared_client
+    from TabPages.watchlist import render_watchlist_table
+    render_watchlist_table(get_shared_client("BENCH-100", "token"))
+
+
+def drop_cached_funds(app: AppTest):
+    if "sidebar_funds" in app.session_state:
+        del app.session_state["sidebar_funds"]
+
+
+def timed_runs(app: AppTest, server, reruns: int, before_run=None):
+    server.path_counts.clear()
+    times = []
+    for _ in range(reruns):
+        if before_run:
+            before_run(app)
+        start = time.perf_counter()
+        app.run()
+        times.append(time.perf_counter() - start)
+        assert not app.exception, app.exception
+    account = server.path_counts["/api/v3/funds"] + server.path_counts["/api/v3/positions"]
+    return statistics.median(times), account
+
+
+def main():
+    reruns = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    symbol_count = int(sys.argv[2]) if len(sys.argv) > 2 else 25
+    tick_feed.TICK_FEED = None  # Polled quotes from the shared snapshot
+    server, base_url = start_mock_server(latency=0.02)
+    client = get_shared_client(CLIENT_ID, TOKEN)
+    client.base_url = base_url
+    client.scheduler = RequestScheduler({})
+    symbols = list(STOCK_UNIVERSE)[:symbol_count]
+
+    apps = {}
+    for name, app in (("full", AppTest.from_file(os.path.join(ROOT, "main_new.py"), default_timeout=60)),
+                      ("fragment", AppTest.from_function(fragment_script, default_timeout=60))):
+        app.session_state["fyers_client_id"] = CLIENT_ID
+        app.session_state["fyers_access_token"] = TOKEN
+        app.session_state["watchlist_symbols"] = list(symbols)
+        app.run()  # Warm the snapshot and imports
+        assert not app.exception, app.exception
+        apps[name] = app
+    assert len(apps["fragment"].dataframe) == 1
+    assert len(apps["fragment"].dataframe[0].value) == symbol_count
+
+    uncached = timed_runs(apps["full"], server, reruns, drop_cached_funds)
+    cached = timed_runs(apps["full"], server, reruns)
+    fragment = timed_runs(apps["fragment"], server, reruns)
+    server.shutdown()
+
+    print(f"{symbol_count} watchlist symbols, {reruns} refreshes each")
+    print(f"  full rerun, balance refetched: {uncached[0] * 1000:7.1f} ms median, {uncached[1]} account calls")
+    print(f"  full rerun, cached balance:    {cached[0] * 1000:7.1f} ms median, {cached[1]} account calls")
+    print(f"  table fragment:                {fragment[0] * 1000:7.1f} ms median, {fragment[1]} account calls")
+
+
+if __name__ == "__main__":
+    main()
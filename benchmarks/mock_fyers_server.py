@@ -0,0 +1,215 @@
+"""
+Local Fyers API Stand-in
+Serves canned quotes/history/option chain/account responses with configurable latency
+so the client and scanner can be timed without hitting the real API
+"""
+
+import bisect
+import json
+import math
+import random
+import ssl
+import threading
+import time
+import urllib.parse
+from collections import Counter
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Tuple
+
+
+@lru_cache(maxsize=None)
+def _cached_candles(symbol: str, count: int, start_ts: int) -> List[List[float]]:
+    return make_candles(symbol, count, start_ts)
+
+
+@lru_cache(maxsize=None)
+def _history_body(symbol: str, count: int, start_ts: int) -> bytes:
+    return json.dumps({"s": "ok", "candles": _cached_candles(symbol, count, start_ts)}).encode("utf-8")
+
+
+def make_candles(symbol: str, count: int = 2000, start_ts: int = 1700000000,
+                 step: int = 300) -> List[List[float]]:
+    """Generate deterministic 5-minute OHLCV candles for a symbol"""
+    rng = random.Random(symbol)
+    price = rng.uniform(100, 3000)
+    candles = []
+    for i in range(count):
+        o = price
+        c = max(1.0, o * (1 + rng.gauss(0, 0.002)))
+        h = max(o, c) * (1 + abs(rng.gauss(0, 0.001)))
+        l = min(o, c) * (1 - abs(rng.gauss(0, 0.001)))
+        v = int(rng.uniform(5000, 200000))
+        candles.append([start_ts + i * step, round(o, 2), round(h, 2), round(l, 2), round(c, 2), v])
+        price = c
+    return candles
+
+
+def make_quote(symbol: str) -> Dict:
+    """Generate a deterministic quote entry in the Fyers /data/quotes shape"""
+    rng = random.Random(symbol + ":quote")
+    prev = rng.uniform(100, 3000)
+    ltp = prev * (1 + rng.gauss(0, 0.02))
+    oi = rng.uniform(1e5, 1e7)
+    return {
+        "n": symbol,
+        "s": "ok",
+        "v": {
+            "lp": round(ltp, 2),
+            "prev_close_price": round(prev, 2),
+            "volume": int(rng.uniform(1e4, 1e6)),
+            "open_interest": oi,
+            "prev_open_interest": oi * (1 + rng.gauss(0, 0.1)),
+            "description": symbol,
+        },
+    }
+
+
+def _norm_cdf(x: float) -> float:
+    return 0.5 * math.erfc(-x / math.sqrt(2))
+
+
+def mock_expiries(count: int = 4) -> List[int]:
+    """The next `count` Tuesdays at the 15:30 IST close, as Fyers expiry timestamps"""
+    day = (int(time.time()) + 19800) // 86400
+    tuesday = day + (1 - (day + 3) % 7) % 7  # (day + 3) % 7 is 0 on Mondays
+    return [(tuesday + 7 * i) * 86400 + 55800 - 19800 for i in range(count)]
+
+
+def make_option_chain(symbol: str, expiry_ts: int, strike_count: int) -> Dict:
+    """Generate a Black-Scholes-priced chain in the Fyers options-chain-v3 (flat) shape"""
+    rng = random.Random(f"{symbol}:{expiry_ts}")
+    spot = {"NSE:NIFTY50-INDEX": 22000.0, "NSE:NIFTYBANK-INDEX": 48000.0}.get(symbol, 21000.0)
+    step = 100.0 if spot > 40000 else 50.0
+    t = max(expiry_ts - time.time(), 3600) / (365 * 86400)
+    atm = round(spot / step) * step
+    options = [{"symbol": symbol, "strike_price": -1, "ltp": spot}]
+    for i in range(-(strike_count // 2), strike_count - strike_count // 2):
+        strike = atm + i * step
+        sigma = 0.13 + 0.8 * math.log(strike / spot) ** 2
+        d1 = (math.log(spot / strike) + (0.065 + sigma * sigma / 2) * t) / (sigma * math.sqrt(t))
+        d2 = d1 - sigma * math.sqrt(t)
+        call = spot * _norm_cdf(d1) - strike * math.exp(-0.065 * t) * _norm_cdf(d2)
+        prices = {"CE": call, "PE": call - spot + strike * math.exp(-0.065 * t)}
+        for opt_type, price in prices.items():
+            oi = rng.uniform(1e4, 5e6) * math.exp(-abs(i) / 10)
+            options.append({"strike_price": strike, "option_type": opt_type,
+                            "ltp": max(0.05, round(price / 0.05) * 0.05),
+                            "oi": round(oi), "oich": round(oi * rng.gauss(0, 0.1)),
+                            "volume": int(rng.uniform(1e3, 1e6))})
+    expiry_data = [{"date": time.strftime("%d-%m-%Y", time.gmtime(ts + 19800)), "expiry": str(ts)}
+                   for ts in mock_expiries()]
+    return {"s": "ok", "data": {"optionsChain": options, "expiryData": expiry_data}}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, payload: Dict):
+        self._send_body(json.dumps(payload).encode("utf-8"))
+
+    def _send_body(self, body: bytes):
+        with self.server.lock:
+            self.server.bytes_sent += len(body)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        # Headers and body in one write so small responses don't stall on delayed ACKs
+        self._headers_buffer.append(b"\r\n")
+        self._headers_buffer.append(body)
+        self.wfile.write(b"".join(self._headers_buffer))
+        self._headers_buffer = []
+
+    def do_GET(self):
+        server = self.server
+        time.sleep(server.latency)
+        parsed = urllib.parse.urlparse(self.path)
+        with server.lock:
+            server.request_count += 1
+            server.path_counts[parsed.path] += 1
+        params = dict(urllib.parse.parse_qsl(parsed.query))
+
+        if parsed.path == "/data/quotes":
+            symbols = [s for s in params.get("symbols", "").split(",") if s]
+            self._send({"s": "ok", "d": [make_quote(s) for s in symbols]})
+        elif parsed.path == "/data/history":
+            symbol = params.get("symbol", "")
+            candles = _cached_candles(symbol, server.candle_count, server.candle_start)
+            range_from = int(params.get("range_from") or 0)
+            range_to = int(params.get("range_to") or 0)
+            if range_from <= candles[0][0] and range_to >= candles[-1][0]:
+                self._send_body(_history_body(symbol, server.candle_count, server.candle_start))
+            else:
+                lo = bisect.bisect_left(candles, range_from, key=lambda c: c[0])
+                hi = bisect.bisect_right(candles, range_to, key=lambda c: c[0])
+                self._send({"s": "ok", "candles": candles[lo:hi]})
+        elif parsed.path == "/data/options-chain-v3":
+            expiry_ts = int(params.get("timestamp") or mock_expiries(1)[0])  # "" = nearest expiry
+            self._send(make_option_chain(params.get("symbol", ""), expiry_ts,
+                                         int(params.get("strikecount") or 10)))
+        elif parsed.path == "/api/v3/funds":
+            self._send({"s": "ok", "fund_limit": [{"equityAmount": 100000.0, "availablecash": 50000.0,
+                                                  "utilized_amount": 50000.0, "collateral": 0.0}]})
+        elif parsed.path == "/api/v3/holdings":
+            self._send({"s": "ok", "holdings": []})
+        elif parsed.path == "/api/v3/positions":
+            self._send({"s": "ok", "netPositions": []})
+        else:
+            self._send({"s": "error", "message": f"unknown path {parsed.path}"})
+
+
+def make_self_signed_cert(directory: str) -> Tuple[str, str]:
+    """Create a throwaway localhost cert/key pair with openssl; returns (certfile, keyfile)"""
+    import os
+    import subprocess
+    certfile = os.path.join(directory, "cert.pem")
+    keyfile = os.path.join(directory, "key.pem")
+    subprocess.run(
+        ["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "1",
+         "-keyout", keyfile, "-out", certfile, "-subj", "/CN=127.0.0.1",
+         "-addext", "subjectAltName=IP:127.0.0.1"],
+        check=True, capture_output=True,
+    )
+    return certfile, keyfile
+
+
+def start_mock_server(latency: float = 0.05, candle_count: int = 2000,
+                      port: int = 0, certfile: str = None,
+                      keyfile: str = None) -> Tuple[ThreadingHTTPServer, str]:
+    """
+    Start the stand-in server on a background thread
+    
+    Args:
+        latency: Seconds each request sleeps before responding
+        candle_count: Candles returned per /data/history call
+        port: Port to bind (0 picks a free port)
+        certfile: PEM certificate; serves HTTPS when given
+        keyfile: PEM private key matching certfile
+        
+    Returns:
+        (server, base_url) - call server.shutdown() when done
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", port), _Handler)
+    server.daemon_threads = True
+    server.latency = latency
+    server.candle_count = candle_count
+    # Candles end at the current 5-minute boundary so "last 30 days" ranges hit them
+    server.candle_start = int(time.time()) // 300 * 300 - (candle_count - 1) * 300
+    server.bytes_sent = 0
+    server.request_count = 0
+    server.path_counts = Counter()
+    server.lock = threading.Lock()
+    scheme = "http"
+    if certfile:
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        context.load_cert_chain(certfile, keyfile)
+        context.num_tickets = 0
+        server.socket = context.wrap_socket(server.socket, server_side=True)
+        scheme = "https"
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f"{scheme}://127.0.0.1:{server.server_address[1]}"
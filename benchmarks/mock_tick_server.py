@@ -0,0 +1,255 @@
+"""
+Local stand-in for the Fyers data socket
+
+A small stdlib WebSocket server speaking the JSON protocol of
+tick_feed.WebSocketTickFeed. Clients send {"type": "subscribe" |
+"unsubscribe", "symbols": [...]}; the server pushes ticks with Fyers
+data-socket field names, either a synthetic random walk or a replay of
+recorded ticks (JSON lines) with their original spacing.
+
+Usage:
+    python benchmarks/mock_tick_server.py --port 8765 --rate 5
+    python benchmarks/mock_tick_server.py --replay ticks.jsonl --speed 10
+"""
+
+import argparse
+import base64
+import hashlib
+import json
+import random
+import select
+import socket
+import socketserver
+import struct
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+_WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+
+def _read_exact(sock: socket.socket, n: int) -> bytes:
+    buf = b""
+    while len(buf) < n:
+        chunk = sock.recv(n - len(buf))
+        if not chunk:
+            raise ConnectionError("client closed")
+        buf += chunk
+    return buf
+
+
+def _read_frame(sock: socket.socket) -> Tuple[int, bytes]:
+    b1, b2 = _read_exact(sock, 2)
+    opcode = b1 & 0x0F
+    length = b2 & 0x7F
+    if length == 126:
+        length = struct.unpack("!H", _read_exact(sock, 2))[0]
+    elif length == 127:
+        length = struct.unpack("!Q", _read_exact(sock, 8))[0]
+    mask = _read_exact(sock, 4) if b2 & 0x80 else b"\x00\x00\x00\x00"
+    data = bytearray(_read_exact(sock, length))
+    for i in range(length):
+        data[i] ^= mask[i % 4]
+    return opcode, bytes(data)
+
+
+def _frame(opcode: int, payload: bytes) -> bytes:
+    n = len(payload)
+    if n < 126:
+        header = struct.pack("!BB", 0x80 | opcode, n)
+    elif n < 65536:
+        header = struct.pack("!BBH", 0x80 | opcode, 126, n)
+    else:
+        header = struct.pack("!BBQ", 0x80 | opcode, 127, n)
+    return header + payload
+
+
+class _Market:
+    """Shared random-walk prices so reconnecting clients see continuous series"""
+
+    def __init__(self, seed: int = 7):
+        self.rng = random.Random(seed)
+        self.prices: Dict[str, Tuple[float, float, float]] = {}
+        self.lock = threading.Lock()
+
+    def tick(self, symbol: str) -> Dict:
+        with self.lock:
+            if symbol not in self.prices:
+                base = self.rng.uniform(100, 5000)
+                self.prices[symbol] = (base, base, 0.0)
+            ltp, prev, vol = self.prices[symbol]
+            ltp = round(max(1.0, ltp * (1 + self.rng.gauss(0, 0.0005))), 2)
+            vol += self.rng.randint(1, 500)
+            self.prices[symbol] = (ltp, prev, vol)
+        return {"type": "sf", "symbol": symbol, "ltp": ltp, "prev_close_price": prev,
+                "vol_traded_today": vol, "exch_feed_time": time.time()}
+
+
+class _Handler(socketserver.BaseRequestHandler):
+
+    def setup(self):
+        self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.symbols: List[str] = []
+        self.send_lock = threading.Lock()
+
+    def _handshake(self) -> bool:
+        raw = b""
+        while b"\r\n\r\n" not in raw:
+            chunk = self.request.recv(4096)
+            if not chunk:
+                return False
+            raw += chunk
+        headers = {}
+        for line in raw.decode("latin-1").split("\r\n")[1:]:
+            if ":" in line:
+                k, v = line.split(":", 1)
+                headers[k.strip().lower()] = v.strip()
+        key = headers.get("sec-websocket-key")
+        if not key:
+            return False
+        accept = base64.b64encode(hashlib.sha1((key + _WS_GUID).encode()).digest()).decode()
+        self.request.sendall(("HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\n"
+                              f"Connection: Upgrade\r\nSec-WebSocket-Accept: {accept}\r\n\r\n").encode())
+        return True
+
+    def send(self, messages: List[Dict]):
+        with self.send_lock:
+            self.request.sendall(_frame(0x1, json.dumps(messages).encode()))
+        with self.server.lock:
+            self.server.ticks_sent += len(messages)
+
+    def _handle_control(self) -> bool:
+        opcode, data = _read_frame(self.request)
+        if opcode == 0x8:
+            return False
+        if opcode == 0x9:
+            with self.send_lock:
+                self.request.sendall(_frame(0xA, data))
+        elif opcode == 0x1:
+            msg = json.loads(data)
+            symbols = msg.get("symbols") or []
+            if msg.get("type") == "subscribe":
+                self.symbols += [s for s in symbols if s not in self.symbols]
+                with self.server.lock:
+                    self.server.subscribe_count += 1
+                # Like Fyers, send the current state of new symbols right away
+                self.send([self.server.market.tick(s) for s in symbols])
+            elif msg.get("type") == "unsubscribe":
+                self.symbols = [s for s in self.symbols if s not in symbols]
+        return True
+
+    def handle(self):
+        if not self._handshake():
+            return
+        with self.server.lock:
+            self.server.clients.add(self)
+            self.server.connections += 1
+        try:
+            if self.server.replay:
+                self._serve_replay()
+            else:
+                self._serve_synthetic()
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            with self.server.lock:
+                self.server.clients.discard(self)
+
+    def _serve_synthetic(self):
+        interval = 1.0 / self.server.rate
+        next_at = time.monotonic()
+        while True:
+            timeout = max(0.0, next_at - time.monotonic())
+            readable, _, _ = select.select([self.request], [], [], timeout)
+            if readable and not self._handle_control():
+                return
+            if time.monotonic() >= next_at:
+                if self.symbols:
+                    self.send([self.server.market.tick(s) for s in self.symbols])
+                next_at += interval
+
+    def _serve_replay(self):
+        ticks = self.server.replay
+        start_wall = time.monotonic()
+        start_ts = ticks[0].get("exch_feed_time", 0)
+        i = 0
+        while i < len(ticks):
+            due = start_wall + (ticks[i].get("exch_feed_time", start_ts) - start_ts) / self.server.speed
+            readable, _, _ = select.select([self.request], [], [], max(0.0, due - time.monotonic()))
+            if readable and not self._handle_control():
+                return
+            batch = []
+            while i < len(ticks) and start_wall + (ticks[i].get("exch_feed_time", start_ts) - start_ts) / self.server.speed <= time.monotonic():
+                if ticks[i].get("symbol") in self.symbols:
+                    batch.append(dict(ticks[i], exch_feed_time=time.time()))
+                i += 1
+            if batch:
+                self.send(batch)
+
+
+class TickServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def drop_connections(self):
+        """Abruptly close every client socket to exercise reconnect/resubscribe"""
+        with self.lock:
+            clients = list(self.clients)
+        for client in clients:
+            try:
+                client.request.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+
+def start_tick_server(port: int = 0, rate: float = 5.0, replay: Optional[List[Dict]] = None,
+                      speed: float = 1.0) -> Tuple[TickServer, str]:
+    """
+    Start the stand-in on a background thread
+
+    Args:
+        port: Port to bind (0 picks a free port)
+        rate: Synthetic ticks per second per subscribed symbol
+        replay: Recorded tick dicts to replay instead of synthetic ticks
+        speed: Replay speed multiplier
+
+    Returns:
+        (server, ws_url) - call server.shutdown() when done
+    """
+    server = TickServer(("127.0.0.1", port), _Handler)
+    server.rate = rate
+    server.replay = sorted(replay, key=lambda t: t.get("exch_feed_time", 0)) if replay else None
+    server.speed = speed
+    server.market = _Market()
+    server.lock = threading.Lock()
+    server.clients = set()
+    server.connections = 0
+    server.subscribe_count = 0
+    server.ticks_sent = 0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f"ws://127.0.0.1:{server.server_address[1]}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for the Fyers data socket")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--rate", type=float, default=5.0, help="Synthetic ticks/s per symbol")
+    parser.add_argument("--replay", help="JSON-lines file of recorded ticks to replay")
+    parser.add_argument("--speed", type=float, default=1.0, help="Replay speed multiplier")
+    args = parser.parse_args()
+    replay = None
+    if args.replay:
+        with open(args.replay) as f:
+            replay = [json.loads(line) for line in f if line.strip()]
+    server, url = start_tick_server(args.port, args.rate, replay, args.speed)
+    print(f"Serving ticks on {url} (set TICK_FEED='local' in config.py)")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
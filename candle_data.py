@@ -0,0 +1,53 @@
+"""
+Candle Data Module
+Columnar representation of history candles as NumPy structured arrays
+"""
+
+import numpy as np
+from typing import Iterable, List, Sequence, Union
+
+# One record per candle: epoch-second timestamp and OHLCV. Prices stay float64;
+# float32 would save 16 bytes/candle but can't hold index levels to the paisa.
+CANDLE_DTYPE = np.dtype([
+    ("ts", "<i8"),
+    ("open", "<f8"),
+    ("high", "<f8"),
+    ("low", "<f8"),
+    ("close", "<f8"),
+    ("volume", "<f8"),
+])
+
+CANDLE_FIELDS = CANDLE_DTYPE.names
+
+
+def empty_candles(count: int = 0) -> np.ndarray:
+    """Zero-filled candle array of the given length"""
+    return np.zeros(count, dtype=CANDLE_DTYPE)
+
+
+def to_candles(rows: Union[np.ndarray, Sequence[Sequence[float]], None]) -> np.ndarray:
+    """
+    Convert Fyers [ts, o, h, l, c, v] rows (or a candle array) to a candle array
+
+    Rows shorter than 6 fields are dropped; extra trailing fields are ignored.
+    """
+    if isinstance(rows, np.ndarray) and rows.dtype == CANDLE_DTYPE:
+        return rows
+    if rows is None or len(rows) == 0:
+        return empty_candles()
+    rows = [r[:6] for r in rows if len(r) >= 6]
+    values = np.asarray(rows, dtype=np.float64).reshape(-1, 6)
+    out = empty_candles(len(values))
+    for i, field in enumerate(CANDLE_FIELDS):
+        out[field] = values[:, i]
+    return out
+
+
+def from_records(records: Iterable[tuple]) -> np.ndarray:
+    """Build a candle array from (ts, o, h, l, c, v) tuples, e.g. database rows"""
+    return np.array(list(records), dtype=CANDLE_DTYPE)
+
+
+def to_rows(candles: np.ndarray) -> List[list]:
+    """Candle array back to Fyers-style [ts, o, h, l, c, v] lists"""
+    return [list(r) for r in candles.tolist()]
@@ -0,0 +1,268 @@
+"""
+Candle Store Module
+Persistent on-disk cache of history candles keyed by symbol and resolution,
+plus memory-mapped snapshots of it for bulk reads
+"""
+
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import numpy as np
+from typing import Dict, List, Optional, Sequence, Union
+
+from candle_data import CANDLE_DTYPE, empty_candles, from_records, to_candles
+from resampler import merge_candles
+
+SNAPSHOT_MAGIC = b"FYCANDLE"
+SNAPSHOT_VERSION = 1
+SNAPSHOT_ALIGN = 64
+
+# Timestamp bounds that take in every stored candle
+ALL_TIME = (0, np.iinfo(np.int64).max)
+
+
+class CandleStore:
+    """
+    SQLite-backed candle cache
+
+    Candles are stored as [timestamp, open, high, low, close, volume] rows,
+    one table for all symbols keyed by (symbol, resolution, ts). Writes are
+    upserts, so refetching the last (still forming) candle just updates it.
+    Reads return candle_data structured arrays.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS candles (
+                symbol TEXT NOT NULL,
+                resolution TEXT NOT NULL,
+                ts INTEGER NOT NULL,
+                open REAL, high REAL, low REAL, close REAL, volume REAL,
+                PRIMARY KEY (symbol, resolution, ts)
+            ) WITHOUT ROWID
+        """)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS coverage (
+                symbol TEXT NOT NULL,
+                resolution TEXT NOT NULL,
+                covered_from INTEGER NOT NULL,
+                PRIMARY KEY (symbol, resolution)
+            ) WITHOUT ROWID
+        """)
+        self._conn.commit()
+
+    def covered_from(self, symbol: str, resolution: str) -> Optional[int]:
+        """Earliest range start fully fetched into the store, or None"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT covered_from FROM coverage WHERE symbol = ? AND resolution = ?",
+                (symbol, resolution),
+            ).fetchone()
+        return row[0] if row else None
+
+    def mark_covered(self, symbol: str, resolution: str, date_from: int):
+        """Record that everything from date_from up to the newest candle is stored"""
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO coverage VALUES (?, ?, ?) "
+                "ON CONFLICT(symbol, resolution) DO UPDATE SET covered_from = MIN(covered_from, excluded.covered_from)",
+                (symbol, resolution, date_from),
+            )
+            self._conn.commit()
+
+    def last_timestamp(self, symbol: str, resolution: str) -> Optional[int]:
+        """Timestamp of the newest stored candle, or None if nothing is stored"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT MAX(ts) FROM candles WHERE symbol = ? AND resolution = ?",
+                (symbol, resolution),
+            ).fetchone()
+        return row[0] if row else None
+
+    def append(self, symbol: str, resolution: str,
+               candles: Union[np.ndarray, Sequence[Sequence[float]]]) -> int:
+        """Insert or update candles (array or rows); returns number of rows written"""
+        rows = [(symbol, resolution) + r for r in to_candles(candles).tolist()]
+        if not rows:
+            return 0
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO candles VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows
+            )
+            self._conn.commit()
+        return len(rows)
+
+    def load(self, symbol: str, resolution: str, date_from: int, date_to: int) -> np.ndarray:
+        """Stored candles with date_from <= ts <= date_to, oldest first, as a candle array"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT ts, open, high, low, close, volume FROM candles "
+                "WHERE symbol = ? AND resolution = ? AND ts BETWEEN ? AND ? ORDER BY ts",
+                (symbol, resolution, date_from, date_to),
+            ).fetchall()
+        return from_records(rows)
+
+    def symbols(self, resolution: str) -> List[str]:
+        """Every symbol with candles stored at resolution, sorted"""
+        # Hop from symbol to symbol along the primary key instead of scanning every candle
+        with self._lock:
+            rows = self._conn.execute("""
+                WITH RECURSIVE names(symbol) AS (
+                    SELECT MIN(symbol) FROM candles
+                    UNION ALL
+                    SELECT (SELECT MIN(symbol) FROM candles WHERE symbol > names.symbol)
+                    FROM names WHERE names.symbol IS NOT NULL
+                )
+                SELECT symbol FROM names WHERE symbol IS NOT NULL AND EXISTS (
+                    SELECT 1 FROM candles WHERE candles.symbol = names.symbol AND resolution = ?
+                )
+            """, (resolution,)).fetchall()
+        return [r[0] for r in rows]
+
+    def coverage(self, resolution: str) -> Dict[str, int]:
+        """covered_from of every symbol at resolution"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT symbol, covered_from FROM coverage WHERE resolution = ?", (resolution,)
+            ).fetchall()
+        return dict(rows)
+
+    def prune(self, before_ts: int) -> int:
+        """Drop candles older than before_ts; returns number of rows removed"""
+        with self._lock:
+            cur = self._conn.execute("DELETE FROM candles WHERE ts < ?", (before_ts,))
+            self._conn.execute(
+                "UPDATE coverage SET covered_from = ? WHERE covered_from < ?", (before_ts, before_ts)
+            )
+            self._conn.commit()
+        return cur.rowcount
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class CandleSnapshot:
+    """
+    Read-only copy of a store's candles at one resolution in one flat file
+
+    Every symbol's candles sit back to back, oldest first, in a memory-mapped
+    candle array; the header records each symbol's slice and its coverage
+    when the snapshot was written. SQLite hands rows to Python one tuple at
+    a time, a few microseconds each, so bulk reads (a year of 5-minute
+    candles for hundreds of symbols) go through a snapshot instead.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            if f.read(len(SNAPSHOT_MAGIC)) != SNAPSHOT_MAGIC:
+                raise ValueError(f"{path} is not a candle snapshot")
+            size = int.from_bytes(f.read(4), "little")
+            header = json.loads(f.read(size))
+        if header.get("version") != SNAPSHOT_VERSION:
+            raise ValueError(f"{path} has candle snapshot format {header.get('version')}")
+
+        self.resolution: str = header["resolution"]
+        self.symbols: List[str] = header["symbols"]
+        self.covered_from: Dict[str, int] = header["covered_from"]
+        self.built: float = header["built"]
+        self._offsets = header["offsets"]
+        self._index = {symbol: i for i, symbol in enumerate(self.symbols)}
+        count = self._offsets[-1] if self._offsets else 0
+        self.candles = (np.memmap(path, dtype=CANDLE_DTYPE, mode="r", offset=header["candles_offset"],
+                                  shape=(count,)) if count else empty_candles())
+
+    def load(self, symbol: str, date_from: int, date_to: int) -> np.ndarray:
+        """Candles with date_from <= ts <= date_to, oldest first, as CandleStore.load (read-only)"""
+        i = self._index.get(symbol)
+        if i is None:
+            return empty_candles()
+        candles = self.candles[self._offsets[i]:self._offsets[i + 1]]
+        ts = candles["ts"]
+        return candles[int(np.searchsorted(ts, date_from, side="left")):
+                       int(np.searchsorted(ts, date_to, side="right"))]
+
+
+def write_snapshot(path: str, resolution: str, parts: Dict[str, np.ndarray], covered_from: Dict[str, int]):
+    """
+    Write per-symbol candle arrays as a snapshot file at path
+
+    The file is written next to path and renamed over it, so readers that
+    already mapped the old snapshot keep reading it.
+    """
+    offsets = np.cumsum([0] + [len(candles) for candles in parts.values()]).tolist()
+    header = {"version": SNAPSHOT_VERSION, "resolution": resolution, "symbols": list(parts),
+              "offsets": offsets, "covered_from": covered_from, "built": time.time()}
+    header["candles_offset"] = -(-(len(SNAPSHOT_MAGIC) + 4 + len(json.dumps(header)) + 64)
+                                 // SNAPSHOT_ALIGN) * SNAPSHOT_ALIGN
+    text = json.dumps(header).encode()
+
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(SNAPSHOT_MAGIC + len(text).to_bytes(4, "little") + text)
+            f.write(b"\0" * (header["candles_offset"] - f.tell()))
+            for candles in parts.values():
+                f.write(np.ascontiguousarray(candles, dtype=CANDLE_DTYPE).tobytes())
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def refresh_snapshot(store: CandleStore, resolution: str, path: str) -> CandleSnapshot:
+    """
+    Bring the snapshot at path up to date with store and open it
+
+    The store only rewrites a symbol's older candles when its coverage
+    moves as well (a fetch reaching further back, or prune()); otherwise
+    candles change from its newest one on. So symbols whose coverage is
+    unchanged just reread from their last snapshot candle on, the others in
+    full, and the file is rewritten only when something changed.
+    """
+    old = None
+    if os.path.exists(path):
+        try:
+            old = CandleSnapshot(path)
+        except (ValueError, OSError, KeyError):
+            old = None  # Unreadable or older format: rebuild
+        if old is not None and old.resolution != resolution:
+            old = None
+
+    symbols = store.symbols(resolution)
+    coverage = store.coverage(resolution)
+    changed = old is None or symbols != old.symbols
+    parts = {}
+    for symbol in symbols:
+        previous = empty_candles()
+        if old is not None and old.covered_from.get(symbol) == coverage.get(symbol):
+            previous = old.load(symbol, *ALL_TIME)
+        if not len(previous):
+            parts[symbol] = store.load(symbol, resolution, *ALL_TIME)
+            changed = True
+            continue
+        tail = store.load(symbol, resolution, int(previous["ts"][-1]), ALL_TIME[1])
+        if len(tail) == 1 and tail[0] == previous[-1]:
+            parts[symbol] = previous
+        else:
+            parts[symbol] = merge_candles(previous, tail)
+            changed = True
+
+    if not changed:
+        return old
+    write_snapshot(path, resolution, parts, {s: coverage[s] for s in symbols if s in coverage})
+    return CandleSnapshot(path)
@@ -0,0 +1,111 @@
+"""
+Chain Analytics Module
+Max pain, OI walls and support/resistance for a parsed option chain, computed
+in one vectorized pass and cached on the chain
+"""
+
+from typing import Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from config import CHAIN_WALLS_TOP_N
+from option_chain_data import OptionChain, oi_change_pct
+
+
+class ChainAnalytics:
+    """
+    Strike-level analytics of one OptionChain
+
+    - pain[i]: total payout to option holders if expiry settles at
+      strikes[i]; max_pain is the strike where it is lowest
+    - ce_walls / pe_walls: strikes holding the most OI (highest first), with
+      ce_wall_oi / pe_wall_oi; *_change_walls rank by OI added since prev_oi
+    - resistance / support: OI-weighted strike of the CE walls at or above
+      spot / PE walls at or below spot
+    - resistance_weakening / support_weakening: the bull/bear option
+      confirmation for any price, answered from prefix counts in O(log n)
+    """
+
+    def __init__(self, chain: OptionChain, top_n: int = CHAIN_WALLS_TOP_N):
+        strikes = chain.strikes
+        ce_oi, pe_oi = chain.ce["oi"], chain.pe["oi"]
+        self.strikes = strikes
+        spot = chain.greeks["spot"] if chain.greeks else chain.spot
+        self.spot = float(spot) if spot is not None and np.isfinite(spot) else None
+
+        self.total_ce_oi = float(ce_oi.sum())
+        self.total_pe_oi = float(pe_oi.sum())
+        self.pcr = self.total_pe_oi / self.total_ce_oi if self.total_ce_oi > 0 else 0.0
+
+        # Payout at settlement S = strikes[k]: calls below k pay S - K, puts above k pay K - S
+        ce_cum, ce_cum_k = np.cumsum(ce_oi), np.cumsum(ce_oi * strikes)
+        pe_rest = np.cumsum(pe_oi[::-1])[::-1]
+        pe_rest_k = np.cumsum((pe_oi * strikes)[::-1])[::-1]
+        self.pain = (strikes * ce_cum - ce_cum_k) + (pe_rest_k - strikes * pe_rest)
+        self.max_pain = float(strikes[np.argmin(self.pain)]) if len(strikes) else None
+
+        self.ce_change = ce_oi - chain.ce["prev_oi"]
+        self.pe_change = pe_oi - chain.pe["prev_oi"]
+        ce_top = _top(ce_oi, top_n)
+        pe_top = _top(pe_oi, top_n)
+        self.ce_walls, self.ce_wall_oi = strikes[ce_top], ce_oi[ce_top]
+        self.pe_walls, self.pe_wall_oi = strikes[pe_top], pe_oi[pe_top]
+        ce_add = _top(self.ce_change, top_n)
+        pe_add = _top(self.pe_change, top_n)
+        self.ce_change_walls, self.ce_wall_change = strikes[ce_add], self.ce_change[ce_add]
+        self.pe_change_walls, self.pe_wall_change = strikes[pe_add], self.pe_change[pe_add]
+
+        reference = self.spot if self.spot is not None else self.max_pain
+        self.resistance = self.support = None
+        if reference is not None:
+            self.resistance = _weighted(self.ce_walls, self.ce_wall_oi, self.ce_walls >= reference)
+            self.support = _weighted(self.pe_walls, self.pe_wall_oi, self.pe_walls <= reference)
+
+        ce_pct, pe_pct = oi_change_pct(chain, slice(None))
+        # Put addition / call unwinding weakens resistance; the mirror image weakens support
+        self._resistance_weak = np.concatenate(([0], np.cumsum((pe_pct > 10) | (ce_pct < -10))))
+        self._support_weak = np.concatenate(([0], np.cumsum((ce_pct > 10) | (pe_pct < -10))))
+
+    def _near(self, price: float, pct: float) -> Tuple[int, int]:
+        band = abs(price) * pct
+        return (int(np.searchsorted(self.strikes, price - band, side="left")),
+                int(np.searchsorted(self.strikes, price + band, side="right")))
+
+    def resistance_weakening(self, price: float, pct: float = 0.02) -> bool:
+        """Any strike within pct of price with PE OI up >10% or CE OI down >10%"""
+        lo, hi = self._near(price, pct)
+        return bool(self._resistance_weak[hi] > self._resistance_weak[lo])
+
+    def support_weakening(self, price: float, pct: float = 0.02) -> bool:
+        """Any strike within pct of price with CE OI up >10% or PE OI down >10%"""
+        lo, hi = self._near(price, pct)
+        return bool(self._support_weak[hi] > self._support_weak[lo])
+
+    def walls_table(self) -> pd.DataFrame:
+        """Top OI and OI-change walls side by side, one rank per row"""
+        columns = {
+            "CE Wall": self.ce_walls, "CE OI": self.ce_wall_oi,
+            "PE Wall": self.pe_walls, "PE OI": self.pe_wall_oi,
+            "CE Add Strike": self.ce_change_walls, "CE OI Added": self.ce_wall_change,
+            "PE Add Strike": self.pe_change_walls, "PE OI Added": self.pe_wall_change,
+        }
+        return pd.DataFrame({name: pd.Series(values) for name, values in columns.items()})
+
+
+def _top(values: np.ndarray, n: int) -> np.ndarray:
+    """Positions of the n largest positive values, largest first"""
+    order = np.argsort(-values, kind="stable")[:n]
+    return order[values[order] > 0]
+
+
+def _weighted(strikes: np.ndarray, weights: np.ndarray, mask: np.ndarray) -> Optional[float]:
+    total = weights[mask].sum()
+    return float((strikes[mask] * weights[mask]).sum() / total) if total > 0 else None
+
+
+def chain_analytics(chain: OptionChain) -> ChainAnalytics:
+    """Analytics for chain, computed on first use and kept on it (chains are rebuilt each refresh)"""
+    if chain.analytics is None:
+        chain.analytics = ChainAnalytics(chain)
+    return chain.analytics
@@ -12,6 +12,176 @@ FYERS_REDIRECT_URI = "https://www.google.com"
 FYERS_BASE = "https://api-t1.fyers.in"
 # ==============================================================================
 
+# Max number of /data/history requests issued in parallel during a scan
+HISTORY_FETCH_WORKERS = 8
+
+# Max number of option chain requests in flight (3 indices x 4 expiries)
+OPTION_CHAIN_FETCH_WORKERS = 12
+
+# Keep-alive connections held per host by FyersClient (>= HISTORY_FETCH_WORKERS)
+HTTP_POOL_SIZE = 16
+
+# Client-side request pacing per limit group: [(max_requests, period_seconds), ...]
+# Mirrors Fyers' published limits of 10 requests/second and 200 requests/minute
+RATE_LIMITS = {
+    "data": [(10, 1.0), (200, 60.0)],
+    "account": [(10, 1.0), (200, 60.0)],
+}
+
+# Endpoint -> limit group. Endpoints in one group share a queue, so a
+# high-priority watchlist quote is served ahead of queued scanner history.
+RATE_LIMIT_GROUPS = {
+    "quotes": "data",
+    "history": "data",
+    "option_chain": "data",
+    "account": "account",
+}
+
+# Seconds a cached response stays fresh, per endpoint
+RESPONSE_CACHE_TTLS = {
+    "quotes": 1.0,
+    "option_chain": 5.0,
+}
+
+# Memory cap for the process-wide response cache (LRU eviction beyond this)
+RESPONSE_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+# On-disk candle cache consulted by FyersClient.fetch_history before the API
+CANDLE_STORE_PATH = "data/candles.sqlite3"
+
+# Headless scanner (scanner.py): seconds between scan cycles and where snapshots go
+SCANNER_INTERVAL = 60
+SCANNER_SNAPSHOT_PATH = "data/scan_snapshot.pkl"
+
+# Scan results older than this (seconds) are flagged as stale on the dashboard
+SCANNER_MAX_AGE = 180
+
+# Days of 5-minute candles a scan fetches per symbol
+SCAN_HISTORY_DAYS = 30
+
+# Screener (screener.py): named numbers screens can use, evaluated in order
+SCREEN_VALUES = {
+    "bull_score": "score(price_chg, 2, 3, 1, 2, 0.3, 1) + score(vol_ratio, 2, 2, 1.5, 1) + score(oi_chg, 10, 2, 5, 1)",
+    "bear_score": "score(-price_chg, 2, 3, 1, 2, 0.3, 1) + score(vol_ratio, 2, 2, 1.5, 1) + score(oi_chg, 10, 2, 5, 1)",
+}
+
+# Named screens, each tagged as a boolean column on scan results. The breakout
+# classifier reads bull_breakout / bear_breakout, main.py's score view
+# score_bull / score_bear.
+SCREENS = {
+    "bull_breakout": "ltp > prev_week_high and vol_ratio >= 2 and abs(oi_chg) > 10",
+    "bear_breakout": "ltp < prev_week_low and vol_ratio >= 2 and abs(oi_chg) > 10 and not bull_breakout",
+    "score_bull": "bull_score >= 3 and bull_score > bear_score",
+    "score_bear": "bear_score >= 3 and bear_score > bull_score",
+    "gap_up": "open > prev_day_high",
+    "gap_down": "open < prev_day_low",
+    "iv_spike": "iv_chg > 10",
+    "volume_surge": "vol_ratio >= 3",
+    "long_buildup": "price_chg > 0.5 and oi_chg > 5",
+    "short_buildup": "price_chg < -0.5 and oi_chg > 5",
+    "short_covering": "price_chg > 0.5 and oi_chg < -5",
+    "long_unwinding": "price_chg < -0.5 and oi_chg < -5",
+    "near_week_high": "prev_week_high * 0.99 <= ltp <= prev_week_high",
+    "near_week_low": "prev_week_low <= ltp <= prev_week_low * 1.01",
+}
+
+# Backtest (backtest.py): entry screens replayed over stored 5-minute candles;
+# "bull" entries go long and "bear" entries short. Candles carry no OI, so these
+# are the price/volume half of bull_breakout / bear_breakout.
+BACKTEST_SCREENS = {
+    "bull": "ltp > prev_week_high and vol_ratio >= 2",
+    "bear": "ltp < prev_week_low and vol_ratio >= 2",
+}
+
+# Holding periods to simulate, in 5-minute bars, and round-trip costs in percent
+BACKTEST_HOLDS = [3, 6, 12, 24, 75]
+BACKTEST_COST_PCT = 0.05
+
+# Memory-mapped snapshot of the candle store the backtest reads from, refreshed per run
+BACKTEST_SNAPSHOT_PATH = "data/backtest_candles.bin"
+
+# Universe scan (universe_scan.py): worker processes (None = one per CPU core),
+# shards per worker, and strikes fetched to option-confirm breakout candidates
+UNIVERSE_SCAN_WORKERS = None
+UNIVERSE_SCAN_SHARDS_PER_WORKER = 4
+UNIVERSE_SCAN_STRIKE_COUNT = 10
+
+# Shared market snapshot (market_snapshot.py): seconds between quote/chain refreshes
+MARKET_REFRESH_INTERVAL = 2
+
+# Watchlist symbols / option chains stop being refreshed this long after the last read
+MARKET_INTEREST_TTL = 300
+
+# Run the scan inside the dashboard process; set False when scanner.py runs separately
+SCANNER_IN_DASHBOARD = True
+
+# Longest a page waits on a cold snapshot before rendering what it has
+MARKET_WAIT_TIMEOUT = 15
+
+# Fyers accepts at most this many symbols per /data/quotes request
+QUOTES_BATCH_SIZE = 50
+
+# Live tick stream (tick_feed.py): "fyers" for the Fyers data socket, "local" for a
+# stand-in server at TICK_FEED_URL, or None to keep polling quotes
+TICK_FEED = "fyers"
+TICK_FEED_URL = "ws://127.0.0.1:8765"
+
+# Tick feed reconnect backoff bounds (seconds)
+TICK_RECONNECT_MIN = 1
+TICK_RECONNECT_MAX = 30
+
+# Watchlist table refresh (seconds): it reruns as a fragment on this timer, reading
+# the shared snapshot (polled quotes) or the tick stream's last-price table
+WATCHLIST_REFRESH_INTERVAL = MARKET_REFRESH_INTERVAL
+STREAM_REFRESH_INTERVAL = 0.5
+
+# Tables longer than this are sent without a pandas Styler, whose serialization
+# cost grows with every cell; their cell colors are shown as 🟢/🔴 markers instead
+STYLED_TABLE_MAX_ROWS = 300
+
+# Sidebar balance is refetched after this many seconds (or on its Refresh button)
+SIDEBAR_FUNDS_TTL = 60
+
+# Incremental indicators (indicators.py): candles in the volume average and the
+# weekly high/low windows (~1 week of 5-min candles)
+INDICATOR_VOL_WINDOW = 20
+INDICATOR_WEEK_WINDOW = 288
+
+# NSE cash session (IST); resampled bars are anchored to it
+NSE_SESSION_OPEN = "09:15"
+NSE_SESSION_CLOSE = "15:30"
+
+# Base candles kept per symbol for resampling (covers the previous full week)
+RESAMPLE_RETENTION_DAYS = 21
+
+# Black-Scholes inputs for option IV / Greeks (option_greeks.py): annual
+# risk-free rate (~91-day T-bill) and continuous dividend yield of the underlying
+OPTION_RISK_FREE_RATE = 0.065
+OPTION_DIVIDEND_YIELD = 0.0
+
+# OI walls (and OI-change walls) per side reported by chain_analytics.py;
+# support/resistance are OI-weighted over these
+CHAIN_WALLS_TOP_N = 5
+
+# Intraday option chain OI history (oi_recorder.py): on-disk log, seconds
+# between snapshots of one chain, and days of snapshots kept on disk
+OI_STORE_PATH = "data/oi_history.sqlite3"
+OI_RECORD_INTERVAL = 60
+OI_RETENTION_DAYS = 5
+
+# Symbol master (symbol_master.py): Fyers instrument CSVs (URLs or local paths)
+# compiled into one memory-mapped table shared by every process, recompiled once
+# it is older than SYMBOL_MASTER_MAX_AGE seconds
+SYMBOL_MASTER_SOURCES = [
+    "https://public.fyers.in/sym_details/NSE_CM.csv",
+    "https://public.fyers.in/sym_details/NSE_FO.csv",
+]
+SYMBOL_MASTER_PATH = "data/symbol_master.bin"
+SYMBOL_MASTER_MAX_AGE = 24 * 3600
+
+# Per-symbol wait (seconds) for a history response before falling back to defaults
+HISTORY_FETCH_TIMEOUT = 20
+
 # Expanded Stock universe with sector mapping (200+ stocks)
 STOCK_UNIVERSE = {
     # IT Sector
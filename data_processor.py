@@ -3,11 +3,22 @@ Data Processing Module
 Handles data transformation, classification logic, and analysis
 """
 
+import numpy as np
 import pandas as pd
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
-from config import STOCK_UNIVERSE
+from typing import Callable, Dict, Hashable, List, Optional, Tuple, Union
+from config import (STOCK_UNIVERSE, SECTOR_INDICES, HISTORY_FETCH_WORKERS, HISTORY_FETCH_TIMEOUT,
+                    OPTION_CHAIN_FETCH_WORKERS, SCAN_HISTORY_DAYS)
 from fyers_client import FyersClient
+from indicators import IndicatorEngine, get_indicator_engine
+from resampler import TimeframeCache, get_timeframe_cache
+from option_chain_data import OptionChain, as_option_chain
+from chain_analytics import chain_analytics
+from symbol_master import SymbolMaster, get_symbol_master
+from option_greeks import atm_iv, chain_greeks, years_to_expiry
+from screener import screen_tags
+from utils import expiry_date
 
 
 def percent_change(old: float, new: float) -> float:
@@ -20,61 +31,210 @@ def percent_change(old: float, new: float) -> float:
         return 0.0
 
 
-def build_df_from_quotes(quotes_json: Dict, client: FyersClient) -> pd.DataFrame:
-    """Build dataframe from Fyers quotes with historical data for volume analysis"""
-    records = []
+def fetch_history_batch(client: FyersClient, symbols: List[str], resolution: str,
+                        date_from: str, date_to: str,
+                        max_workers: int = HISTORY_FETCH_WORKERS,
+                        timeout: float = HISTORY_FETCH_TIMEOUT,
+                        date_from_by_symbol: Optional[Dict[str, str]] = None) -> Dict[str, Dict]:
+    """
+    Fetch history for many symbols in parallel with a bounded worker pool
+    
+    Args:
+        client: Authenticated Fyers client
+        symbols: Full Fyers tickers (e.g. NSE:TCS-EQ)
+        resolution: Candle resolution ("5" for 5 minute)
+        date_from: Range start as epoch seconds string
+        date_to: Range end as epoch seconds string
+        max_workers: Maximum number of requests in flight
+        timeout: Seconds to wait for each symbol's result
+        date_from_by_symbol: Per-symbol range starts overriding date_from
+        
+    Returns:
+        Dict of symbol -> history response ({"s": "error", ...} on failure/timeout)
+    """
+    unique_symbols = list(dict.fromkeys(s for s in symbols if s))
+    starts = date_from_by_symbol or {}
+    calls = {
+        symbol: (lambda symbol=symbol: client.fetch_history(symbol, resolution,
+                                                            starts.get(symbol, date_from), date_to))
+        for symbol in unique_symbols
+    }
+    return _run_batch(calls, max_workers, timeout, "history")
+
+
+def _run_batch(calls: Dict[Hashable, Callable[[], Dict]], max_workers: int, timeout: float,
+               name: str) -> Dict[Hashable, Dict]:
+    """Run API calls on a bounded worker pool; failures and timeouts become {"s": "error"} dicts"""
+    results = {}
+    if not calls:
+        return results
+    
+    workers = max(1, min(max_workers, len(calls)))
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=name)
+    try:
+        futures = {key: executor.submit(call) for key, call in calls.items()}
+        for key, future in futures.items():
+            try:
+                results[key] = future.result(timeout=timeout)
+            except FutureTimeoutError:
+                future.cancel()
+                results[key] = {"s": "error", "message": f"{name} fetch timed out"}
+            except Exception as e:
+                results[key] = {"s": "error", "message": str(e)}
+    finally:
+        # Don't block the caller on stragglers that already timed out
+        executor.shutdown(wait=False, cancel_futures=True)
+    
+    return results
+
+
+def fetch_option_chain_batch(client: FyersClient, keys: List[Tuple[str, str, int]],
+                             max_workers: int = OPTION_CHAIN_FETCH_WORKERS,
+                             timeout: float = HISTORY_FETCH_TIMEOUT) -> Dict[Tuple[str, str, int], Dict]:
+    """
+    Fetch many option chains in parallel with a bounded worker pool
+    
+    Args:
+        client: Authenticated Fyers client
+        keys: (underlying, expiry timestamp or "" for the nearest, strike_count) per chain
+        max_workers: Maximum number of requests in flight
+        timeout: Seconds to wait for each chain's result
+        
+    Returns:
+        Dict of key -> option chain response ({"s": "error", ...} on failure/timeout)
+    """
+    calls = {key: (lambda key=key: client.fetch_option_chain(*key)) for key in dict.fromkeys(keys)}
+    return _run_batch(calls, max_workers, timeout, "option_chain")
+
+
+def load_option_chains(client: FyersClient, keys: List[Tuple[str, str, int]]) -> Tuple[Dict, Dict]:
+    """
+    Fetch, parse and price every (underlying, expiry, strike_count) chain at once
     
-    # Get date range for historical data (last 30 days to get sufficient data)
+    Returns:
+        (chains, errors): key -> OptionChain with greeks filled in, and
+        key -> error message for chains that failed
+    """
+    chains, errors = {}, {}
+    for key, resp in fetch_option_chain_batch(client, keys).items():
+        try:
+            if resp.get("s") == "ok":
+                chains[key] = OptionChain.from_response(resp, key[1])
+            else:
+                errors[key] = resp.get("message", "Unknown error")
+        except Exception as e:
+            errors[key] = str(e)
+    
+    # IV and Greeks for all chains as one batch; analytics once greeks supply the spot
+    items = list(chains.items())
+    for (key, chain), values in zip(items, chain_greeks([(chain, chain.expiry) for key, chain in items])):
+        chain.greeks = values
+        chain_analytics(chain)
+    return chains, errors
+
+
+def build_df_from_quotes(quotes_json: Dict, client: FyersClient,
+                         max_workers: int = HISTORY_FETCH_WORKERS,
+                         engine: Optional[IndicatorEngine] = None,
+                         timeframes: Optional[TimeframeCache] = None) -> pd.DataFrame:
+    """
+    Build dataframe from Fyers quotes with historical data for volume analysis
+    
+    The volume average comes from the incremental indicator engine and the
+    previous day/week high/low from daily/weekly bars resampled from the
+    same 5-minute candles. Symbols both already track only fetch candles
+    since their last one.
+    """
+    engine = engine or get_indicator_engine()
+    timeframes = timeframes or get_timeframe_cache()
+    
+    # Get date range for historical data (last SCAN_HISTORY_DAYS to get sufficient data)
     end_date = datetime.now()
-    start_date = end_date - timedelta(days=30)
+    start_date = end_date - timedelta(days=SCAN_HISTORY_DAYS)
     
     date_from = int(start_date.timestamp())
     date_to = int(end_date.timestamp())
     
-    for item in quotes_json.get("d", []):
+    items = quotes_json.get("d", [])
+    
+    # Fetch new candles for all symbols concurrently and feed engine + resampler
+    symbols = [item.get("n") or item.get("symbol") for item in items]
+    starts = {}
+    for s in symbols:
+        seen = (engine.last_timestamp(s), timeframes.last_timestamp(s))
+        if None not in seen:
+            starts[s] = str(min(seen))
+    history = fetch_history_batch(client, symbols, "5", str(date_from), str(date_to),
+                                  max_workers=max_workers, date_from_by_symbol=starts)
+    for symbol, hist_data in history.items():
+        if hist_data.get("s") == "ok" and len(hist_data.get("candles", ())):
+            engine.update(symbol, hist_data["candles"])
+            timeframes.update(symbol, hist_data["candles"])
+    
+    return frame_from_quotes(items, engine, timeframes)
+
+
+def frame_from_quotes(items: List[Dict], engine: IndicatorEngine, timeframes: TimeframeCache,
+                      master: Optional[SymbolMaster] = None) -> pd.DataFrame:
+    """
+    Scan frame rows for quote items from indicators and bars already fed with their candles
+    
+    This is the CPU side of build_df_from_quotes, without any API calls, so
+    universe scan workers can run it on their own engine and cache.
+    """
+    records = []
+    symbols = [item.get("n") or item.get("symbol") for item in items]
+    
+    # Short names and sectors for every quote from the symbol master's ticker table
+    master = master or get_symbol_master()
+    ids = master.ids_of([s or "" for s in symbols])
+    short_names = master.short_names(ids)
+    sectors = master.sectors(ids)
+    
+    for item, n, short, sector in zip(items, symbols, short_names, sectors):
         try:
-            n = item.get("n") or item.get("symbol")
             v = item.get("v", {})
-            short = n.split(":")[-1].replace("-EQ", "").replace("-INDEX", "") if n else None
-            
-            sector = STOCK_UNIVERSE.get(short, "Unknown")
+            if not short and n:
+                # Not in the master: fall back to the ticker itself
+                short = n.split(":")[-1].replace("-EQ", "").replace("-INDEX", "")
+                sector = STOCK_UNIVERSE.get(short, "Unknown")
             
             ltp = float(v.get("lp") or v.get("ltp") or 0)
             prev_close = float(v.get("prev_close_price", ltp) or ltp)
+            day_open = float(v.get("open_price", ltp) or ltp)
             current_vol = float(v.get("volume", 0) or 0)
             oi = float(v.get("open_interest", 0) or 0)
             prev_oi = float(v.get("prev_open_interest", oi) or oi)
             
-            # Fetch historical data for this symbol
-            hist_data = client.fetch_history(n, "5", str(date_from), str(date_to))
-            
-            # Calculate 20-period average volume from 5-minute candles
+            # 20-period average volume and weekly high/low from 5-minute candles
             vol_20_avg = 100000  # Default
+            prev_day_high = prev_close * 1.02
+            prev_day_low = prev_close * 0.98
             prev_week_high = prev_close * 1.05
             prev_week_low = prev_close * 0.95
             
-            if hist_data and hist_data.get("s") == "ok" and hist_data.get("candles"):
-                candles = hist_data.get("candles", [])
-                if len(candles) >= 20:
-                    # Get last 20 candles' volume
-                    last_20_vols = [c[5] for c in candles[-20:]]  # Volume is at index 5
-                    vol_20_avg = sum(last_20_vols) / 20
-                    
-                    # Get actual weekly high and low
-                    last_week_highs = [c[2] for c in candles[-288:]]  # ~1 week of 5-min candles
-                    last_week_lows = [c[3] for c in candles[-288:]]
-                    if last_week_highs:
-                        prev_week_high = max(last_week_highs)
-                        prev_week_low = min(last_week_lows)
+            indicator_values = engine.values(n)
+            if indicator_values is not None:
+                # Rolling 288-candle high/low stands in until a full previous week is stored
+                vol_20_avg, prev_week_high, prev_week_low = indicator_values
+            
+            prev_day = timeframes.previous_bar(n, "D")
+            if prev_day is not None:
+                prev_day_high, prev_day_low = float(prev_day["high"]), float(prev_day["low"])
+            prev_week = timeframes.previous_bar(n, "W")
+            if prev_week is not None:
+                prev_week_high, prev_week_low = float(prev_week["high"]), float(prev_week["low"])
             
             records.append({
                 "symbol": short or n,
+                "ticker": n,
                 "name": v.get("description", short or n),
                 "sector": sector,
                 "current_close": ltp,
+                "open": day_open,
                 "prev_close": prev_close,
-                "prev_day_high": prev_close * 1.02,
-                "prev_day_low": prev_close * 0.98,
+                "prev_day_high": prev_day_high,
+                "prev_day_low": prev_day_low,
                 "prev_week_high": prev_week_high,
                 "prev_week_low": prev_week_low,
                 "oi_prev": prev_oi,
@@ -90,93 +250,113 @@ def build_df_from_quotes(quotes_json: Dict, client: FyersClient) -> pd.DataFrame
     return pd.DataFrame(records)
 
 
-def check_resistance_weakening(row: pd.Series, option_data: Optional[Dict]) -> bool:
+# Sector index ticker -> display name
+SECTOR_INDEX_NAMES = {sym: name for name, sym in SECTOR_INDICES.items()}
+
+
+def build_sector_df(quotes_json: Dict) -> pd.DataFrame:
+    """Build the sector performance table from quotes of SECTOR_INDICES symbols"""
+    sector_data = []
+    for item in quotes_json.get("d", []):
+        v = item.get("v", {})
+        symbol = item.get("n", "")
+        
+        sector_name = SECTOR_INDEX_NAMES.get(symbol)
+        
+        if sector_name:
+            ltp = float(v.get("lp") or v.get("ltp") or 0)
+            prev = float(v.get("prev_close_price", ltp) or ltp)
+            chg = ltp - prev
+            chg_pct = (chg / prev * 100) if prev > 0 else 0
+            
+            sector_data.append({
+                'Sector': sector_name,
+                'Last': round(ltp, 2),
+                'Change': round(chg, 2),
+                'Change %': round(chg_pct, 2),
+                'Status': '🟢 Bullish' if chg_pct > 0.5 else '🔴 Bearish' if chg_pct < -0.5 else '⚪ Neutral'
+            })
+    
+    if not sector_data:
+        return pd.DataFrame()
+    return pd.DataFrame(sector_data).sort_values('Change %', ascending=False)
+
+
+def build_term_structure_df(chains: Dict[Tuple[str, str, int], OptionChain]) -> pd.DataFrame:
+    """One row per underlying and expiry: OI totals, PCR, max OI strikes, max pain and ATM IV"""
+    records = []
+    for (symbol, _, _), chain in sorted(chains.items()):
+        if not chain.size or not chain.expiry:
+            continue
+        stats = chain_analytics(chain)
+        records.append({
+            "Underlying": symbol,
+            "Expiry": expiry_date(chain.expiry),
+            "Days": round(years_to_expiry(chain.expiry) * 365, 1),
+            "Spot": stats.spot if stats.spot is not None else np.nan,
+            "Call OI": stats.total_ce_oi,
+            "Put OI": stats.total_pe_oi,
+            "PCR": stats.pcr,
+            # Highest call OI caps the upside, highest put OI supports the downside
+            "Max CE OI Strike": float(stats.ce_walls[0]) if len(stats.ce_walls) else np.nan,
+            "Max PE OI Strike": float(stats.pe_walls[0]) if len(stats.pe_walls) else np.nan,
+            "Max Pain": stats.max_pain,
+            "ATM IV": atm_iv(chain) or np.nan,
+        })
+    return pd.DataFrame(records)
+
+
+def check_resistance_weakening(row: pd.Series,
+                               option_data: Union[OptionChain, Dict, None]) -> bool:
     """
     Check if resistance is weakening:
     - Put addition (long buildup) OR
     - Call unwinding (short covering)
+    
+    option_data may be a raw chain response or an already-parsed OptionChain.
     """
     if not option_data:
         return True
     
     try:
+        chain = as_option_chain(option_data)
         ltp = row["current_close"]
+        if ltp == 0:
+            return True  # No sensible 2% band
         
-        # Find strikes near current price (within 2%)
-        nearby_strikes = []
-        for opt in option_data.get("optionsChain", []):
-            strike = opt.get("strike_price", 0)
-            if abs(strike - ltp) / ltp <= 0.02:  # Within 2%
-                nearby_strikes.append(opt)
-        
-        for strike_data in nearby_strikes:
-            put_data = strike_data.get("put", {})
-            call_data = strike_data.get("call", {})
-            
-            # Put OI increase (long buildup)
-            put_oi_chg = percent_change(
-                put_data.get("prev_oi", put_data.get("oi", 0)),
-                put_data.get("oi", 0)
-            )
-            
-            # Call OI decrease (unwinding)
-            call_oi_chg = percent_change(
-                call_data.get("prev_oi", call_data.get("oi", 0)),
-                call_data.get("oi", 0)
-            )
-            
-            if put_oi_chg > 10 or call_oi_chg < -10:
-                return True
-        
-        return False
+        # Put OI increase (long buildup) or call OI decrease (unwinding) within 2%,
+        # from the chain's cached analytics
+        return chain_analytics(chain).resistance_weakening(ltp, 0.02)
     except:
         return True  # Default to True if option data unavailable
 
 
-def check_support_weakening(row: pd.Series, option_data: Optional[Dict]) -> bool:
+def check_support_weakening(row: pd.Series,
+                            option_data: Union[OptionChain, Dict, None]) -> bool:
     """
     Check if support is weakening:
     - Call addition (short buildup) OR
     - Put unwinding (long covering)
+    
+    option_data may be a raw chain response or an already-parsed OptionChain.
     """
     if not option_data:
         return True
     
     try:
+        chain = as_option_chain(option_data)
         ltp = row["current_close"]
+        if ltp == 0:
+            return True
         
-        # Find strikes near current price
-        nearby_strikes = []
-        for opt in option_data.get("optionsChain", []):
-            strike = opt.get("strike_price", 0)
-            if abs(strike - ltp) / ltp <= 0.02:
-                nearby_strikes.append(opt)
-        
-        for strike_data in nearby_strikes:
-            put_data = strike_data.get("put", {})
-            call_data = strike_data.get("call", {})
-            
-            # Call OI increase (short buildup)
-            call_oi_chg = percent_change(
-                call_data.get("prev_oi", call_data.get("oi", 0)),
-                call_data.get("oi", 0)
-            )
-            
-            # Put OI decrease (unwinding)
-            put_oi_chg = percent_change(
-                put_data.get("prev_oi", put_data.get("oi", 0)),
-                put_data.get("oi", 0)
-            )
-            
-            if call_oi_chg > 10 or put_oi_chg < -10:
-                return True
-        
-        return False
+        # Call OI increase (short buildup) or put OI decrease (unwinding) within 2%
+        return chain_analytics(chain).support_weakening(ltp, 0.02)
     except:
         return True
 
 
-def classify_row_advanced(row: pd.Series, option_data: Optional[Dict] = None) -> Optional[str]:
+def classify_row_advanced(row: pd.Series,
+                          option_data: Union[OptionChain, Dict, None] = None) -> Optional[str]:
     """
     Enhanced classification logic:
     
@@ -235,6 +415,56 @@ def classify_row_advanced(row: pd.Series, option_data: Optional[Dict] = None) ->
         return None
 
 
+def _tags_from_masks(index: pd.Index, bull: np.ndarray, bear: np.ndarray) -> pd.Series:
+    """Build a "bull"/"bear"/None object Series; bull wins where both are set"""
+    tags = np.full(len(index), None, dtype=object)
+    tags[bear] = "bear"
+    tags[bull] = "bull"
+    return pd.Series(tags, index=index, dtype=object)
+
+
+def classify_frame_advanced(df: pd.DataFrame,
+                            option_data: Union[OptionChain, Dict, None] = None) -> pd.Series:
+    """
+    Columnar version of classify_row_advanced for a whole scan frame
+    
+    Price/volume/OI conditions are the bull_breakout / bear_breakout screens
+    from config.SCREENS; option confirmation (when option_data is given)
+    only runs for candidate rows. Returns the same "bull"/"bear"/None values
+    as the row-wise function with the default screens.
+    """
+    if df.empty:
+        return pd.Series([], index=df.index, dtype=object)
+    
+    masks = screen_tags(df, ["bull_breakout", "bear_breakout"])
+    bull = masks["bull_breakout"].to_numpy(copy=True)
+    bear = masks["bear_breakout"].to_numpy(copy=True)
+    
+    if option_data:
+        option_data = as_option_chain(option_data)  # Parse the raw chain once for all rows
+        for pos in np.flatnonzero(bull):
+            bull[pos] = check_resistance_weakening(df.iloc[pos], option_data)
+        for pos in np.flatnonzero(bear):
+            bear[pos] = check_support_weakening(df.iloc[pos], option_data)
+    
+    return _tags_from_masks(df.index, bull, bear)
+
+
+def classify_frame_score(df: pd.DataFrame) -> pd.Series:
+    """
+    Columnar version of the score-based classify_row from main.py
+    
+    Bull/bear scores come from price change, volume ratio and OI change
+    buckets (SCREEN_VALUES); a side wins with a score >= 3 that beats the
+    other side (the score_bull / score_bear screens).
+    """
+    if df.empty:
+        return pd.Series([], index=df.index, dtype=object)
+    
+    masks = screen_tags(df, ["score_bull", "score_bear"])
+    return _tags_from_masks(df.index, masks["score_bull"].to_numpy(), masks["score_bear"].to_numpy())
+
+
 def apply_filters(df: pd.DataFrame, sector_filter: List[str], 
                  min_volume_ratio: float) -> pd.DataFrame:
     """Apply sector and volume filters to dataframe"""
@@ -242,13 +472,38 @@ def apply_filters(df: pd.DataFrame, sector_filter: List[str],
     if "All" not in sector_filter and sector_filter:
         df = df[df["sector"].isin(sector_filter)]
     
-    # Apply volume filter
-    df["vol_ratio"] = df["vol_current"] / df["vol_20_avg"]
+    # Apply volume filter (assign returns a copy, so a shared input frame is never mutated)
+    df = df.assign(vol_ratio=df["vol_current"] / df["vol_20_avg"])
     df = df[df["vol_ratio"] >= min_volume_ratio]
     
     return df
 
 
+def mark_to_market(holdings_data: Dict, positions_data: Dict, prices: Dict[str, float]) -> tuple:
+    """Copies of holdings/positions responses revalued at live prices ({symbol: ltp})"""
+    def revalue(data, key, update):
+        if not data or data.get("s") != "ok":
+            return data
+        rows = []
+        for row in data.get(key, []):
+            ltp = prices.get(row.get("symbol"))
+            if ltp is not None:
+                row = dict(row, ltp=ltp)
+                try:
+                    update(row, float(ltp))
+                except:
+                    pass
+            rows.append(row)
+        return dict(data, **{key: rows})
+    
+    def update_position(p, ltp):
+        qty = float(p.get("netQty", p.get("qty", 0)) or 0)
+        p["unrealized_profit"] = (ltp - float(p.get("netAvg", p.get("avgPrice", 0)) or 0)) * qty
+    
+    return (revalue(holdings_data, "holdings", lambda h, ltp: None),
+            revalue(positions_data, "netPositions", update_position))
+
+
 def calculate_pnl_summary(holdings_data: Dict, positions_data: Dict) -> Dict[str, float]:
     """Calculate P&L summary from holdings and positions"""
     holdings_pnl = 0.0
@@ -5,23 +5,76 @@ Handles all interactions with Fyers API for authentication and data retrieval
 
 import requests
 import hashlib
+import logging
+import threading
 import urllib.parse
-from typing import Dict, List, Optional
-import streamlit as st
-from config import FYERS_BASE, FYERS_CLIENT_ID
-from fyers_apiv3 import fyersModel
+from typing import Dict, List, Optional, Tuple
+from requests.adapters import HTTPAdapter
+from config import (FYERS_BASE, HTTP_POOL_SIZE, RATE_LIMITS, RATE_LIMIT_GROUPS,
+                    CANDLE_STORE_PATH, RESPONSE_CACHE_TTLS)
+from candle_data import to_candles
+from candle_store import CandleStore
+from response_cache import ResponseCache, get_response_cache
+from rate_limiter import RequestScheduler, PRIORITY_HIGH, PRIORITY_NORMAL, PRIORITY_LOW
 
+logger = logging.getLogger(__name__)
+
+
+def resolve_option_symbol(symbol: str) -> str:
+    """Map an index short name to the Fyers underlying used for option chains"""
+    if symbol == "NIFTY50":
+        return "NSE:NIFTY50-INDEX"
+    elif symbol == "BANKNIFTY":
+        return "NSE:NIFTYBANK-INDEX"
+    elif symbol == "FINNIFTY":
+        return "NSE:FINNIFTY-INDEX"
+    return symbol
 
 
 class FyersClient:
     """Client for interacting with Fyers API"""
     
-    def __init__(self, client_id: str, client_secret: str = None, access_token: str = None):
+    def __init__(self, client_id: str, client_secret: str = None, access_token: str = None,
+                 pool_size: int = HTTP_POOL_SIZE, candle_store: Optional[CandleStore] = None,
+                 cache: Optional[ResponseCache] = None):
         self.client_id = client_id
         self.client_secret = client_secret
         self.access_token = access_token
         self.base_url = FYERS_BASE
-        self.fyers = fyersModel.FyersModel(client_id=FYERS_CLIENT_ID, token=access_token, is_async=False)
+        self.session = self._build_session(pool_size)
+        self.scheduler = RequestScheduler(RATE_LIMITS, RATE_LIMIT_GROUPS)
+        self.candle_store = candle_store
+        self.cache = cache
+    
+    def _build_session(self, pool_size: int) -> requests.Session:
+        """Create a keep-alive session with a connection pool and default auth header"""
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        if self.access_token:
+            session.headers.update({"Authorization": f"{self.client_id}:{self.access_token}"})
+        return session
+    
+    def close(self):
+        """Close pooled connections"""
+        self.session.close()
+    
+    def _get(self, endpoint: str, url: str, params: Dict = None, timeout: float = 10,
+             priority: int = PRIORITY_NORMAL) -> Dict:
+        """Paced GET: waits for the endpoint's rate limit, retries once after HTTP 429"""
+        for attempt in range(2):
+            self.scheduler.acquire(endpoint, priority)
+            resp = self.session.get(url, params=params, timeout=timeout)
+            if resp.status_code == 429 and attempt == 0:
+                self.scheduler.record_throttle(endpoint)
+                continue
+            resp.raise_for_status()
+            return resp.json()
+    
+    def rate_limit_stats(self) -> Dict[str, Dict[str, float]]:
+        """Queue depth and wait-time metrics per limit group"""
+        return self.scheduler.stats()
         
     
     @staticmethod
@@ -50,43 +103,92 @@ class FyersClient:
             "appIdHash": appIdHash,
             "code": code,
         }
-        resp = requests.post(url, json=payload, timeout=15)
+        resp = self.session.post(url, json=payload, timeout=15)
         resp.raise_for_status()
         return resp.json()
     
-    def fetch_quotes(self, symbols: List[str]) -> Dict:
-        """Fetch live quotes from Fyers API"""
+    def fetch_quotes(self, symbols: List[str], priority: int = PRIORITY_NORMAL) -> Dict:
+        """
+        Fetch live quotes from Fyers API
+        
+        With a response cache attached, quotes are cached per symbol, so
+        overlapping symbol sets only fetch the symbols nobody has fresh.
+        """
         try:
-            url = f"{self.base_url}/data/quotes?symbols=" + urllib.parse.quote(",".join(symbols))
-            auth_header = f"{self.client_id}:{self.access_token}"
-            headers = {"Authorization": auth_header}
-            resp = requests.get(url, headers=headers, timeout=10)
-            resp.raise_for_status()
-            return resp.json()
+            if self.cache is None:
+                return self._fetch_quotes_remote(symbols, priority)
+            
+            def fetch_missing(keys):
+                resp = self._fetch_quotes_remote([k[1] for k in keys], priority)
+                if resp.get("s") != "ok":
+                    raise RuntimeError(resp.get("message", "quotes fetch failed"))
+                by_symbol = {item.get("n"): item for item in resp.get("d", [])}
+                return {k: by_symbol.get(k[1]) for k in keys}
+            
+            keys = [("quotes", s) for s in symbols]
+            items = self.cache.get_many(keys, RESPONSE_CACHE_TTLS["quotes"], fetch_missing)
+            return {"s": "ok", "d": [items[k] for k in keys if k in items]}
         except Exception as e:
-            st.error(f"Quotes fetch error: {e}")
+            logger.warning("Quotes fetch error: %s", e)
             return {"s": "error", "message": str(e)}
     
+    def _fetch_quotes_remote(self, symbols: List[str], priority: int = PRIORITY_NORMAL) -> Dict:
+        """Fetch quotes straight from the API"""
+        url = f"{self.base_url}/data/quotes?symbols=" + urllib.parse.quote(",".join(symbols))
+        return self._get("quotes", url, priority=priority)
+    
     def fetch_history(self, symbol: str, resolution: str, date_from: str, 
-                     date_to: str) -> Dict:
-        """Fetch historical data for volume and price analysis"""
+                     date_to: str, priority: int = PRIORITY_LOW) -> Dict:
+        """
+        Fetch historical data for volume and price analysis
+        
+        With a candle store attached, only candles after the newest stored one
+        are requested; the full range is then served from the store.
+        "candles" in the response is a candle_data structured array.
+        """
+        if self.candle_store is None:
+            return self._fetch_history_remote(symbol, resolution, date_from, date_to, priority)
+        
         try:
-            url = f"{self.base_url}/data/history"
-            auth_header = f"{self.client_id}:{self.access_token}"
-            headers = {"Authorization": auth_header}
+            start, end = int(date_from), int(date_to)
+            store = self.candle_store
+            covered_from = store.covered_from(symbol, resolution)
+            last_ts = store.last_timestamp(symbol, resolution)
+            
+            fetch_from = start
+            if covered_from is not None and covered_from <= start and last_ts is not None:
+                fetch_from = max(start, last_ts)  # Refetch the last candle, it may still have been forming
+            
+            if fetch_from < end:
+                resp = self._fetch_history_remote(symbol, resolution, str(fetch_from), date_to, priority)
+                if resp.get("s") == "ok":
+                    store.append(symbol, resolution, resp["candles"])
+                    store.mark_covered(symbol, resolution, fetch_from)
+                elif last_ts is None:
+                    return resp
             
+            return {"s": "ok", "candles": store.load(symbol, resolution, start, end)}
+        except Exception as e:
+            return {"s": "error", "message": str(e)}
+    
+    def _fetch_history_remote(self, symbol: str, resolution: str, date_from: str,
+                              date_to: str, priority: int = PRIORITY_LOW) -> Dict:
+        """Fetch a history range straight from the API (epoch second bounds)"""
+        try:
+            url = f"{self.base_url}/data/history"
             params = {
                 "symbol": symbol,
                 "resolution": resolution,  # "5" for 5 minute
-                "date_format": "1",
+                "date_format": "0",  # range_from/range_to are epoch seconds
                 "range_from": date_from,
                 "range_to": date_to,
                 "cont_flag": "1"
             }
             
-            resp = requests.get(url, params=params, headers=headers, timeout=15)
-            resp.raise_for_status()
-            return resp.json()
+            resp = self._get("history", url, params=params, timeout=15, priority=priority)
+            if resp.get("s") == "ok":
+                resp["candles"] = to_candles(resp.get("candles"))
+            return resp
         except Exception as e:
             return {"s": "error", "message": str(e)}
     
@@ -94,11 +196,7 @@ class FyersClient:
         """Fetch account funds"""
         try:
             url = f"{self.base_url}/api/v3/funds"
-            auth_header = f"{self.client_id}:{self.access_token}"
-            headers = {"Authorization": auth_header}
-            resp = requests.get(url, headers=headers, timeout=10)
-            resp.raise_for_status()
-            return resp.json()
+            return self._get("account", url, priority=PRIORITY_HIGH)
         except Exception as e:
             return {"s": "error", "message": str(e)}
     
@@ -106,11 +204,7 @@ class FyersClient:
         """Fetch holdings"""
         try:
             url = f"{self.base_url}/api/v3/holdings"
-            auth_header = f"{self.client_id}:{self.access_token}"
-            headers = {"Authorization": auth_header}
-            resp = requests.get(url, headers=headers, timeout=10)
-            resp.raise_for_status()
-            return resp.json()
+            return self._get("account", url, priority=PRIORITY_HIGH)
         except Exception as e:
             return {"s": "error", "message": str(e)}
     
@@ -118,45 +212,58 @@ class FyersClient:
         """Fetch positions"""
         try:
             url = f"{self.base_url}/api/v3/positions"
-            auth_header = f"{self.client_id}:{self.access_token}"
-            headers = {"Authorization": auth_header}
-            resp = requests.get(url, headers=headers, timeout=10)
-            resp.raise_for_status()
-            return resp.json()
+            return self._get("account", url, priority=PRIORITY_HIGH)
         except Exception as e:
             return {"s": "error", "message": str(e)}
     
     def fetch_option_chain(self, symbol: str, expiry_date: str, strike_count: int = 50) -> Dict:
-        """Fetch option chain data"""
+        """Fetch option chain data (served from the response cache while fresh)"""
+        if self.cache is None:
+            return self._fetch_option_chain_remote(symbol, expiry_date, strike_count)
+        
+        key = ("option_chain", symbol, expiry_date, strike_count)
+        # Only successful chains are cached; errors are retried on the next call
+        return self.cache.get_or_fetch(
+            key, RESPONSE_CACHE_TTLS["option_chain"],
+            lambda: self._fetch_option_chain_remote(symbol, expiry_date, strike_count),
+            cache_if=lambda resp: resp.get("s") == "ok"
+        )
+    
+    def _fetch_option_chain_remote(self, symbol: str, expiry_date: str, strike_count: int = 50) -> Dict:
+        """Fetch option chain data straight from the API"""
         try:
-            if symbol == "NIFTY50":
-                option_symbol = "NSE:NIFTY50-INDEX"
-            elif symbol == "BANKNIFTY":
-                option_symbol = "NSE:NIFTYBANK-INDEX"
-            else:
-                option_symbol = symbol
-            
-            data = {
-                "symbol": option_symbol,
+            url = f"{self.base_url}/data/options-chain-v3"
+            params = {
+                "symbol": resolve_option_symbol(symbol),
                 "strikecount": strike_count,
-                "timestamp": ""
+                "timestamp": expiry_date  # Expiry timestamp from the response's expiryData; "" = nearest expiry
             }
-
-            response = self.fyers.optionchain(data=data)
-            print("----------------option chain------------------\n")
-            print(response)
-            print("----------------------------------------------\n")
-           
-            return response
+            return self._get("option_chain", url, params=params)
         except Exception as e:
             return {"s": "error", "message": str(e)}
 
 
+_shared_clients: Dict[Tuple[str, str], FyersClient] = {}
+_shared_clients_lock = threading.Lock()
+
+
+def get_shared_client(client_id: str, access_token: str) -> FyersClient:
+    """Process-wide client per credentials, reused across reruns, sessions and the scanner"""
+    key = (client_id, access_token)
+    with _shared_clients_lock:
+        if key not in _shared_clients:
+            _shared_clients[key] = FyersClient(client_id=client_id, access_token=access_token,
+                                               candle_store=CandleStore(CANDLE_STORE_PATH),
+                                               cache=get_response_cache())
+        return _shared_clients[key]
+
+
 def get_fyers_client() -> Optional[FyersClient]:
-    """Get Fyers client from session state"""
+    """Get Fyers client from Streamlit session state"""
+    import streamlit as st
     if st.session_state.get("fyers_access_token"):
-        return FyersClient(
-            client_id=st.session_state.get("fyers_client_id"),
-            access_token=st.session_state.get("fyers_access_token")
+        return get_shared_client(
+            st.session_state.get("fyers_client_id"),
+            st.session_state.get("fyers_access_token")
         )
     return None
@@ -0,0 +1,172 @@
+"""
+Indicators Module
+Incremental rolling-window indicators per symbol, updated in O(1) per new candle
+"""
+
+import threading
+from collections import deque
+from typing import Dict, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from candle_data import to_candles
+from config import INDICATOR_VOL_WINDOW, INDICATOR_WEEK_WINDOW
+
+
+class RollingSum:
+    """Sum of the last `window` values using a ring buffer and a running total"""
+
+    def __init__(self, window: int):
+        self.window = window
+        self._buf = [0.0] * window
+        self._pos = 0
+        self.count = 0
+        self.total = 0.0
+
+    def push(self, value: float):
+        self.total += value - self._buf[self._pos]
+        self._buf[self._pos] = value
+        self._pos = (self._pos + 1) % self.window
+        self.count += 1
+        if self._pos == 0:
+            # Re-sum once per lap so float drift can't accumulate (amortized O(1))
+            self.total = sum(self._buf)
+
+
+class RollingExtreme:
+    """Max (or min) of the last `window` values using a monotonic deque"""
+
+    def __init__(self, window: int, use_max: bool = True):
+        self.window = window
+        self.use_max = use_max
+        self._deque: deque = deque()
+        self.count = 0
+
+    def push(self, value: float):
+        dq = self._deque
+        if self.use_max:
+            while dq and dq[-1][1] <= value:
+                dq.pop()
+        else:
+            while dq and dq[-1][1] >= value:
+                dq.pop()
+        dq.append((self.count, value))
+        self.count += 1
+        while dq[0][0] <= self.count - 1 - self.window:
+            dq.popleft()
+
+    @property
+    def value(self) -> Optional[float]:
+        return self._deque[0][1] if self._deque else None
+
+
+class SymbolIndicators:
+    """
+    Rolling state for one symbol's candle stream
+
+    Closed candles go into the rolling windows; the newest candle is held
+    aside as still forming, so a refetched last candle just replaces it.
+    Windows over closed candles are one shorter than the indicator windows
+    and the forming candle is folded in on read, which gives exactly the
+    values of computing over candles[-20:] / candles[-288:].
+    """
+
+    def __init__(self, vol_window: int = INDICATOR_VOL_WINDOW, week_window: int = INDICATOR_WEEK_WINDOW):
+        self.vol_window = vol_window
+        self.volume = RollingSum(max(1, vol_window - 1))
+        self.high = RollingExtreme(max(1, week_window - 1), use_max=True)
+        self.low = RollingExtreme(max(1, week_window - 1), use_max=False)
+        self.forming: Optional[tuple] = None
+        self.count = 0
+
+    @property
+    def last_timestamp(self) -> Optional[int]:
+        return int(self.forming[0]) if self.forming is not None else None
+
+    def add(self, candle: Sequence[float]):
+        """Feed one (ts, open, high, low, close, volume) candle; stale ones are ignored"""
+        if self.forming is not None:
+            if candle[0] < self.forming[0]:
+                return
+            if candle[0] == self.forming[0]:
+                self.forming = candle
+                return
+            self.volume.push(float(self.forming[5]))
+            self.high.push(float(self.forming[2]))
+            self.low.push(float(self.forming[3]))
+        self.forming = candle
+        self.count += 1
+
+    def add_many(self, candles: np.ndarray):
+        """Feed a candle array (oldest first); only the tail that can still matter is iterated"""
+        # Anything older than the longest window plus the forming candle drops out anyway
+        keep = max(self.volume.window, self.high.window) + 1
+        if len(candles) > keep and self.forming is not None:
+            candles = candles[int(np.searchsorted(candles["ts"], self.forming[0], side="left")):]
+        skipped = len(candles) - keep
+        if skipped > 0:
+            if self.forming is not None and candles["ts"][0] == self.forming[0]:
+                skipped -= 1  # Replaces the forming candle, doesn't add one
+            self.count += skipped
+            candles = candles[len(candles) - keep:]
+        for candle in candles.tolist():
+            self.add(candle)
+
+    def values(self) -> Optional[Tuple[float, float, float]]:
+        """(vol_20_avg, week_high, week_low), or None until vol_window candles are seen"""
+        if self.count < self.vol_window:
+            return None
+        f = self.forming
+        vol_sum = self.volume.total if self.volume.window < self.vol_window else 0.0
+        week_high = float(f[2]) if self.high.value is None else max(self.high.value, float(f[2]))
+        week_low = float(f[3]) if self.low.value is None else min(self.low.value, float(f[3]))
+        return (vol_sum + float(f[5])) / self.vol_window, week_high, week_low
+
+
+class IndicatorEngine:
+    """SymbolIndicators keyed by symbol, safe to update from scan worker threads"""
+
+    def __init__(self, vol_window: int = INDICATOR_VOL_WINDOW, week_window: int = INDICATOR_WEEK_WINDOW):
+        self.vol_window = vol_window
+        self.week_window = week_window
+        self._symbols: Dict[str, SymbolIndicators] = {}
+        self._lock = threading.Lock()
+
+    def last_timestamp(self, symbol: str) -> Optional[int]:
+        """Timestamp of the newest candle seen for symbol, or None if never fed"""
+        state = self._symbols.get(symbol)
+        return state.last_timestamp if state is not None else None
+
+    def update(self, symbol: str, candles: Union[np.ndarray, Sequence[Sequence[float]]]):
+        """Feed candles (candle array or rows, oldest first); already-seen ones are skipped"""
+        candles = to_candles(candles)
+        with self._lock:
+            state = self._symbols.get(symbol)
+            if state is None:
+                state = self._symbols[symbol] = SymbolIndicators(self.vol_window, self.week_window)
+            state.add_many(candles)
+
+    def values(self, symbol: str) -> Optional[Tuple[float, float, float]]:
+        with self._lock:
+            state = self._symbols.get(symbol)
+            return state.values() if state is not None else None
+
+    def reset(self, symbol: Optional[str] = None):
+        with self._lock:
+            if symbol is None:
+                self._symbols.clear()
+            else:
+                self._symbols.pop(symbol, None)
+
+
+_shared_engine: Optional[IndicatorEngine] = None
+_shared_lock = threading.Lock()
+
+
+def get_indicator_engine() -> IndicatorEngine:
+    """The process-wide engine shared by the scanner and every session"""
+    global _shared_engine
+    with _shared_lock:
+        if _shared_engine is None:
+            _shared_engine = IndicatorEngine()
+        return _shared_engine
@@ -8,6 +8,8 @@ import hashlib
 import urllib.parse
 import uuid
 import time
+from data_processor import classify_frame_score
+from utils import search_symbols
 
 # ==============================================================================
 # 🎯 USER-PROVIDED FYERS CREDENTIALS (SET AS DEFAULTS)
@@ -52,6 +54,9 @@ STOCK_UNIVERSE = {
     "NIFTY50": "Index", "BANKNIFTY": "Index", "SENSEX": "Index", "FINNIFTY": "Index"
 }
 
+# One list object, so the search index built for it is reused on every keystroke
+STOCK_SYMBOLS = list(STOCK_UNIVERSE)
+
 # Sector indices mapping
 SECTOR_INDICES = {
     "NIFTY AUTO": "NSE:NIFTY_AUTO-INDEX",
@@ -424,7 +429,7 @@ if page_selection == 'Watchlist':
     
     # Suggestions
     if search_term:
-        suggestions = [s for s in STOCK_UNIVERSE.keys() if search_term.upper() in s.upper()][:10]
+        suggestions = search_symbols(search_term, STOCK_SYMBOLS)
         if suggestions:
             st.markdown("**Suggestions:**")
             cols = st.columns(min(5, len(suggestions)))
@@ -587,7 +592,7 @@ elif page_selection == 'Bull/Bear Dashboard':
             df = build_df_from_quotes(resp)
             
             if not df.empty:
-                df["daily_tag"] = df.apply(lambda r: classify_row(r, "daily"), axis=1)
+                df["daily_tag"] = classify_frame_score(df)
                 
                 st.subheader("📊 Bull/Bear Stock Lists")
                 
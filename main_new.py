@@ -16,7 +16,6 @@ Architecture:
 """
 
 import streamlit as st
-import time
 from fyers_client import get_fyers_client
 from ui_components import (
     render_custom_css,
@@ -41,9 +40,6 @@ def initialize_session_state():
     
     if 'selected_option_symbol' not in st.session_state:
         st.session_state['selected_option_symbol'] = "NIFTY50"
-    
-    if 'last_auto_refresh' not in st.session_state:
-        st.session_state['last_auto_refresh'] = time.time()
 
 
 def main():
@@ -90,13 +86,6 @@ def main():
     
     # Footer
     render_footer()
-    
-    # Auto-refresh for watchlist page
-    if page_selection == 'Watchlist' and client:
-        current_time = time.time()
-        if current_time - st.session_state['last_auto_refresh'] >= 10:
-            st.session_state['last_auto_refresh'] = current_time
-            st.rerun()
 
 
 if __name__ == "__main__":
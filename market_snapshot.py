@@ -0,0 +1,280 @@
+"""
+Market Snapshot Module
+One background refresher per server process that keeps a versioned, immutable
+snapshot of quotes, sector performance, scan results and option chains for
+every dashboard session to render from
+"""
+
+import logging
+import threading
+import time
+from typing import Callable, Dict, Hashable, List, Optional, Tuple
+
+import pandas as pd
+
+from config import (SECTOR_INDICES, SCANNER_INTERVAL, SCANNER_IN_DASHBOARD, MARKET_REFRESH_INTERVAL,
+                    MARKET_INTEREST_TTL, MARKET_WAIT_TIMEOUT, QUOTES_BATCH_SIZE)
+from data_processor import build_sector_df, load_option_chains
+from fyers_client import FyersClient
+from oi_recorder import get_oi_recorder
+from option_chain_data import OptionChain
+from rate_limiter import PRIORITY_HIGH
+from scanner import ScanSnapshot, ScannerService, load_snapshot
+
+logger = logging.getLogger(__name__)
+
+ChainKey = Tuple[str, str, int]
+
+
+class MarketSnapshot:
+    """
+    Immutable view of the market at one refresh cycle
+
+    Nothing here is mutated after construction; the refresher builds a new
+    snapshot each cycle and swaps the reference, so readers never see a
+    half-updated mix of old and new data. `errors` maps "quotes", "scan" or
+    an option chain key to the last failure for that part; `requested` holds
+    the symbols and chain keys the cycle tried to fetch.
+    """
+
+    def __init__(self, version: int, created_at: float, quotes: Dict[str, Dict],
+                 sectors: pd.DataFrame, scan: Optional[ScanSnapshot],
+                 option_chains: Dict[ChainKey, OptionChain], errors: Dict[Hashable, str],
+                 requested: frozenset = frozenset()):
+        self.version = version
+        self.created_at = created_at
+        self.quotes = quotes
+        self.sectors = sectors
+        self.scan = scan
+        self.option_chains = option_chains
+        self.errors = errors
+        self.requested = requested
+
+    @property
+    def age(self) -> float:
+        """Seconds since the snapshot was built"""
+        return time.time() - self.created_at
+
+    def covers(self, items: List[Hashable]) -> bool:
+        """True once a cycle has tried every symbol / chain key in items"""
+        return self.requested.issuperset(items)
+
+    def quotes_response(self, symbols: List[str]) -> Dict:
+        """Quotes for symbols in the fetch_quotes response shape"""
+        return {"s": "ok", "d": [self.quotes[s] for s in symbols if s in self.quotes]}
+
+
+EMPTY_SNAPSHOT = MarketSnapshot(0, 0.0, {}, pd.DataFrame(), None, {}, {})
+
+
+class MarketRefresher:
+    """
+    Background loop that rebuilds the shared MarketSnapshot
+
+    Sector quotes are always refreshed. Watchlist symbols and option chains
+    are refreshed while some session has asked for them within
+    MARKET_INTEREST_TTL. With run_scanner, a ScannerService thread scans on
+    its own cadence; a newer snapshot published by a separate scanner.py
+    process is preferred. While no session reads the snapshot for
+    MARKET_INTEREST_TTL, the loop stops calling the API.
+    """
+
+    def __init__(self, client: FyersClient, interval: float = MARKET_REFRESH_INTERVAL,
+                 run_scanner: bool = SCANNER_IN_DASHBOARD):
+        self.client = client
+        self.interval = interval
+        self._snapshot = EMPTY_SNAPSHOT
+        self._cond = threading.Condition()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._interest_lock = threading.Lock()
+        self._quote_interest: Dict[str, float] = {}
+        self._chain_interest: Dict[ChainKey, float] = {}
+        self._last_read = time.monotonic()
+        self._scanner = ScannerService(client, interval=SCANNER_INTERVAL, publish=self._on_scan) if run_scanner else None
+
+    @property
+    def runs_scanner(self) -> bool:
+        return self._scanner is not None
+
+    def snapshot(self) -> MarketSnapshot:
+        """Current snapshot; never blocks"""
+        if time.monotonic() - self._last_read > MARKET_INTEREST_TTL:
+            self._wake.set()
+        self._last_read = time.monotonic()
+        return self._snapshot
+
+    def wait_for(self, predicate: Callable[[MarketSnapshot], bool],
+                 timeout: float = MARKET_WAIT_TIMEOUT) -> MarketSnapshot:
+        """Block until the snapshot satisfies predicate or timeout passes; returns the latest either way"""
+        snapshot = self.snapshot()
+        if predicate(snapshot):
+            return snapshot
+        self._wake.set()
+        with self._cond:
+            self._cond.wait_for(lambda: predicate(self._snapshot), timeout)
+            return self._snapshot
+
+    def refresh_now(self, timeout: float = MARKET_WAIT_TIMEOUT) -> MarketSnapshot:
+        """
+        Refresh (and, with the in-dashboard scanner, scan) right away
+
+        Blocks until a snapshot built after the call, carrying a scan started
+        after it when the scanner runs here, or until timeout passes. A
+        separate scanner.py process keeps its own cadence.
+        """
+        requested = time.time()
+        if self._scanner is not None:
+            self._scanner.scan_now()
+        return self.wait_for(lambda s: s.created_at >= requested and (
+            self._scanner is None or (s.scan is not None and s.scan.created_at >= requested)), timeout)
+
+    def track_quotes(self, symbols: List[str]):
+        """Keep symbols in the refreshed quote set"""
+        now = time.monotonic()
+        with self._interest_lock:
+            new = any(s not in self._quote_interest for s in symbols)
+            for s in symbols:
+                self._quote_interest[s] = now
+        if new:
+            self._wake.set()
+
+    def track_option_chain(self, symbol: str, expiry: str, strike_count: int) -> ChainKey:
+        """Keep an option chain in the refreshed set; returns its snapshot key"""
+        key = (symbol, expiry, strike_count)
+        with self._interest_lock:
+            new = key not in self._chain_interest
+            self._chain_interest[key] = time.monotonic()
+        if new:
+            self._wake.set()
+        return key
+
+    def track_expiry_chains(self, symbols: List[str], strike_count: int, count: int) -> List[ChainKey]:
+        """
+        Keep each underlying's next `count` listed expiries in the refreshed set; returns their keys
+
+        The nearest chain ("" expiry) is tracked first: it lists the live
+        expiries, so the later chains are keyed by their real timestamps.
+        Until it has loaded only the nearest key is returned.
+        """
+        nearest = [self.track_option_chain(symbol, "", strike_count) for symbol in symbols]
+        snapshot = self.wait_for(lambda s: s.covers(nearest))
+        keys = []
+        for key in nearest:
+            chain = snapshot.option_chains.get(key)
+            keys.append(key)
+            keys += [self.track_option_chain(key[0], expiry, strike_count)
+                     for expiry in (chain.expiries[1:count] if chain is not None else [])]
+        return keys
+
+    def _interest(self) -> Tuple[List[str], List[ChainKey]]:
+        cutoff = time.monotonic() - MARKET_INTEREST_TTL
+        with self._interest_lock:
+            for table in (self._quote_interest, self._chain_interest):
+                for key in [k for k, seen in table.items() if seen < cutoff]:
+                    del table[key]
+            return list(self._quote_interest), list(self._chain_interest)
+
+    def _on_scan(self, scan: ScanSnapshot):
+        self._wake.set()
+
+    def _latest_scan(self) -> Optional[ScanSnapshot]:
+        scans = [s for s in (self._scanner.latest() if self._scanner else None, load_snapshot()) if s is not None]
+        return max(scans, key=lambda s: s.created_at) if scans else None
+
+    def refresh(self) -> MarketSnapshot:
+        """Run one refresh cycle and publish the new snapshot"""
+        prev = self._snapshot
+        errors = {}
+        quote_symbols, chain_keys = self._interest()
+
+        symbols = list(dict.fromkeys(list(SECTOR_INDICES.values()) + quote_symbols))
+        quotes = {}
+        for i in range(0, len(symbols), QUOTES_BATCH_SIZE):
+            resp = self.client.fetch_quotes(symbols[i:i + QUOTES_BATCH_SIZE], priority=PRIORITY_HIGH)
+            if resp.get("s") == "ok":
+                quotes.update((item.get("n"), item) for item in resp.get("d", []))
+            else:
+                errors["quotes"] = resp.get("message", "Unknown error")
+        # Keep last known quotes for symbols whose batch failed
+        quotes = {s: quotes.get(s, prev.quotes.get(s)) for s in symbols if s in quotes or s in prev.quotes}
+
+        try:
+            sectors = build_sector_df({"d": list(quotes.values())})
+        except Exception as e:
+            errors["sectors"] = str(e)
+            sectors = prev.sectors
+
+        # All tracked chains are fetched concurrently, then priced as one batch
+        option_chains, chain_errors = load_option_chains(self.client, chain_keys)
+        errors.update(chain_errors)
+        for key in chain_errors:
+            if key in prev.option_chains:
+                option_chains[key] = prev.option_chains[key]
+        # Freshly fetched chains feed the intraday OI history (throttled per chain)
+        try:
+            recorder = get_oi_recorder()
+            for key, chain in option_chains.items():
+                if key not in chain_errors:
+                    recorder.record(key[0], chain.expiry or key[1], chain)
+        except Exception as e:
+            errors["oi_history"] = str(e)
+
+        scan = self._latest_scan()
+        if scan is not None and scan.error:
+            errors["scan"] = scan.error
+
+        snapshot = MarketSnapshot(prev.version + 1, time.time(), quotes, sectors, scan, option_chains, errors,
+                                  frozenset(symbols) | frozenset(chain_keys))
+        with self._cond:
+            self._snapshot = snapshot
+            self._cond.notify_all()
+        return snapshot
+
+    def run_forever(self):
+        """Blocking refresh loop until stop() is called"""
+        while not self._stop.is_set():
+            self._wake.clear()
+            idle = time.monotonic() - self._last_read > MARKET_INTEREST_TTL
+            if self._scanner is not None:
+                if idle:
+                    self._scanner.stop()
+                else:
+                    self._scanner.start()
+            if not idle:
+                try:
+                    self.refresh()
+                except Exception:
+                    logger.exception("Market snapshot refresh failed")
+            self._wake.wait(self.interval)
+
+    def start(self):
+        """Run the loop on a daemon thread"""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self.run_forever, name="market-refresher", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+        if self._scanner is not None:
+            self._scanner.stop()
+
+
+_refreshers: Dict[int, MarketRefresher] = {}
+_refreshers_lock = threading.Lock()
+
+
+def get_market_refresher(client: FyersClient) -> MarketRefresher:
+    """The process-wide refresher for a shared client, started on first use"""
+    with _refreshers_lock:
+        refresher = _refreshers.get(id(client))
+        if refresher is None or refresher.client is not client:
+            refresher = MarketRefresher(client)
+            _refreshers[id(client)] = refresher
+            refresher.start()
+        return refresher
@@ -0,0 +1,322 @@
+"""
+OI Recorder Module
+Intraday open-interest history of option chains: one snapshot per interval,
+kept per strike as deltas against the previous snapshot, in memory and in an
+append-only on-disk log
+"""
+
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from config import OI_STORE_PATH, OI_RECORD_INTERVAL, OI_RETENTION_DAYS
+from option_chain_data import OptionChain
+from resampler import IST_OFFSET
+
+INT32_MAX = np.iinfo(np.int32).max
+
+SeriesKey = Tuple[str, str]
+
+
+class OISeries:
+    """
+    OI history of one (underlying, expiry) chain
+
+    Columns are every strike seen so far (ascending), rows are snapshots.
+    `base_*` is each strike's first observed OI and each row holds the
+    change since the previous row, so the OI change over a window is a
+    column sum over the window's rows and nothing has to be reconstructed.
+    A strike missing from a snapshot keeps its last OI (delta 0); before it
+    was first seen it reads as its first observed OI.
+    """
+
+    def __init__(self, capacity: int = 64):
+        self.strikes = np.empty(0)
+        self.times = np.empty(capacity, dtype=np.int64)
+        self.spots = np.empty(capacity)
+        self.ce = np.zeros((capacity, 0), dtype=np.int32)
+        self.pe = np.zeros((capacity, 0), dtype=np.int32)
+        self.base_ce = np.empty(0, dtype=np.int64)
+        self.base_pe = np.empty(0, dtype=np.int64)
+        self.last_ce = np.empty(0, dtype=np.int64)
+        self.last_pe = np.empty(0, dtype=np.int64)
+        self.count = 0
+
+    @property
+    def last_time(self) -> Optional[int]:
+        return int(self.times[self.count - 1]) if self.count else None
+
+    @property
+    def nbytes(self) -> int:
+        arrays = (self.strikes, self.times, self.spots, self.ce, self.pe,
+                  self.base_ce, self.base_pe, self.last_ce, self.last_pe)
+        return sum(a.nbytes for a in arrays)
+
+    def _add_strikes(self, strikes: np.ndarray, ce_oi: np.ndarray, pe_oi: np.ndarray):
+        """Insert columns for strikes not seen before, seeded with their current OI"""
+        new = ~np.isin(strikes, self.strikes)
+        if not new.any():
+            return
+        merged = np.union1d(self.strikes, strikes)
+        old_pos = np.searchsorted(merged, self.strikes)
+        new_pos = np.searchsorted(merged, strikes[new])
+
+        def widen(old, fill, dtype=None):
+            shape = old.shape[:-1] + (len(merged),)
+            out = np.zeros(shape, dtype=dtype or old.dtype)
+            out[..., old_pos] = old
+            if fill is not None:
+                out[..., new_pos] = fill
+            return out
+
+        self.ce, self.pe = widen(self.ce, None), widen(self.pe, None)
+        self.base_ce = widen(self.base_ce, ce_oi[new])
+        self.base_pe = widen(self.base_pe, pe_oi[new])
+        self.last_ce = widen(self.last_ce, ce_oi[new])
+        self.last_pe = widen(self.last_pe, pe_oi[new])
+        self.strikes = merged
+
+    def append(self, ts: int, spot: float, strikes: np.ndarray, ce_oi: np.ndarray, pe_oi: np.ndarray):
+        """Add a snapshot (strikes ascending, OI aligned with them)"""
+        ce_oi = np.asarray(ce_oi).astype(np.int64)
+        pe_oi = np.asarray(pe_oi).astype(np.int64)
+        self._add_strikes(strikes, ce_oi, pe_oi)
+        if self.count == len(self.times):
+            grow = len(self.times)
+            self.times = np.concatenate([self.times, np.empty(grow, dtype=np.int64)])
+            self.spots = np.concatenate([self.spots, np.empty(grow)])
+            self.ce = np.concatenate([self.ce, np.zeros((grow, self.ce.shape[1]), dtype=self.ce.dtype)])
+            self.pe = np.concatenate([self.pe, np.zeros((grow, self.pe.shape[1]), dtype=self.pe.dtype)])
+
+        cols = np.searchsorted(self.strikes, strikes)
+        row = self.count
+        for deltas, last, oi in ((self.ce, self.last_ce, ce_oi), (self.pe, self.last_pe, pe_oi)):
+            change = oi - last[cols]
+            if len(change) and np.abs(change).max() > INT32_MAX:
+                # Never expected for per-minute OI changes; keep exact rather than wrap
+                if deltas is self.ce:
+                    self.ce = deltas = self.ce.astype(np.int64)
+                else:
+                    self.pe = deltas = self.pe.astype(np.int64)
+            deltas[row] = 0
+            deltas[row, cols] = change
+            last[cols] = oi
+        self.times[row] = ts
+        self.spots[row] = spot
+        self.count += 1
+
+    def row_at(self, ts: float) -> int:
+        """Index of the last snapshot taken at or before ts (-1 if none)"""
+        return int(np.searchsorted(self.times[:self.count], ts, side="right")) - 1
+
+    def oi_at(self, row: int) -> Tuple[np.ndarray, np.ndarray]:
+        """(CE, PE) OI per strike as of snapshot row"""
+        return (self.base_ce + self.ce[:row + 1].sum(axis=0),
+                self.base_pe + self.pe[:row + 1].sum(axis=0))
+
+    def change_since(self, row: int, cols: slice) -> Tuple[np.ndarray, np.ndarray]:
+        """(CE, PE) OI change from snapshot row to the latest, for strike positions cols"""
+        return (self.ce[row + 1:self.count, cols].sum(axis=0, dtype=np.int64),
+                self.pe[row + 1:self.count, cols].sum(axis=0, dtype=np.int64))
+
+
+def _pack(values: np.ndarray) -> bytes:
+    """Deltas as int32 (int64 if any doesn't fit), byte-shuffled so zlib sees the mostly-zero high bytes together"""
+    dtype = np.dtype("<i4") if np.abs(values).max(initial=0) <= INT32_MAX else np.dtype("<i8")
+    data = np.ascontiguousarray(values, dtype=dtype).view(np.uint8).reshape(-1, dtype.itemsize)
+    return zlib.compress(data.T.tobytes())
+
+
+def _unpack(blob: bytes, count: int) -> np.ndarray:
+    raw = np.frombuffer(zlib.decompress(blob), dtype=np.uint8)
+    itemsize = len(raw) // count
+    return raw.reshape(itemsize, count).T.copy().view(f"<i{itemsize}").ravel().astype(np.int64)
+
+
+def _previous(prev: Optional[Tuple], strikes: np.ndarray, day: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    OI of the previous stored row aligned to strikes (0 where it had none)
+
+    The first row of each IST day is stored against zeros, i.e. in full, so
+    a day's rows can be decoded without anything older.
+    """
+    ce = np.zeros(len(strikes), dtype=np.int64)
+    pe = np.zeros(len(strikes), dtype=np.int64)
+    if prev is None or prev[0] != day or not len(prev[1]):
+        return ce, pe
+    _, prev_strikes, prev_ce, prev_pe = prev
+    pos = np.minimum(np.searchsorted(prev_strikes, strikes), len(prev_strikes) - 1)
+    match = prev_strikes[pos] == strikes
+    ce[match], pe[match] = prev_ce[pos[match]], prev_pe[pos[match]]
+    return ce, pe
+
+
+class OIRecorder:
+    """
+    Records option chain OI at most once per interval per (underlying, expiry)
+
+    Each snapshot is one append-only SQLite row: the chain's strikes (only
+    when they differ from the previous row) and compressed per-strike OI
+    deltas against the previous row. Today's rows are replayed into
+    memory on start; rows older than OI_RETENTION_DAYS are pruned.
+    """
+
+    def __init__(self, path: Optional[str] = OI_STORE_PATH, interval: float = OI_RECORD_INTERVAL,
+                 retention_days: int = OI_RETENTION_DAYS):
+        self.interval = interval
+        self._series: Dict[SeriesKey, OISeries] = {}
+        # Last row written per series: (IST day, strikes, CE OI, PE OI)
+        self._written: Dict[SeriesKey, Tuple[int, np.ndarray, np.ndarray, np.ndarray]] = {}
+        self._lock = threading.Lock()
+        self._conn = None
+        if path:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS oi_snapshots (
+                    symbol TEXT NOT NULL,
+                    expiry TEXT NOT NULL,
+                    ts INTEGER NOT NULL,
+                    spot REAL,
+                    strikes BLOB,
+                    ce BLOB NOT NULL,
+                    pe BLOB NOT NULL,
+                    PRIMARY KEY (symbol, expiry, ts)
+                ) WITHOUT ROWID
+            """)
+            self._conn.execute("DELETE FROM oi_snapshots WHERE ts < ?",
+                               (int(time.time()) - retention_days * 86400,))
+            self._conn.commit()
+            now = time.time()
+            self._replay(int(now - (now + IST_OFFSET) % 86400))
+
+    @staticmethod
+    def _day(ts: float) -> int:
+        """IST calendar day number of an epoch timestamp"""
+        return int((ts + IST_OFFSET) // 86400)
+
+    def _replay(self, since: int):
+        """Rebuild in-memory series from stored rows with ts >= since (a day start)"""
+        rows = self._conn.execute(
+            "SELECT symbol, expiry, ts, spot, strikes, ce, pe FROM oi_snapshots "
+            "WHERE ts >= ? ORDER BY symbol, expiry, ts", (since,),
+        ).fetchall()
+        for symbol, expiry, ts, spot, strikes_blob, ce_blob, pe_blob in rows:
+            key = (symbol, expiry)
+            prev = self._written.get(key)
+            if strikes_blob is not None:
+                strikes = np.frombuffer(zlib.decompress(strikes_blob), dtype="<f8")
+            else:
+                strikes = prev[1]
+            prev_ce, prev_pe = _previous(prev, strikes, self._day(ts))
+            ce_oi = prev_ce + _unpack(ce_blob, len(strikes))
+            pe_oi = prev_pe + _unpack(pe_blob, len(strikes))
+            self._written[key] = (self._day(ts), strikes, ce_oi, pe_oi)
+            self._series.setdefault(key, OISeries()).append(ts, spot, strikes, ce_oi, pe_oi)
+
+    def record(self, symbol: str, expiry: str, chain: OptionChain, ts: Optional[float] = None) -> bool:
+        """Snapshot a chain's OI unless this series was recorded less than `interval` ago"""
+        if not chain.size:
+            return False
+        ts = int(time.time() if ts is None else ts)
+        key = (symbol, expiry)
+        spot = chain.greeks["spot"] if chain.greeks else chain.spot
+        spot = float(spot) if spot is not None else float("nan")
+        ce_oi = chain.ce["oi"].astype(np.int64)
+        pe_oi = chain.pe["oi"].astype(np.int64)
+        with self._lock:
+            series = self._series.get(key)
+            if series is not None and series.last_time is not None and ts - series.last_time < self.interval:
+                return False
+            if series is None:
+                series = self._series[key] = OISeries()
+            series.append(ts, spot, chain.strikes, ce_oi, pe_oi)
+            if self._conn is not None:
+                self._write(key, ts, spot, chain.strikes, ce_oi, pe_oi)
+        return True
+
+    def _write(self, key: SeriesKey, ts: int, spot: float, strikes: np.ndarray,
+               ce_oi: np.ndarray, pe_oi: np.ndarray):
+        prev = self._written.get(key)
+        day = self._day(ts)
+        prev_ce, prev_pe = _previous(prev, strikes, day)
+        strikes_blob = None
+        if prev is None or prev[0] != day or not np.array_equal(prev[1], strikes):
+            strikes_blob = zlib.compress(np.ascontiguousarray(strikes, dtype="<f8").tobytes())
+        self._conn.execute("INSERT OR REPLACE INTO oi_snapshots VALUES (?, ?, ?, ?, ?, ?, ?)",
+                           key + (ts, spot, strikes_blob, _pack(ce_oi - prev_ce), _pack(pe_oi - prev_pe)))
+        self._conn.commit()
+        self._written[key] = (day, strikes.copy(), ce_oi, pe_oi)
+
+    def series(self, symbol: str, expiry: str) -> Optional[OISeries]:
+        return self._series.get((symbol, expiry))
+
+    def oi_change(self, symbol: str, expiry: str, minutes: float = 30, pct: float = 0.02,
+                  now: Optional[float] = None) -> pd.DataFrame:
+        """
+        CE/PE OI and its change over the last `minutes` at strikes within pct of spot
+
+        The change is measured from the last snapshot at or before the window
+        start (or the first snapshot, if history is shorter). The window
+        actually covered is in df.attrs["since"] / df.attrs["until"] (epoch).
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            series = self._series.get((symbol, expiry))
+            if series is None or not series.count:
+                return pd.DataFrame()
+            latest = series.count - 1
+            spot = series.spots[latest]
+            if not np.isfinite(spot):
+                spot = float(series.strikes[len(series.strikes) // 2])
+            band = abs(spot) * pct
+            cols = slice(int(np.searchsorted(series.strikes, spot - band, side="left")),
+                         int(np.searchsorted(series.strikes, spot + band, side="right")))
+            start = max(series.row_at(now - minutes * 60), 0)
+            ce_chg, pe_chg = series.change_since(start, cols)
+            ce_now, pe_now = series.last_ce[cols], series.last_pe[cols]
+            strikes = series.strikes[cols]
+            since, until = int(series.times[start]), int(series.times[latest])
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ce_old, pe_old = ce_now - ce_chg, pe_now - pe_chg
+            df = pd.DataFrame({
+                "Strike": strikes,
+                "CE OI": ce_now,
+                "CE OI Chg": ce_chg,
+                "CE OI Chg %": np.where(ce_old == 0, 0.0, ce_chg / np.abs(ce_old) * 100.0),
+                "PE OI": pe_now,
+                "PE OI Chg": pe_chg,
+                "PE OI Chg %": np.where(pe_old == 0, 0.0, pe_chg / np.abs(pe_old) * 100.0),
+            })
+        df.attrs["since"], df.attrs["until"] = since, until
+        return df
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+_shared_recorder: Optional[OIRecorder] = None
+_shared_lock = threading.Lock()
+
+
+def get_oi_recorder() -> OIRecorder:
+    """The process-wide recorder fed by the market refresher"""
+    global _shared_recorder
+    with _shared_lock:
+        if _shared_recorder is None:
+            _shared_recorder = OIRecorder()
+        return _shared_recorder
@@ -0,0 +1,133 @@
+"""
+Option Chain Data Module
+Strike-indexed, columnar representation of a Fyers option chain response
+"""
+
+import numpy as np
+from typing import Dict, List, Optional, Tuple, Union
+
+# Per-side fields kept for every strike
+OPTION_FIELDS = ("ltp", "oi", "prev_oi", "volume", "iv")
+
+
+class OptionChain:
+    """
+    Option chain parsed once into sorted strike arrays
+
+    `strikes` is ascending; `ce[field]` / `pe[field]` are float64 arrays
+    aligned with it for every field in OPTION_FIELDS. A side missing at a
+    strike reads as 0; prev_oi falls back to oi - oich, then to oi.
+    `expiries` are the underlying's live expiries as listed by the response
+    (Fyers epoch-second strings, nearest first) and `expiry` the one this
+    chain is for. `greeks` is filled in by the market refresher
+    (option_greeks.chain_greeks) and `analytics` on first use
+    (chain_analytics.chain_analytics).
+    """
+
+    def __init__(self, strikes: np.ndarray, ce: Dict[str, np.ndarray], pe: Dict[str, np.ndarray],
+                 spot: Optional[float] = None, expiry: str = "", expiries: Optional[List[str]] = None):
+        self.strikes = strikes
+        self.ce = ce
+        self.pe = pe
+        self.spot = spot
+        self.expiry = expiry
+        self.expiries = expiries or []
+        self.greeks: Optional[Dict] = None
+        self.analytics = None
+
+    @property
+    def size(self) -> int:
+        """Number of strikes"""
+        return len(self.strikes)
+
+    @classmethod
+    def from_response(cls, option_data: Optional[Dict], expiry: str = "") -> "OptionChain":
+        """
+        Parse a fetch_option_chain response (or its "data" payload)
+
+        Handles both the nested layout ({"strike_price", "call": {...}, "put": {...}})
+        and the flat v3 layout (one entry per option with "option_type" CE/PE).
+        Entries with a missing or non-positive strike (the underlying) are skipped.
+        expiry is the timestamp the chain was requested for; "" (the nearest
+        expiry) resolves to the first listed in expiryData.
+        """
+        payload = option_data or {}
+        if "optionsChain" not in payload:
+            payload = payload.get("data") or {}
+        options = payload.get("optionsChain") or []
+
+        rows = {"CE": {}, "PE": {}}
+        spot = None
+        for opt in options:
+            strike = opt.get("strike_price")
+            if strike is None or (isinstance(strike, (int, float)) and strike <= 0):
+                if spot is None and opt.get("ltp"):
+                    spot = float(opt.get("ltp"))
+                continue
+
+            if "call" in opt or "put" in opt:
+                if opt.get("call"):
+                    rows["CE"][strike] = opt["call"]
+                if opt.get("put"):
+                    rows["PE"][strike] = opt["put"]
+            else:
+                opt_type = (opt.get("option_type") or "").upper()
+                if opt_type in rows:
+                    rows[opt_type][strike] = opt
+
+        strikes = np.array(sorted(set(rows["CE"]) | set(rows["PE"])), dtype=float)
+        ce = cls._side_arrays(strikes, rows["CE"])
+        pe = cls._side_arrays(strikes, rows["PE"])
+        expiries = sorted({str(e["expiry"]) for e in payload.get("expiryData") or [] if e.get("expiry")}, key=int)
+        return cls(strikes, ce, pe, spot, expiry or (expiries[0] if expiries else ""), expiries)
+
+    @staticmethod
+    def _side_arrays(strikes: np.ndarray, side: Dict) -> Dict[str, np.ndarray]:
+        arrays = {field: np.zeros(len(strikes)) for field in OPTION_FIELDS}
+        for i, strike in enumerate(strikes.tolist()):
+            data = side.get(strike)
+            if not data:
+                continue
+            oi = float(data.get("oi") or 0)
+            arrays["ltp"][i] = float(data.get("ltp") or 0)
+            arrays["oi"][i] = oi
+            if data.get("prev_oi") is not None:
+                arrays["prev_oi"][i] = float(data.get("prev_oi") or 0)
+            else:
+                # v3 payloads carry the change ("oich") rather than the previous OI
+                arrays["prev_oi"][i] = oi - float(data.get("oich") or 0)
+            arrays["volume"][i] = float(data.get("volume") or 0)
+            arrays["iv"][i] = float(data.get("iv") or 0)
+        return arrays
+
+    def range_slice(self, low: float, high: float) -> slice:
+        """Positions of strikes with low <= strike <= high (O(log n))"""
+        start = int(np.searchsorted(self.strikes, low, side="left"))
+        stop = int(np.searchsorted(self.strikes, high, side="right"))
+        return slice(start, stop)
+
+    def near_spot(self, spot: float, pct: float) -> slice:
+        """Positions of strikes within pct (e.g. 0.02 for 2%) of spot"""
+        band = abs(spot) * pct
+        return self.range_slice(spot - band, spot + band)
+
+    def head(self, count: int) -> slice:
+        """Positions of the lowest `count` strikes"""
+        return slice(0, min(count, len(self.strikes)))
+
+
+def as_option_chain(option_data: Union[OptionChain, Dict, None]) -> OptionChain:
+    """Accept an already-parsed chain or a raw response"""
+    if isinstance(option_data, OptionChain):
+        return option_data
+    return OptionChain.from_response(option_data)
+
+
+def oi_change_pct(chain: OptionChain, positions: slice) -> Tuple[np.ndarray, np.ndarray]:
+    """(CE, PE) OI % change vs. prev_oi for the given strike positions"""
+    def pct(side):
+        old = side["prev_oi"][positions]
+        new = side["oi"][positions]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(old == 0, 0.0, (new - old) / np.abs(old) * 100.0)
+    return pct(chain.ce), pct(chain.pe)
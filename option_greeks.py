@@ -0,0 +1,244 @@
+"""
+Option Greeks Module
+Vectorized Black-Scholes pricing, implied volatility and Greeks for whole
+option chains; every strike of every expiry is solved as one batch
+"""
+
+import math
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from config import OPTION_RISK_FREE_RATE, OPTION_DIVIDEND_YIELD
+from option_chain_data import OptionChain
+
+YEAR_SECONDS = 365 * 86400
+SQRT_2PI = math.sqrt(2 * math.pi)
+
+# Implied volatility search bracket (annualized, as a fraction)
+IV_MIN = 1e-3
+IV_MAX = 5.0
+
+GREEK_FIELDS = ("iv", "delta", "gamma", "theta", "vega")
+
+
+def norm_pdf(x: np.ndarray) -> np.ndarray:
+    return np.exp(-0.5 * x * x) / SQRT_2PI
+
+
+def norm_cdf(x: np.ndarray) -> np.ndarray:
+    """Standard normal CDF to double precision (Hart's rational approximation)"""
+    x = np.asarray(x, dtype=float)
+    z = np.abs(np.atleast_1d(x))
+    e = np.exp(-0.5 * z * z)
+    num = (((((((3.52624965998911e-02 * z + 0.700383064443688) * z + 6.37396220353165) * z
+               + 33.912866078383) * z + 112.079291497871) * z + 221.213596169931) * z)
+           + 220.206867912376)
+    den = ((((((((8.83883476483184e-02 * z + 1.75566716318264) * z + 16.064177579207) * z
+                + 86.7807322029461) * z + 296.564248779674) * z + 637.333633378831) * z
+             + 793.826512519948) * z) + 440.413735824752)
+    with np.errstate(invalid="ignore"):
+        tail = e * num / den
+    far = z >= 7.07106781186547
+    if far.any():
+        # Continued fraction for the far tail, where the rational form loses accuracy
+        zf, ef = z[far], e[far]
+        tail[far] = ef / (zf + 1 / (zf + 2 / (zf + 3 / (zf + 4 / (zf + 0.65))))) / SQRT_2PI
+    tail[z > 37] = 0.0
+    return np.where(x > 0, 1.0 - tail, tail).reshape(x.shape)
+
+
+def years_to_expiry(expiry: str, now: Optional[float] = None) -> float:
+    """Year fraction from now until a Fyers expiry timestamp (epoch seconds; "" reads as expired)"""
+    now = time.time() if now is None else now
+    return max(0.0, (int(expiry) - now) / YEAR_SECONDS) if expiry else 0.0
+
+
+def _d1_d2(spot, strike, t, sigma, rate, dividend) -> Tuple[np.ndarray, np.ndarray]:
+    vol_t = sigma * np.sqrt(t)
+    d1 = (np.log(spot / strike) + (rate - dividend + 0.5 * sigma * sigma) * t) / vol_t
+    return d1, d1 - vol_t
+
+
+def bs_price(spot, strike, t, sigma, is_call, rate: float = OPTION_RISK_FREE_RATE,
+             dividend: float = OPTION_DIVIDEND_YIELD) -> np.ndarray:
+    """Black-Scholes price; all array arguments broadcast together"""
+    phi = np.where(is_call, 1.0, -1.0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        d1, d2 = _d1_d2(spot, strike, t, sigma, rate, dividend)
+        return phi * (spot * np.exp(-dividend * t) * norm_cdf(phi * d1)
+                      - strike * np.exp(-rate * t) * norm_cdf(phi * d2))
+
+
+def implied_volatility(price, spot, strike, t, is_call, rate: float = OPTION_RISK_FREE_RATE,
+                       dividend: float = OPTION_DIVIDEND_YIELD, tol: float = 1e-6,
+                       max_iter: int = 64) -> np.ndarray:
+    """
+    Implied volatility (annualized fraction) for every option at once
+
+    In-the-money options are solved as their out-of-the-money counterpart
+    through put-call parity, with Newton steps on log price (nearly linear
+    in volatility out of the money, so a handful of steps suffice). Each
+    option keeps a [low, high] bracket that the price error narrows every
+    step; a step that would leave it (vanishing vega, underflow) is replaced
+    by bisection, so every option converges. Finished options drop out of
+    the batch.
+    Prices outside the no-arbitrage bounds, expired options and prices not
+    reachable within [IV_MIN, IV_MAX] give NaN.
+    """
+    price, spot, strike, t, is_call = np.broadcast_arrays(
+        np.asarray(price, dtype=float), np.asarray(spot, dtype=float), np.asarray(strike, dtype=float),
+        np.asarray(t, dtype=float), np.asarray(is_call, dtype=bool))
+    iv = np.full(price.shape, np.nan)
+
+    phi = np.where(is_call, 1.0, -1.0)
+    with np.errstate(invalid="ignore", over="ignore"):
+        fwd_spot = spot * np.exp(-dividend * t)
+        pv_strike = strike * np.exp(-rate * t)
+        lower = np.maximum(phi * (fwd_spot - pv_strike), 0.0)
+        upper = np.where(is_call, fwd_spot, pv_strike)
+        valid = (t > 0) & (spot > 0) & (strike > 0) & (price > lower) & (price < upper)
+    idx = np.flatnonzero(valid)
+    if not len(idx):
+        return iv
+
+    target, phi, t = price[valid], phi[valid], t[valid]
+    fwd_spot, pv_strike = fwd_spot[valid], pv_strike[valid]
+    log_moneyness = np.log(fwd_spot / pv_strike)
+    sqrt_t = np.sqrt(t)
+
+    # Corrado-Miller starting point, on the call price given by put-call parity
+    call = target + np.where(phi > 0, 0.0, fwd_spot - pv_strike)
+    intrinsic = phi * (fwd_spot - pv_strike)
+    itm = intrinsic > 0
+    target = np.where(itm, target - intrinsic, target)
+    phi = np.where(itm, -phi, phi)
+    half_gap = (fwd_spot - pv_strike) / 2
+    root = np.sqrt(np.maximum((call - half_gap) ** 2 - (2 * half_gap) ** 2 / math.pi, 0.0))
+    sigma = SQRT_2PI / sqrt_t / (fwd_spot + pv_strike) * (call - half_gap + root)
+    sigma = np.clip(np.nan_to_num(sigma, nan=0.3), 2 * IV_MIN, IV_MAX / 2)
+    low = np.full(len(idx), IV_MIN)
+    high = np.full(len(idx), IV_MAX)
+
+    active = np.arange(len(idx))
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        for _ in range(max_iter):
+            s, ph, ts = sigma, phi[active], sqrt_t[active]
+            vol_t = s * ts
+            d1 = (log_moneyness[active] + 0.5 * vol_t * vol_t) / vol_t
+            d2 = d1 - vol_t
+            fs, pk = fwd_spot[active], pv_strike[active]
+            model = ph * (fs * norm_cdf(ph * d1) - pk * norm_cdf(ph * d2))
+            goal = target[active]
+            diff = model - goal
+            vega = fs * norm_pdf(d1) * ts
+
+            high = np.where(diff > 0, s, high)
+            low = np.where(diff < 0, s, low)
+            done = (np.abs(diff) < tol) | (high - low < 1e-10)
+            iv[idx[active[done]]] = s[done]
+
+            step = s - np.log(model / goal) * model / vega
+            bisect = ~((step > low) & (step < high))
+            sigma = np.where(bisect, 0.5 * (low + high), step)
+
+            keep = ~done
+            active, sigma, low, high = active[keep], sigma[keep], low[keep], high[keep]
+            if not len(active):
+                break
+
+    # Bracket pinned at either end means the price was out of reach
+    iv[(iv <= IV_MIN * (1 + 1e-6)) | (iv >= IV_MAX * (1 - 1e-6))] = np.nan
+    return iv
+
+
+def greeks(spot, strike, t, sigma, is_call, rate: float = OPTION_RISK_FREE_RATE,
+           dividend: float = OPTION_DIVIDEND_YIELD) -> Dict[str, np.ndarray]:
+    """
+    Black-Scholes Greeks per unit of the underlying
+
+    Theta is per calendar day and vega per 1 volatility point; a NaN sigma
+    gives NaN Greeks.
+    """
+    phi = np.where(is_call, 1.0, -1.0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        d1, d2 = _d1_d2(spot, strike, t, sigma, rate, dividend)
+        sqrt_t = np.sqrt(t)
+        carry = np.exp(-dividend * t)
+        discount = np.exp(-rate * t)
+        pdf_d1 = norm_pdf(d1)
+        cdf_d1 = norm_cdf(phi * d1)
+        delta = phi * carry * cdf_d1
+        gamma = carry * pdf_d1 / (spot * sigma * sqrt_t)
+        vega = spot * carry * pdf_d1 * sqrt_t
+        theta = (-spot * carry * pdf_d1 * sigma / (2 * sqrt_t)
+                 - phi * rate * strike * discount * norm_cdf(phi * d2)
+                 + phi * dividend * spot * carry * cdf_d1)
+    return {"delta": delta, "gamma": gamma, "theta": theta / 365, "vega": vega / 100}
+
+
+def implied_spot(chain: OptionChain, t: float, rate: float = OPTION_RISK_FREE_RATE,
+                 dividend: float = OPTION_DIVIDEND_YIELD) -> Optional[float]:
+    """Underlying price from put-call parity at the strike where CE and PE prices are closest"""
+    ce, pe = chain.ce["ltp"], chain.pe["ltp"]
+    both = np.flatnonzero((ce > 0) & (pe > 0))
+    if not len(both):
+        return None
+    i = both[np.argmin(np.abs(ce[both] - pe[both]))]
+    forward = ce[i] - pe[i] + chain.strikes[i] * math.exp(-rate * t)
+    return float(forward * math.exp(dividend * t))
+
+
+def chain_greeks(chains: Sequence[Tuple[OptionChain, str]], now: Optional[float] = None,
+                 rate: float = OPTION_RISK_FREE_RATE,
+                 dividend: float = OPTION_DIVIDEND_YIELD) -> List[Dict]:
+    """
+    IV and Greeks for every strike of every (chain, expiry) pair in one batch
+
+    Returns one dict per chain: {"spot", "t", "ce": {field: array}, "pe": {...}}
+    with GREEK_FIELDS arrays aligned to chain.strikes and "iv" in percent like
+    the API's own iv field. The spot is chain.spot, or implied from put-call
+    parity when the response didn't include the underlying.
+    """
+    now = time.time() if now is None else now
+    spots, times, parts = [], [], []
+    for chain, expiry in chains:
+        t = years_to_expiry(expiry, now)
+        spot = chain.spot or implied_spot(chain, t, rate, dividend) or np.nan
+        spots.append(spot)
+        times.append(t)
+        n = chain.size
+        parts.append((np.concatenate([chain.ce["ltp"], chain.pe["ltp"]]),
+                      np.tile(chain.strikes, 2),
+                      np.full(2 * n, spot), np.full(2 * n, t),
+                      np.repeat([True, False], n)))
+
+    if not parts:
+        return []
+    price, strike, spot, t, is_call = (np.concatenate(cols) for cols in zip(*parts))
+    sigma = implied_volatility(price, spot, strike, t, is_call, rate, dividend)
+    values = greeks(spot, strike, t, sigma, is_call, rate, dividend)
+    values["iv"] = sigma * 100
+
+    results, pos = [], 0
+    for (chain, _), s, ty in zip(chains, spots, times):
+        n = chain.size
+        results.append({
+            "spot": s,
+            "t": ty,
+            "ce": {f: values[f][pos:pos + n] for f in GREEK_FIELDS},
+            "pe": {f: values[f][pos + n:pos + 2 * n] for f in GREEK_FIELDS},
+        })
+        pos += 2 * n
+    return results
+
+
+def atm_iv(chain: OptionChain) -> Optional[float]:
+    """Mean of the solved CE and PE IV (percent) at the strike nearest the spot"""
+    greeks = chain.greeks
+    if not greeks or not chain.size or not np.isfinite(greeks["spot"]):
+        return None
+    i = int(np.argmin(np.abs(chain.strikes - greeks["spot"])))
+    ivs = [iv for iv in (greeks["ce"]["iv"][i], greeks["pe"]["iv"][i]) if np.isfinite(iv)]
+    return float(sum(ivs) / len(ivs)) if ivs else None
@@ -0,0 +1,171 @@
+"""
+Rate Limiter Module
+Client-side pacing of Fyers API calls with priority queueing and wait metrics
+"""
+
+import heapq
+import itertools
+import math
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+# Lower value is served first
+PRIORITY_HIGH = 0      # Interactive reads (watchlist quotes, account)
+PRIORITY_NORMAL = 5
+PRIORITY_LOW = 10      # Background bulk work (scanner history)
+
+
+class SlidingWindowLimit:
+    """
+    Allows at most `max_requests` in any `period` seconds
+
+    Keeps the timestamps of recent grants, so a full burst is only possible
+    once the previous burst has left the window (a refilling token bucket
+    would allow up to 2x the limit across a window boundary).
+    """
+
+    def __init__(self, max_requests: int, period: float):
+        self.max_requests = max_requests
+        self.period = period
+        self._grants = deque()
+
+    def wait_time(self, now: float) -> float:
+        """Seconds until a request may be granted (0 if allowed now)"""
+        while self._grants and now - self._grants[0] >= self.period:
+            self._grants.popleft()
+        if len(self._grants) < self.max_requests:
+            return 0.0
+        return self._grants[0] + self.period - now
+
+    def record(self, now: float):
+        self._grants.append(now)
+
+    def saturate(self, now: float):
+        """Treat the window as full, e.g. after the server throttled us"""
+        while len(self._grants) < self.max_requests:
+            self._grants.append(now)
+
+
+class GroupScheduler:
+    """Paces one limit group against all of its limits, serving waiters by priority"""
+
+    def __init__(self, limits: List[Tuple[int, float]]):
+        self.limits = [SlidingWindowLimit(count, period) for count, period in limits]
+        self._cond = threading.Condition()
+        self._waiters = []
+        self._seq = itertools.count()
+        self.granted = 0
+        self.throttled = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def _wait_time(self, now: float) -> float:
+        return max((limit.wait_time(now) for limit in self.limits), default=0.0)
+
+    def acquire(self, priority: int = PRIORITY_NORMAL) -> float:
+        """
+        Block until this request may be sent
+
+        Args:
+            priority: Lower values are granted before higher ones
+
+        Returns:
+            Seconds spent waiting
+        """
+        enqueued = time.monotonic()
+        ticket = (priority, next(self._seq))
+        with self._cond:
+            heapq.heappush(self._waiters, ticket)
+            try:
+                while True:
+                    if self._waiters[0] == ticket:
+                        now = time.monotonic()
+                        wait = self._wait_time(now)
+                        if wait <= 0:
+                            for limit in self.limits:
+                                limit.record(now)
+                            break
+                        self._cond.wait(wait)
+                    else:
+                        self._cond.wait()
+            finally:
+                self._waiters.remove(ticket)
+                heapq.heapify(self._waiters)
+                self._cond.notify_all()
+
+            waited = time.monotonic() - enqueued
+            self.granted += 1
+            self.total_wait += waited
+            self.max_wait = max(self.max_wait, waited)
+            return waited
+
+    def expected_wait(self, count: int) -> float:
+        """
+        Upper bound on the seconds until `count` more requests are granted,
+        behind the current queue, when every limit window fills up
+        """
+        with self._cond:
+            pending = len(self._waiters) + count
+            return max((math.ceil(pending / limit.max_requests) * limit.period
+                        for limit in self.limits), default=0.0)
+
+    def record_throttle(self):
+        """Back off after the server rejected a request with HTTP 429"""
+        with self._cond:
+            self.throttled += 1
+            now = time.monotonic()
+            for limit in self.limits:
+                limit.saturate(now)
+
+    def stats(self) -> Dict[str, float]:
+        with self._cond:
+            return {
+                "queue_depth": len(self._waiters),
+                "granted": self.granted,
+                "throttled": self.throttled,
+                "avg_wait_ms": (self.total_wait / self.granted * 1000) if self.granted else 0.0,
+                "max_wait_ms": self.max_wait * 1000,
+            }
+
+
+class RequestScheduler:
+    """
+    Schedulers per limit group
+
+    Args:
+        limits: {group: [(max_requests, period_seconds), ...]}
+        groups: {endpoint: group}; endpoints not listed form their own group
+    """
+
+    def __init__(self, limits: Dict[str, List[Tuple[int, float]]],
+                 groups: Optional[Dict[str, str]] = None):
+        self._limits = limits
+        self._groups = groups or {}
+        self._schedulers: Dict[str, GroupScheduler] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, endpoint: str) -> GroupScheduler:
+        group = self._groups.get(endpoint, endpoint)
+        with self._lock:
+            if group not in self._schedulers:
+                self._schedulers[group] = GroupScheduler(self._limits.get(group, []))
+            return self._schedulers[group]
+
+    def acquire(self, endpoint: str, priority: int = PRIORITY_NORMAL) -> float:
+        """Block until a request to `endpoint` is allowed; returns seconds waited"""
+        return self._get(endpoint).acquire(priority)
+
+    def expected_wait(self, endpoint: str, count: int) -> float:
+        """Upper bound on the seconds until `count` more requests to `endpoint` are granted"""
+        return self._get(endpoint).expected_wait(count)
+
+    def record_throttle(self, endpoint: str):
+        self._get(endpoint).record_throttle()
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Queue depth and wait time metrics per limit group"""
+        with self._lock:
+            schedulers = dict(self._schedulers)
+        return {name: sched.stats() for name, sched in schedulers.items()}
@@ -0,0 +1,202 @@
+"""
+Resampler Module
+NSE session-aware resampling of base (1/5-minute) candles into 15-minute,
+hourly, daily and weekly bars, with a per-symbol cache of the results
+"""
+
+import threading
+import time
+from typing import Dict, Optional
+
+import numpy as np
+
+from candle_data import empty_candles, to_candles
+from config import NSE_SESSION_OPEN, NSE_SESSION_CLOSE, RESAMPLE_RETENTION_DAYS
+
+IST_OFFSET = 19800  # Seconds east of UTC; IST has no DST
+DAY = 86400
+
+# Intraday timeframes in seconds; "D" and "W" are session days and Monday-based weeks
+TIMEFRAMES = {"15": 900, "60": 3600, "D": None, "W": None}
+
+
+def _hhmm_seconds(hhmm: str) -> int:
+    h, m = hhmm.split(":")
+    return int(h) * 3600 + int(m) * 60
+
+
+SESSION_OPEN = _hhmm_seconds(NSE_SESSION_OPEN)
+SESSION_CLOSE = _hhmm_seconds(NSE_SESSION_CLOSE)
+
+
+def bucket_starts(ts: np.ndarray, timeframe: str) -> np.ndarray:
+    """
+    Epoch start of the bar each timestamp falls in
+
+    Intraday bars are anchored at the session open (so hourly bars run
+    09:15-10:15 ... 15:15-15:30), daily bars start at the session open and
+    weekly bars at Monday's session open, all in IST.
+    """
+    local = ts + IST_OFFSET
+    day = local // DAY
+    if timeframe == "D":
+        start_local = day * DAY + SESSION_OPEN
+    elif timeframe == "W":
+        # 1970-01-01 was a Thursday, so Monday-based weeks start at day = 7k - 3
+        monday = (day + 3) // 7 * 7 - 3
+        start_local = monday * DAY + SESSION_OPEN
+    else:
+        step = TIMEFRAMES[timeframe]
+        since_open = local - day * DAY - SESSION_OPEN
+        start_local = day * DAY + SESSION_OPEN + since_open // step * step
+    return start_local - IST_OFFSET
+
+
+def in_session(ts: np.ndarray) -> np.ndarray:
+    """Mask of timestamps inside the 09:15-15:30 IST session"""
+    seconds = (ts + IST_OFFSET) % DAY
+    return (seconds >= SESSION_OPEN) & (seconds < SESSION_CLOSE)
+
+
+def resample(candles: np.ndarray, timeframe: str) -> np.ndarray:
+    """
+    Aggregate sorted base candles into timeframe bars
+
+    Candles outside the session are dropped. Each bar's ts is its start;
+    open/close come from its first/last candle, high/low/volume are max/min/sum.
+    """
+    if timeframe not in TIMEFRAMES:
+        raise ValueError(f"Unsupported timeframe {timeframe!r}; expected one of {list(TIMEFRAMES)}")
+    candles = candles[in_session(candles["ts"])]
+    if not len(candles):
+        return empty_candles()
+    buckets = bucket_starts(candles["ts"], timeframe)
+    starts = np.flatnonzero(np.concatenate(([True], buckets[1:] != buckets[:-1])))
+    ends = np.append(starts[1:], len(candles)) - 1
+    bars = empty_candles(len(starts))
+    bars["ts"] = buckets[starts]
+    bars["open"] = candles["open"][starts]
+    bars["close"] = candles["close"][ends]
+    bars["high"] = np.maximum.reduceat(candles["high"], starts)
+    bars["low"] = np.minimum.reduceat(candles["low"], starts)
+    bars["volume"] = np.add.reduceat(candles["volume"], starts)
+    return bars
+
+
+def merge_candles(old: np.ndarray, new: np.ndarray) -> np.ndarray:
+    """
+    Splice a fetched range of candles into old (both sorted by ts)
+
+    `new` is taken as the complete set for its [first, last] time range, as a
+    history response is, so old candles inside that range are replaced.
+    """
+    if not len(new):
+        return old
+    lo = int(np.searchsorted(old["ts"], new["ts"][0], side="left"))
+    hi = int(np.searchsorted(old["ts"], new["ts"][-1], side="right"))
+    return np.concatenate([old[:lo], new, old[hi:]])
+
+
+class _SymbolBars:
+    __slots__ = ("base", "bars", "dirty_from")
+
+    def __init__(self):
+        self.base = empty_candles()
+        self.bars: Dict[str, np.ndarray] = {}
+        self.dirty_from: Dict[str, int] = {}  # Bars from this start on need re-aggregating
+
+
+class TimeframeCache:
+    """
+    Base candles per symbol plus lazily resampled bars per timeframe
+
+    New base candles only mark bars from the first touched bucket on as
+    dirty; they are re-aggregated on the next read that needs them, so
+    reading a completed bar (previous day / week) while the current one is
+    forming costs a binary search. Base candles older than
+    RESAMPLE_RETENTION_DAYS are dropped, which keeps the current and
+    previous weekly bars complete.
+    """
+
+    def __init__(self, retention_days: int = RESAMPLE_RETENTION_DAYS):
+        self.retention = retention_days * DAY
+        self._symbols: Dict[str, _SymbolBars] = {}
+        self._lock = threading.Lock()
+
+    def last_timestamp(self, symbol: str) -> Optional[int]:
+        state = self._symbols.get(symbol)
+        return int(state.base["ts"][-1]) if state is not None and len(state.base) else None
+
+    def update(self, symbol: str, candles) -> None:
+        """Add base candles (candle array or rows, oldest first)"""
+        candles = to_candles(candles)
+        if not len(candles):
+            return
+        with self._lock:
+            state = self._symbols.get(symbol)
+            if state is None:
+                state = self._symbols[symbol] = _SymbolBars()
+            first_new = int(candles["ts"][0])
+            base = merge_candles(state.base, candles)
+            cutoff = int(base["ts"][-1]) - self.retention
+            if base["ts"][0] < cutoff:
+                base = base[int(np.searchsorted(base["ts"], cutoff)):]
+                state.bars.clear()  # Oldest bars lost candles; rebuild on next read
+                state.dirty_from.clear()
+            state.base = base
+            for timeframe in state.bars:
+                touched = int(bucket_starts(np.array([first_new]), timeframe)[0])
+                state.dirty_from[timeframe] = min(touched, state.dirty_from.get(timeframe, touched))
+
+    def _bars(self, state: _SymbolBars, timeframe: str, before: Optional[int] = None) -> np.ndarray:
+        """Cached bars, re-aggregating dirty ones unless all bars read start before `before`"""
+        if timeframe not in state.bars:
+            state.bars[timeframe] = resample(state.base, timeframe)
+            state.dirty_from.pop(timeframe, None)
+        dirty = state.dirty_from.get(timeframe)
+        if dirty is not None and (before is None or dirty < before):
+            bars = state.bars[timeframe]
+            keep = int(np.searchsorted(bars["ts"], dirty, side="left"))
+            tail = resample(state.base[int(np.searchsorted(state.base["ts"], dirty, side="left")):], timeframe)
+            state.bars[timeframe] = np.concatenate([bars[:keep], tail])
+            del state.dirty_from[timeframe]
+        return state.bars[timeframe]
+
+    def bars(self, symbol: str, timeframe: str) -> np.ndarray:
+        """Resampled bars for symbol (cached until new base candles arrive)"""
+        with self._lock:
+            state = self._symbols.get(symbol)
+            if state is None:
+                return empty_candles()
+            return self._bars(state, timeframe)
+
+    def previous_bar(self, symbol: str, timeframe: str, now: Optional[float] = None) -> Optional[np.void]:
+        """Last completed bar before the one containing `now` (e.g. previous day / week)"""
+        current = int(bucket_starts(np.array([int(now or time.time())]), timeframe)[0])
+        with self._lock:
+            state = self._symbols.get(symbol)
+            if state is None:
+                return None
+            bars = self._bars(state, timeframe, before=current)
+            idx = int(np.searchsorted(bars["ts"], current, side="left")) - 1
+            return bars[idx].copy() if idx >= 0 else None
+
+    def reset(self, symbol: Optional[str] = None):
+        with self._lock:
+            if symbol is None:
+                self._symbols.clear()
+            else:
+                self._symbols.pop(symbol, None)
+
+
+_shared_cache: Optional[TimeframeCache] = None
+_shared_lock = threading.Lock()
+
+
+def get_timeframe_cache() -> TimeframeCache:
+    """The process-wide timeframe cache shared by the scanner and every session"""
+    global _shared_cache
+    with _shared_lock:
+        if _shared_cache is None:
+            _shared_cache = TimeframeCache()
+        return _shared_cache
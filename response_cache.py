@@ -0,0 +1,172 @@
+"""
+Response Cache Module
+Process-wide TTL cache with request coalescing and LRU eviction for API responses
+"""
+
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+from config import RESPONSE_CACHE_MAX_BYTES
+
+
+def estimate_size(value: Any) -> int:
+    """Rough in-memory size of a JSON-like value in bytes"""
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(estimate_size(k) + estimate_size(v) for k, v in value.items())
+    elif isinstance(value, (list, tuple)):
+        size += sum(estimate_size(v) for v in value)
+    return size
+
+
+class _Entry:
+    __slots__ = ("value", "expires", "size")
+
+    def __init__(self, value: Any, expires: float, size: int):
+        self.value = value
+        self.expires = expires
+        self.size = size
+
+
+class ResponseCache:
+    """
+    TTL + LRU cache where concurrent misses on the same key share one fetch
+
+    Callers ask for a batch of keys with get_many(). Fresh keys are served
+    from memory, keys another thread is already fetching are awaited, and
+    only the remaining keys are passed to the caller's fetch function, in a
+    single call. Entries expire after their TTL and the least recently used
+    ones are evicted once the estimated size passes max_bytes.
+    """
+
+    def __init__(self, max_bytes: int = RESPONSE_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._inflight: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.upstream_calls = 0
+
+    def get_many(self, keys: List[Hashable], ttl: float,
+                 fetch_missing: Callable[[List[Hashable]], Dict[Hashable, Any]],
+                 cache_if: Optional[Callable[[Any], bool]] = None) -> Dict[Hashable, Any]:
+        """
+        Resolve keys from cache, in-flight fetches, or one call to fetch_missing
+
+        Args:
+            keys: Cache keys wanted by the caller
+            ttl: Seconds a freshly fetched value stays valid
+            fetch_missing: Called with the keys nobody has; returns {key: value}.
+                Keys missing from its result (or mapped to None) are not cached.
+            cache_if: Optional predicate; fetched values failing it are returned
+                (also to coalesced waiters) but not stored
+
+        Returns:
+            {key: value} for every key that could be resolved
+        """
+        results, waiting, claimed = {}, {}, []
+        with self._lock:
+            now = time.monotonic()
+            for key in dict.fromkeys(keys):
+                entry = self._entries.get(key)
+                if entry is not None and entry.expires > now:
+                    self._entries.move_to_end(key)
+                    results[key] = entry.value
+                    self.hits += 1
+                elif key in self._inflight:
+                    waiting[key] = self._inflight[key]
+                    self.coalesced += 1
+                else:
+                    self._inflight[key] = Future()
+                    claimed.append(key)
+                    self.misses += 1
+            if claimed:
+                self.upstream_calls += 1
+
+        if claimed:
+            try:
+                fetched = fetch_missing(claimed)
+            except BaseException as e:
+                with self._lock:
+                    for key in claimed:
+                        self._inflight.pop(key).set_exception(e)
+                raise
+            with self._lock:
+                expires = time.monotonic() + ttl
+                for key in claimed:
+                    value = fetched.get(key)
+                    if value is not None:
+                        if cache_if is None or cache_if(value):
+                            self._store(key, value, expires)
+                        results[key] = value
+                    self._inflight.pop(key).set_result(value)
+                self._evict()
+
+        for key, future in waiting.items():
+            value = future.result()
+            if value is not None:
+                results[key] = value
+        return results
+
+    def get_or_fetch(self, key: Hashable, ttl: float, fetch: Callable[[], Any],
+                     cache_if: Optional[Callable[[Any], bool]] = None) -> Any:
+        """Single-key form of get_many; returns None if fetch produced None"""
+        return self.get_many([key], ttl, lambda missing: {key: fetch()}, cache_if).get(key)
+
+    def _store(self, key: Hashable, value: Any, expires: float):
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._bytes -= old.size
+        size = estimate_size(value)
+        self._entries[key] = _Entry(value, expires, size)
+        self._bytes += size
+
+    def _evict(self):
+        now = time.monotonic()
+        for key in [k for k, e in self._entries.items() if e.expires <= now]:
+            self._bytes -= self._entries.pop(key).size
+        while self._bytes > self.max_bytes and self._entries:
+            _, entry = self._entries.popitem(last=False)
+            self._bytes -= entry.size
+            self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, float]:
+        """Hit/miss counters and current footprint"""
+        with self._lock:
+            lookups = self.hits + self.misses + self.coalesced
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "hit_rate": (self.hits + self.coalesced) / lookups if lookups else 0.0,
+                "upstream_calls": self.upstream_calls,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+            }
+
+
+_shared_cache: Optional[ResponseCache] = None
+_shared_lock = threading.Lock()
+
+
+def get_response_cache() -> ResponseCache:
+    """The process-wide cache shared by every client and session"""
+    global _shared_cache
+    with _shared_lock:
+        if _shared_cache is None:
+            _shared_cache = ResponseCache()
+        return _shared_cache
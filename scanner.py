@@ -0,0 +1,234 @@
+"""
+Scanner Service Module
+Headless bull/bear scan engine with a fixed-cadence loop, snapshot
+publishing and a command-line entry point
+
+Usage:
+    python scanner.py --once
+    python scanner.py --interval 60 --output data/scan_snapshot.pkl
+
+Credentials come from --client-id/--access-token or the FYERS_CLIENT_ID /
+FYERS_ACCESS_TOKEN environment variables.
+"""
+
+import argparse
+import logging
+import os
+import pickle
+import sys
+import threading
+import time
+from datetime import datetime
+from typing import Callable, List, Optional
+
+import pandas as pd
+
+from config import (FYERS_CLIENT_ID, SCAN_SYMBOLS, SCANNER_INTERVAL, SCANNER_SNAPSHOT_PATH)
+from data_processor import apply_filters, build_df_from_quotes, classify_frame_advanced
+from fyers_client import FyersClient, get_shared_client
+from screener import screen_tags
+
+logger = logging.getLogger(__name__)
+
+
+class ScanSnapshot:
+    """Immutable result of one scan cycle"""
+
+    def __init__(self, df: pd.DataFrame, version: int, created_at: float, duration: float,
+                 error: Optional[str] = None):
+        self.df = df
+        self.version = version
+        self.created_at = created_at
+        self.duration = duration
+        self.error = error
+
+    @property
+    def age(self) -> float:
+        """Seconds since the snapshot was taken"""
+        return time.time() - self.created_at
+
+    def to_dict(self) -> dict:
+        # Plain dict on disk, so readers don't depend on this class's module path
+        return {"df": self.df, "version": self.version, "created_at": self.created_at,
+                "duration": self.duration, "error": self.error}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "ScanSnapshot":
+        return cls(data["df"], data["version"], data["created_at"], data["duration"], data.get("error"))
+
+
+def run_scan(client: FyersClient, symbols: List[str] = SCAN_SYMBOLS) -> pd.DataFrame:
+    """Fetch quotes + history for symbols, tag bull/bear breakouts and every configured screen"""
+    resp = client.fetch_quotes(symbols)
+    if resp.get("s") != "ok":
+        raise RuntimeError(resp.get("message", "quotes fetch failed"))
+    df = build_df_from_quotes(resp, client)
+    if not df.empty:
+        df["daily_tag"] = classify_frame_advanced(df)
+        df = df.join(screen_tags(df))
+    return df
+
+
+def publish_snapshot(snapshot: ScanSnapshot, path: str = SCANNER_SNAPSHOT_PATH):
+    """Atomically write a snapshot so readers never see a partial file"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        pickle.dump(snapshot.to_dict(), f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+
+
+_loaded = {"path": None, "mtime": None, "snapshot": None}
+_loaded_lock = threading.Lock()
+
+
+def load_snapshot(path: str = SCANNER_SNAPSHOT_PATH) -> Optional[ScanSnapshot]:
+    """Latest published snapshot, re-read only when the file changes"""
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return None
+    with _loaded_lock:
+        if _loaded["path"] != path or _loaded["mtime"] != mtime:
+            try:
+                with open(path, "rb") as f:
+                    snapshot = ScanSnapshot.from_dict(pickle.load(f))
+            except Exception as e:
+                logger.warning("Could not read scan snapshot %s: %s", path, e)
+                return _loaded["snapshot"] if _loaded["path"] == path else None
+            _loaded.update(path=path, mtime=mtime, snapshot=snapshot)
+        return _loaded["snapshot"]
+
+
+class ScannerService:
+    """
+    Runs scan cycles on a fixed cadence and publishes each snapshot
+
+    Cycles start every `interval` seconds; a cycle that overruns skips the
+    missed slots instead of queueing them. scan_now() starts the next cycle
+    at once and restarts the cadence from there. Failed cycles keep the
+    previous data and record the error on the published snapshot.
+    """
+
+    def __init__(self, client: FyersClient, interval: float = SCANNER_INTERVAL,
+                 symbols: List[str] = SCAN_SYMBOLS,
+                 publish: Optional[Callable[[ScanSnapshot], None]] = publish_snapshot):
+        self.client = client
+        self.interval = interval
+        self.symbols = symbols
+        self.publish = publish
+        self._latest: Optional[ScanSnapshot] = None
+        self._version = 0
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def latest(self) -> Optional[ScanSnapshot]:
+        return self._latest
+
+    def run_once(self) -> ScanSnapshot:
+        """Run one scan cycle and publish its snapshot"""
+        start = time.time()
+        error = None
+        try:
+            df = run_scan(self.client, self.symbols)
+        except Exception as e:
+            logger.exception("Scan cycle failed")
+            error = str(e)
+            df = self._latest.df if self._latest is not None else pd.DataFrame()
+        self._version += 1
+        snapshot = ScanSnapshot(df, self._version, start, time.time() - start, error)
+        self._latest = snapshot
+        if self.publish is not None:
+            self.publish(snapshot)
+        return snapshot
+
+    def run_forever(self):
+        """Blocking fixed-cadence loop until stop() is called"""
+        next_run = time.monotonic()
+        while not self._stop.is_set():
+            self._wake.clear()
+            snapshot = self.run_once()
+            logger.info("Scan v%d: %d rows in %.2fs%s", snapshot.version, len(snapshot.df),
+                        snapshot.duration, f" (error: {snapshot.error})" if snapshot.error else "")
+            next_run += self.interval
+            now = time.monotonic()
+            if next_run < now:
+                next_run = now + (self.interval - (now - next_run) % self.interval)
+            if self._wake.wait(next_run - now):
+                next_run = time.monotonic()  # Asked to scan now
+
+    def start(self):
+        """Run the loop on a daemon thread"""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self.run_forever, name="scanner", daemon=True)
+            self._thread.start()
+
+    def scan_now(self):
+        """Start the next scan cycle without waiting for its slot"""
+        self._wake.set()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+
+
+def format_snapshot(snapshot: ScanSnapshot, sector_filter: List[str], min_volume_ratio: float) -> str:
+    """Plain-text bull/bear summary for the CLI"""
+    lines = [f"[{datetime.fromtimestamp(snapshot.created_at):%H:%M:%S}] scan v{snapshot.version} "
+             f"({snapshot.duration:.2f}s, {len(snapshot.df)} symbols)"]
+    if snapshot.error:
+        lines.append(f"  error: {snapshot.error}")
+    if snapshot.df.empty:
+        return "\n".join(lines)
+    df = apply_filters(snapshot.df, sector_filter, min_volume_ratio)
+    for tag, label in (("bull", "BULLISH"), ("bear", "BEARISH")):
+        rows = df[df["daily_tag"] == tag]
+        symbols = ", ".join(rows["symbol"].tolist()) or "-"
+        lines.append(f"  {label} ({len(rows)}): {symbols}")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Headless bull/bear breakout scanner")
+    parser.add_argument("--client-id", default=os.environ.get("FYERS_CLIENT_ID", FYERS_CLIENT_ID))
+    parser.add_argument("--access-token", default=os.environ.get("FYERS_ACCESS_TOKEN"))
+    parser.add_argument("--interval", type=float, default=SCANNER_INTERVAL,
+                        help="Seconds between scan cycles")
+    parser.add_argument("--output", default=SCANNER_SNAPSHOT_PATH,
+                        help="Where to publish snapshots for the dashboard")
+    parser.add_argument("--once", action="store_true", help="Run a single cycle and exit")
+    parser.add_argument("--sector", action="append", default=None,
+                        help="Sector filter for printed results (repeatable)")
+    parser.add_argument("--min-volume-ratio", type=float, default=2.0)
+    args = parser.parse_args(argv)
+
+    if not args.access_token:
+        parser.error("an access token is required (--access-token or FYERS_ACCESS_TOKEN)")
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    client = get_shared_client(args.client_id, args.access_token)
+    sectors = args.sector or ["All"]
+
+    def publish(snapshot: ScanSnapshot):
+        publish_snapshot(snapshot, args.output)
+        print(format_snapshot(snapshot, sectors, args.min_volume_ratio), flush=True)
+
+    service = ScannerService(client, interval=args.interval, publish=publish)
+    if args.once:
+        snapshot = service.run_once()
+        return 1 if snapshot.error else 0
+    try:
+        service.run_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
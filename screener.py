@@ -0,0 +1,234 @@
+"""
+Screener Module
+Named screens written as small expressions over scan frame fields,
+compiled once into NumPy column operations
+
+A screen is a boolean expression such as
+
+    ltp > prev_week_high and vol_ratio >= 2 and abs(oi_chg) > 10
+
+over the FIELDS below, named values and earlier screens. Supported:
+numbers, + - * /, unary -, comparisons (chainable), and / or / not,
+abs(x), min(a, b), max(a, b) and score(x, t1, p1, t2, p2, ...), which is
+p1 where x > t1, else p2 where x > t2, ..., else 0. Missing frame
+columns read as NaN, and any comparison with NaN is False.
+"""
+
+import ast
+import threading
+from functools import reduce
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from config import SCREEN_VALUES, SCREENS
+
+
+def percent_change_array(old, new) -> np.ndarray:
+    """Vectorized percent_change: 0 where old is 0, NaN propagates like the scalar version"""
+    old = np.asarray(old, dtype=float)
+    new = np.asarray(new, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(old == 0, 0.0, (new - old) / np.abs(old) * 100.0)
+
+
+def ratio_array(num, den, fallback: float) -> np.ndarray:
+    """num / den where den > 0, fallback elsewhere"""
+    num = np.asarray(num, dtype=float)
+    den = np.asarray(den, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(den > 0, num / den, fallback)
+
+
+# Scan frame columns screens can read directly, by field name
+COLUMN_FIELDS = {
+    "ltp": "current_close",
+    "open": "open",
+    "prev_close": "prev_close",
+    "prev_day_high": "prev_day_high",
+    "prev_day_low": "prev_day_low",
+    "prev_week_high": "prev_week_high",
+    "prev_week_low": "prev_week_low",
+    "vol_current": "vol_current",
+    "vol_20_avg": "vol_20_avg",
+    "oi_current": "oi_current",
+    "oi_prev": "oi_prev",
+    "iv_current": "iv_current",
+    "iv_prev_high": "iv_prev_high",
+}
+
+# Fields derived from the columns above (percentages are in percent)
+DERIVED_FIELDS: Dict[str, Callable[[Callable[[str], np.ndarray]], np.ndarray]] = {
+    "price_chg": lambda get: percent_change_array(get("prev_close"), get("ltp")),
+    "gap_pct": lambda get: percent_change_array(get("prev_close"), get("open")),
+    "vol_ratio": lambda get: ratio_array(get("vol_current"), get("vol_20_avg"), 0.0),
+    "oi_chg": lambda get: percent_change_array(get("oi_prev"), get("oi_current")),
+    "iv_chg": lambda get: percent_change_array(get("iv_prev_high"), get("iv_current")),
+}
+
+FIELDS = list(COLUMN_FIELDS) + list(DERIVED_FIELDS)
+
+BOOL, NUM = "bool", "num"
+Compiled = Callable[[Callable[[str], np.ndarray]], np.ndarray]
+
+_COMPARE = {ast.Gt: np.greater, ast.GtE: np.greater_equal, ast.Lt: np.less,
+            ast.LtE: np.less_equal, ast.Eq: np.equal, ast.NotEq: np.not_equal}
+_ARITHMETIC = {ast.Add: np.add, ast.Sub: np.subtract, ast.Mult: np.multiply, ast.Div: np.divide}
+
+
+def _score(x: np.ndarray, *steps: np.ndarray) -> np.ndarray:
+    thresholds, points = steps[0::2], steps[1::2]
+    return np.select([x > t for t in thresholds], list(np.broadcast_arrays(*points)), 0)
+
+
+# name -> (function, check of the argument count); every argument is a number
+_FUNCTIONS = {
+    "abs": (np.abs, lambda n: n == 1),
+    "min": (np.minimum, lambda n: n == 2),
+    "max": (np.maximum, lambda n: n == 2),
+    "score": (_score, lambda n: n >= 3 and n % 2 == 1),
+}
+
+
+def compile_expression(expression: str, kinds: Dict[str, str]) -> Tuple[Compiled, str]:
+    """
+    Compile an expression into a function of a name lookup
+
+    kinds maps every name the expression may use to BOOL or NUM. Returns
+    (function, kind of the result). Raises ValueError for syntax the
+    language doesn't have, unknown names and bool/number mix-ups.
+    """
+    try:
+        tree = ast.parse(expression.strip(), mode="eval")
+    except SyntaxError as e:
+        raise ValueError(f"invalid expression {expression!r}: {e.msg}") from None
+
+    def number(node) -> Compiled:
+        fn, kind = build(node)
+        if kind != NUM:
+            raise ValueError(f"expected a number in {expression!r}: {ast.unparse(node)}")
+        return fn
+
+    def mask(node) -> Compiled:
+        fn, kind = build(node)
+        if kind != BOOL:
+            raise ValueError(f"expected a condition in {expression!r}: {ast.unparse(node)}")
+        return fn
+
+    def build(node) -> Tuple[Compiled, str]:
+        if isinstance(node, ast.Constant) and type(node.value) in (int, float):
+            value = float(node.value)
+            return (lambda get: value), NUM
+        if isinstance(node, ast.Name):
+            if node.id not in kinds:
+                raise ValueError(f"unknown name {node.id!r} in {expression!r}")
+            name = node.id
+            return (lambda get: get(name)), kinds[name]
+        if isinstance(node, ast.BoolOp):
+            parts = [mask(v) for v in node.values]
+            op = np.logical_and if isinstance(node.op, ast.And) else np.logical_or
+            return (lambda get: reduce(op, [p(get) for p in parts])), BOOL
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.Not):
+            operand = mask(node.operand)
+            return (lambda get: np.logical_not(operand(get))), BOOL
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.USub, ast.UAdd)):
+            operand = number(node.operand)
+            sign = -1.0 if isinstance(node.op, ast.USub) else 1.0
+            return (lambda get: sign * operand(get)), NUM
+        if isinstance(node, ast.BinOp) and type(node.op) in _ARITHMETIC:
+            op, left, right = _ARITHMETIC[type(node.op)], number(node.left), number(node.right)
+
+            def arithmetic(get):
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    return op(left(get), right(get))
+            return arithmetic, NUM
+        if isinstance(node, ast.Compare) and all(type(op) in _COMPARE for op in node.ops):
+            operands = [number(n) for n in [node.left] + node.comparators]
+            ops = [_COMPARE[type(op)] for op in node.ops]
+
+            def compare(get):
+                values = [o(get) for o in operands]
+                with np.errstate(invalid="ignore"):
+                    return reduce(np.logical_and, [op(a, b) for op, a, b in zip(ops, values, values[1:])])
+            return compare, BOOL
+        if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and not node.keywords:
+            if node.func.id not in _FUNCTIONS:
+                raise ValueError(f"unknown function {node.func.id!r} in {expression!r}")
+            fn, arity = _FUNCTIONS[node.func.id]
+            if not arity(len(node.args)):
+                raise ValueError(f"wrong number of arguments to {node.func.id}() in {expression!r}")
+            args = [number(a) for a in node.args]
+            return (lambda get: fn(*[a(get) for a in args])), NUM
+        raise ValueError(f"unsupported syntax in {expression!r}: {ast.unparse(node)}")
+
+    return build(tree.body)
+
+
+class ScreenSet:
+    """
+    Named values and screens compiled once, evaluated together per frame
+
+    Values (numbers, e.g. a score) and screens (conditions) are compiled
+    in order, so each may use FIELDS and any value or screen defined
+    before it. Evaluating a frame computes every field, value and screen
+    at most once, however many screens share it.
+    """
+
+    def __init__(self, screens: Dict[str, str], values: Optional[Dict[str, str]] = None):
+        kinds = {name: NUM for name in FIELDS}
+        self._compiled: Dict[str, Compiled] = {}
+        for names, kind in ((values or {}, NUM), (screens, BOOL)):
+            for name, expression in names.items():
+                if name in kinds:
+                    raise ValueError(f"{name!r} is already defined")
+                fn, result = compile_expression(expression, kinds)
+                if result != kind:
+                    raise ValueError(f"{name!r} must be a {'condition' if kind == BOOL else 'number'}: "
+                                     f"{expression!r}")
+                self._compiled[name] = fn
+                kinds[name] = kind
+        self.screens: List[str] = list(screens)
+        self.expressions = dict(screens)
+
+    def evaluate(self, df: pd.DataFrame, names: Optional[Iterable[str]] = None) -> pd.DataFrame:
+        """One boolean column per screen (default: all of them), indexed like df"""
+        names = self.screens if names is None else list(names)
+        unknown = [n for n in names if n not in self.expressions]
+        if unknown:
+            raise KeyError(f"unknown screens: {', '.join(unknown)}")
+
+        cache: Dict[str, np.ndarray] = {}
+        missing = np.full(len(df), np.nan)
+
+        def get(name: str) -> np.ndarray:
+            if name not in cache:
+                if name in self._compiled:
+                    value = self._compiled[name](get)
+                elif name in DERIVED_FIELDS:
+                    value = DERIVED_FIELDS[name](get)
+                else:
+                    column = COLUMN_FIELDS[name]
+                    value = df[column].to_numpy(dtype=float) if column in df else missing
+                cache[name] = np.broadcast_to(value, len(df))
+            return cache[name]
+
+        return pd.DataFrame({name: get(name).astype(bool) for name in names}, index=df.index)
+
+
+_shared_set: Optional[ScreenSet] = None
+_shared_lock = threading.Lock()
+
+
+def get_screen_set() -> ScreenSet:
+    """The SCREENS / SCREEN_VALUES from config, compiled on first use"""
+    global _shared_set
+    with _shared_lock:
+        if _shared_set is None:
+            _shared_set = ScreenSet(SCREENS, SCREEN_VALUES)
+        return _shared_set
+
+
+def screen_tags(df: pd.DataFrame, names: Optional[Iterable[str]] = None) -> pd.DataFrame:
+    """One boolean column per configured screen for a scan frame"""
+    return get_screen_set().evaluate(df, names)
@@ -0,0 +1,312 @@
+"""
+Symbol Master Module
+Fyers instrument master compiled once into a memory-mapped binary table with
+integer symbol IDs, categorical sector codes and a precompiled ticker hash
+"""
+
+import io
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+import requests
+
+from config import (SECTOR_INDICES, STOCK_UNIVERSE, SYMBOL_MASTER_MAX_AGE, SYMBOL_MASTER_PATH,
+                    SYMBOL_MASTER_SOURCES)
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"FYSYMMST"
+FORMAT_VERSION = 1
+ALIGN = 64
+
+# Instrument kinds; the table's kind column indexes this tuple
+KINDS = ("EQ", "INDEX", "FUT", "OPT", "OTHER")
+
+# Column positions in the Fyers symbol master CSVs (they have no header row)
+CSV_COLUMNS = {"name": 1, "lot_size": 3, "tick_size": 4, "expiry": 8, "ticker": 9,
+               "underlying": 13, "strike": 15, "option_type": 16}
+
+FNV_OFFSET = 2166136261
+FNV_PRIME = 16777619
+
+
+def _fnv1a(key: bytes) -> int:
+    h = FNV_OFFSET
+    for b in key:
+        h = ((h ^ b) * FNV_PRIME) & 0xFFFFFFFF
+    return h
+
+
+def _fnv1a_many(keys: np.ndarray) -> np.ndarray:
+    """_fnv1a of every entry of a fixed-width bytes array (trailing NULs are padding)"""
+    raw = np.ascontiguousarray(keys).view(np.uint8).reshape(len(keys), keys.dtype.itemsize)
+    raw = raw.astype(np.uint64)
+    h = np.full(len(keys), FNV_OFFSET, dtype=np.uint64)
+    for col in range(raw.shape[1]):
+        b = raw[:, col]
+        h = np.where(b != 0, ((h ^ b) * FNV_PRIME) & 0xFFFFFFFF, h)
+    return h
+
+
+def _encode(values: Iterable[str]) -> np.ndarray:
+    encoded = [str(v).encode("utf-8") for v in values]
+    width = max((len(v) for v in encoded), default=1) or 1
+    return np.array(encoded, dtype=f"S{width}")
+
+
+def _align(offset: int) -> int:
+    return -(-offset // ALIGN) * ALIGN
+
+
+class SymbolMaster:
+    """
+    Read-only view of a compiled symbol master file
+
+    `table` is a memory-mapped structured array, one row per instrument; a
+    row's position is its symbol ID. kind and sector are small integer codes
+    into KINDS / sector_names. Ticker lookups go through an open-addressing
+    hash table (FNV-1a, linear probing) stored in the same file, so opening
+    the master parses nothing and every process maps the same pages.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path} is not a symbol master file")
+            size = int.from_bytes(f.read(4), "little")
+            header = json.loads(f.read(size))
+        if header.get("version") != FORMAT_VERSION:
+            raise ValueError(f"{path} has symbol master format {header.get('version')}")
+
+        dtype = np.dtype([tuple(field) for field in header["dtype"]])
+        self.table = np.memmap(path, dtype=dtype, mode="r", offset=header["table_offset"],
+                               shape=(header["count"],))
+        self._slots = np.memmap(path, dtype="<i4", mode="r", offset=header["slots_offset"],
+                                shape=(header["slots"],))
+        self._tickers = self.table["ticker"]
+        self.sector_names: List[str] = header["sectors"]
+        self.sources: List[str] = header["sources"]
+        self.built: float = header["built"]
+        self._names: Dict[str, List[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self.table)
+
+    def id_of(self, ticker: str) -> int:
+        """Symbol ID of a full Fyers ticker (e.g. "NSE:TCS-EQ"), or -1"""
+        key = ticker.encode("utf-8")
+        mask = len(self._slots) - 1
+        pos = _fnv1a(key) & mask
+        while True:
+            i = int(self._slots[pos])
+            if i < 0 or self._tickers[i] == key:
+                return i
+            pos = (pos + 1) & mask
+
+    def ids_of(self, tickers: Sequence[str]) -> np.ndarray:
+        """Symbol IDs for many tickers at once (-1 where unknown)"""
+        if not len(tickers):
+            return np.empty(0, dtype=np.int32)
+        keys = _encode(tickers)
+        mask = len(self._slots) - 1
+        pos = (_fnv1a_many(keys) & mask).astype(np.int64)
+        ids = np.full(len(keys), -1, dtype=np.int32)
+        pending = np.arange(len(keys))
+        while len(pending):
+            candidate = self._slots[pos[pending]]
+            found = candidate >= 0
+            hit = np.zeros(len(pending), dtype=bool)
+            hit[found] = self._tickers[candidate[found]] == keys[pending[found]]
+            ids[pending[hit]] = candidate[hit]
+            # Keep probing where the slot holds another ticker
+            pending = pending[found & ~hit]
+            pos[pending] = (pos[pending] + 1) & mask
+        return ids
+
+    def short_names(self, ids: np.ndarray) -> List[str]:
+        """Short names (e.g. "TCS") for symbol IDs; "" for -1"""
+        return [s.decode() if i >= 0 else "" for i, s in
+                zip(ids.tolist(), self.table["short"][np.maximum(ids, 0)].tolist())]
+
+    def sectors(self, ids: np.ndarray) -> List[str]:
+        """Sector names for symbol IDs; "Unknown" for -1"""
+        codes = np.where(ids >= 0, self.table["sector"][np.maximum(ids, 0)], 0)
+        return [self.sector_names[c] for c in codes.tolist()]
+
+    def lot_sizes(self, ids: np.ndarray) -> np.ndarray:
+        """Lot sizes for symbol IDs; 0 for -1"""
+        return np.where(ids >= 0, self.table["lot_size"][np.maximum(ids, 0)], 0)
+
+    def short_name(self, ticker: str) -> Optional[str]:
+        i = self.id_of(ticker)
+        return self.table["short"][i].decode() if i >= 0 else None
+
+    def sector(self, ticker: str) -> str:
+        i = self.id_of(ticker)
+        return self.sector_names[self.table["sector"][i]] if i >= 0 else "Unknown"
+
+    def lot_size(self, ticker: str) -> Optional[int]:
+        i = self.id_of(ticker)
+        return int(self.table["lot_size"][i]) if i >= 0 else None
+
+    def tickers(self, kind: Optional[str] = None, sector: Optional[str] = None) -> List[str]:
+        """Full tickers, optionally of one kind (KINDS) and/or sector"""
+        mask = np.ones(len(self.table), dtype=bool)
+        if kind is not None:
+            mask &= self.table["kind"] == KINDS.index(kind)
+        if sector is not None:
+            if sector not in self.sector_names:
+                return []
+            mask &= self.table["sector"] == self.sector_names.index(sector)
+        return [t.decode() for t in self._tickers[mask].tolist()]
+
+    def names(self, kind: str = "EQ") -> List[str]:
+        """Sorted short names of one kind (cached; e.g. for symbol search)"""
+        if kind not in self._names:
+            shorts = self.table["short"][self.table["kind"] == KINDS.index(kind)]
+            self._names[kind] = sorted({s.decode() for s in shorts.tolist()})
+        return self._names[kind]
+
+    def fo_underlyings(self) -> List[str]:
+        """Equity tickers that have futures listed"""
+        underlyings = np.unique(self.table["underlying"][self.table["kind"] == KINDS.index("FUT")])
+        equity = self.table["kind"] == KINDS.index("EQ")
+        mask = equity & np.isin(self.table["short"], underlyings)
+        return [t.decode() for t in self._tickers[mask].tolist()]
+
+
+def read_instruments(source: str) -> pd.DataFrame:
+    """One Fyers symbol master CSV (URL or path) as string columns named as in CSV_COLUMNS"""
+    if source.startswith(("http://", "https://")):
+        resp = requests.get(source, timeout=10)
+        resp.raise_for_status()
+        source = io.BytesIO(resp.content)
+    frame = pd.read_csv(source, header=None, usecols=list(CSV_COLUMNS.values()), dtype=str,
+                        keep_default_na=False)
+    return frame.rename(columns={pos: name for name, pos in CSV_COLUMNS.items()})[list(CSV_COLUMNS)]
+
+
+def config_instruments() -> pd.DataFrame:
+    """STOCK_UNIVERSE equities and SECTOR_INDICES, for when no CSV can be read"""
+    rows = [{"name": short, "lot_size": "1", "ticker": f"NSE:{short}-EQ"} for short in STOCK_UNIVERSE]
+    rows += [{"name": name, "lot_size": "1", "ticker": ticker} for name, ticker in SECTOR_INDICES.items()]
+    return pd.DataFrame(rows, columns=list(CSV_COLUMNS)).fillna("")
+
+
+def compile_symbol_master(frames: List[pd.DataFrame], path: str, sources: Sequence[str] = (),
+                          sector_map: Dict[str, str] = STOCK_UNIVERSE):
+    """
+    Compile instrument frames (read_instruments / config_instruments) into path
+
+    Sectors come from sector_map (short name -> sector); derivatives take
+    their underlying's sector. The file is written next to path and renamed
+    over it, so processes that already mapped the old file keep reading it.
+    """
+    frame = pd.concat(frames, ignore_index=True)
+    frame["ticker"] = frame["ticker"].str.strip().str.upper()
+    frame = frame[frame["ticker"] != ""].drop_duplicates("ticker", ignore_index=True)
+    tickers = frame["ticker"]
+    option_type = frame["option_type"].str.strip().str.upper()
+    underlying = frame["underlying"].str.strip().str.upper()
+
+    is_index = tickers.str.endswith("-INDEX").to_numpy()
+    is_opt = option_type.isin(["CE", "PE"]).to_numpy()
+    is_fut = tickers.str.endswith("FUT").to_numpy() & ~is_opt
+    is_eq = tickers.str.endswith("-EQ").to_numpy()
+    kind = np.select([is_index, is_opt, is_fut, is_eq], [1, 3, 2, 0], 4)
+
+    bare = tickers.str.split(":", n=1).str[-1]
+    derivative = is_opt | is_fut
+    # Cash segment tickers carry a "-SERIES" suffix; contract names are kept whole
+    short = bare.where(derivative, bare.str.replace(r"-[A-Z0-9]+$", "", regex=True))
+    sector_key = underlying.where(derivative, short)
+    sector = sector_key.map(sector_map).where(~is_index, "Index").fillna("Unknown")
+    sector_names = ["Unknown", "Index"] + sorted(set(sector_map.values()) - {"Unknown", "Index"})
+
+    columns = {
+        "ticker": _encode(tickers),
+        "short": _encode(short),
+        "name": _encode(frame["name"].str.strip()),
+        "underlying": _encode(underlying),
+        "kind": kind.astype(np.uint8),
+        "sector": pd.Categorical(sector, categories=sector_names).codes.astype(np.uint8),
+        "lot_size": pd.to_numeric(frame["lot_size"], errors="coerce").fillna(1).to_numpy(np.int32),
+        "tick_size": pd.to_numeric(frame["tick_size"], errors="coerce").fillna(0).to_numpy(np.float32),
+        "strike": pd.to_numeric(frame["strike"], errors="coerce").fillna(0).to_numpy(np.float32),
+        "expiry": pd.to_numeric(frame["expiry"], errors="coerce").fillna(0).to_numpy(np.int64),
+    }
+    dtype = np.dtype([(name, values.dtype.str) for name, values in columns.items()])
+    table = np.empty(len(frame), dtype=dtype)
+    for name, values in columns.items():
+        table[name] = values
+
+    # Open addressing at <= 50% load, so probes stay short
+    size = 1 << max(4, int(2 * len(table) - 1).bit_length())
+    slots = np.full(size, -1, dtype="<i4")
+    for i, pos in enumerate((_fnv1a_many(table["ticker"]) & (size - 1)).tolist()):
+        while slots[pos] >= 0:
+            pos = (pos + 1) & (size - 1)
+        slots[pos] = i
+
+    header = {"version": FORMAT_VERSION, "count": len(table), "slots": size,
+              "dtype": [[name, dtype.fields[name][0].str] for name in dtype.names],
+              "sectors": sector_names, "sources": list(sources), "built": time.time()}
+    header["table_offset"] = _align(len(MAGIC) + 4 + len(json.dumps(header)) + 64)
+    header["slots_offset"] = _align(header["table_offset"] + table.nbytes)
+    text = json.dumps(header).encode()
+
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(MAGIC + len(text).to_bytes(4, "little") + text)
+            f.write(b"\0" * (header["table_offset"] - f.tell()))
+            f.write(table.tobytes())
+            f.write(b"\0" * (header["slots_offset"] - f.tell()))
+            f.write(slots.tobytes())
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def load_symbol_master(path: str = SYMBOL_MASTER_PATH, sources: Sequence[str] = SYMBOL_MASTER_SOURCES,
+                       max_age: float = SYMBOL_MASTER_MAX_AGE) -> SymbolMaster:
+    """
+    Open the compiled master at path, recompiling it first when missing or stale
+
+    When the sources can't be read, an existing file is kept; with none, the
+    master is compiled from the config literals so lookups still work.
+    """
+    fresh = os.path.exists(path) and time.time() - os.path.getmtime(path) < max_age
+    if not fresh:
+        try:
+            compile_symbol_master([read_instruments(s) for s in sources] + [config_instruments()],
+                                  path, sources)
+        except Exception as e:
+            logger.warning("Symbol master sources unavailable (%s)", e)
+            if not os.path.exists(path):
+                compile_symbol_master([config_instruments()], path)
+    return SymbolMaster(path)
+
+
+_shared_master: Optional[SymbolMaster] = None
+_shared_lock = threading.Lock()
+
+
+def get_symbol_master() -> SymbolMaster:
+    """The process-wide symbol master, opened (and compiled if needed) on first use"""
+    global _shared_master
+    with _shared_lock:
+        if _shared_master is None:
+            _shared_master = load_symbol_master()
+        return _shared_master
@@ -0,0 +1,122 @@
+"""
+Symbol Search Module
+Prebuilt exact -> prefix -> substring search index over a symbol list
+"""
+
+import threading
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Dict, Hashable, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from config import STOCK_UNIVERSE
+
+# Substring queries are answered from posting lists of every 1..GRAM_SIZE-character slice
+GRAM_SIZE = 3
+
+
+class SymbolIndex:
+    """
+    Search index over a fixed symbol list, built once and read-only after
+
+    - symbols: deduplicated, upper-cased and sorted, so a prefix is one
+      contiguous run found with two bisects
+    - _grams: n-gram -> ascending symbol positions, for every 1..GRAM_SIZE
+      character slice; a longer query intersects its GRAM_SIZE-grams and
+      verifies the few candidates left
+    - _rank: position of each symbol in (length, name) order; within the
+      prefix and substring tiers shorter symbols rank first
+    """
+
+    def __init__(self, symbols: Iterable[str]):
+        self.symbols: List[str] = sorted({s.upper().strip() for s in symbols if s and s.strip()})
+        order = sorted(range(len(self.symbols)), key=lambda i: (len(self.symbols[i]), self.symbols[i]))
+        self._rank = np.empty(len(self.symbols), dtype=np.int32)
+        self._rank[order] = np.arange(len(self.symbols), dtype=np.int32)
+
+        grams = defaultdict(list)
+        for i, symbol in enumerate(self.symbols):
+            seen = {symbol[j:j + n] for n in range(1, GRAM_SIZE + 1) for j in range(len(symbol) - n + 1)}
+            for gram in seen:
+                grams[gram].append(i)
+        self._grams: Dict[str, np.ndarray] = {g: np.array(ids, dtype=np.int32) for g, ids in grams.items()}
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    def search(self, term: str, limit: int = 10) -> List[str]:
+        """Up to limit symbols: the exact match, then prefix matches, then other substring matches"""
+        query = (term or "").upper().strip()
+        if not query or limit <= 0:
+            return []
+
+        # Prefix run [lo, hi); the exact match, if any, sorts first in it
+        lo = bisect_left(self.symbols, query)
+        hi = bisect_left(self.symbols, query + "￿", lo)
+        results = []
+        start = lo
+        if lo < hi and self.symbols[lo] == query:
+            results.append(query)
+            start += 1
+        results += self._best(np.arange(start, hi, dtype=np.int32), limit - len(results))
+        if len(results) >= limit:
+            return results
+
+        candidates = self._contains(query)
+        # Prefix matches are a contiguous run of positions; drop them from the substring tier
+        candidates = candidates[(candidates < lo) | (candidates >= hi)]
+        return results + self._best(candidates, limit - len(results))
+
+    def _contains(self, query: str) -> np.ndarray:
+        """Positions of symbols containing query, ascending"""
+        if len(query) <= GRAM_SIZE:
+            return self._grams.get(query, np.empty(0, dtype=np.int32))
+
+        postings = []
+        for j in range(len(query) - GRAM_SIZE + 1):
+            ids = self._grams.get(query[j:j + GRAM_SIZE])
+            if ids is None:
+                return np.empty(0, dtype=np.int32)
+            postings.append(ids)
+        postings.sort(key=len)
+        candidates = postings[0]
+        for ids in postings[1:]:
+            candidates = np.intersect1d(candidates, ids, assume_unique=True)
+            if not len(candidates):
+                return candidates
+        # Every gram present doesn't mean they're adjacent; confirm on the few left
+        return np.array([i for i in candidates.tolist() if query in self.symbols[i]], dtype=np.int32)
+
+    def _best(self, positions: np.ndarray, count: int) -> List[str]:
+        """The count best-ranked symbols at positions"""
+        if count <= 0 or not len(positions):
+            return []
+        ranks = self._rank[positions]
+        if len(positions) > count:
+            top = np.argpartition(ranks, count - 1)[:count]
+            positions, ranks = positions[top], ranks[top]
+        return [self.symbols[i] for i in positions[np.argsort(ranks)].tolist()]
+
+
+_UNIVERSE = list(STOCK_UNIVERSE)
+_indexes: Dict[Hashable, Tuple[List[str], SymbolIndex]] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_symbol_index(symbols: Optional[List[str]] = None, name: Optional[str] = None) -> SymbolIndex:
+    """
+    Process-wide index for a symbol list (default: STOCK_UNIVERSE), built on first use
+
+    Indexes are keyed by name, or by the list object itself when unnamed, so
+    a lookup doesn't touch the symbols: pass the same (cached) list each
+    time. A named index is rebuilt when a different list comes under its name.
+    """
+    if symbols is None:
+        symbols, name = _UNIVERSE, name or "universe"
+    key = name if name is not None else id(symbols)
+    with _indexes_lock:
+        entry = _indexes.get(key)
+        if entry is None or entry[0] is not symbols:
+            entry = _indexes[key] = (symbols, SymbolIndex(symbols))
+        return entry[1]
@@ -0,0 +1,379 @@
+"""
+Tick Feed Module
+Streaming market data: pluggable tick feeds (Fyers data socket or a local
+stand-in server) feeding an in-memory last-price table
+"""
+
+import json
+import logging
+import random
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, Iterable, List, Optional
+
+from config import TICK_FEED, TICK_FEED_URL, TICK_RECONNECT_MIN, TICK_RECONNECT_MAX
+from fyers_client import FyersClient
+
+logger = logging.getLogger(__name__)
+
+
+class Tick:
+    """One price update; exch_ts / recv_ts are epoch seconds"""
+
+    __slots__ = ("symbol", "ltp", "prev_close", "volume", "exch_ts", "recv_ts")
+
+    def __init__(self, symbol: str, ltp: float, prev_close: Optional[float], volume: Optional[float],
+                 exch_ts: Optional[float], recv_ts: float):
+        self.symbol = symbol
+        self.ltp = ltp
+        self.prev_close = prev_close
+        self.volume = volume
+        self.exch_ts = exch_ts
+        self.recv_ts = recv_ts
+
+    @classmethod
+    def from_message(cls, message: Dict, recv_ts: Optional[float] = None) -> Optional["Tick"]:
+        """Parse a Fyers data-socket style message; None for non-price messages"""
+        symbol = message.get("symbol")
+        ltp = message.get("ltp")
+        if not symbol or ltp is None:
+            return None
+        exch_ts = message.get("exch_feed_time") or message.get("last_traded_time")
+        return cls(symbol, float(ltp), message.get("prev_close_price"), message.get("vol_traded_today"),
+                   float(exch_ts) if exch_ts else None, recv_ts or time.time())
+
+
+class _Latency:
+    __slots__ = ("count", "last", "ewma", "max")
+
+    def __init__(self):
+        self.count = 0
+        self.last = 0.0
+        self.ewma = 0.0
+        self.max = 0.0
+
+
+class LastPriceTable:
+    """
+    Latest streamed price per symbol plus tick latency statistics
+
+    Entries are stored in the fetch_quotes item shape ({"n": symbol, "v": {...}})
+    and replaced, never mutated, so readers can use them without locking.
+    Latency is receive time minus exchange feed time, in milliseconds.
+    """
+
+    def __init__(self, ewma_alpha: float = 0.1):
+        self.ewma_alpha = ewma_alpha
+        self._quotes: Dict[str, Dict] = {}
+        self._latency: Dict[str, _Latency] = {}
+        self._lock = threading.Lock()
+        self.tick_count = 0
+        self.last_tick_at: Optional[float] = None
+
+    def update(self, tick: Tick):
+        with self._lock:
+            prev = self._quotes.get(tick.symbol)
+            old = prev["v"] if prev else {}
+            prev_close = tick.prev_close if tick.prev_close is not None else old.get("prev_close_price", tick.ltp)
+            ch = tick.ltp - prev_close
+            self._quotes[tick.symbol] = {"n": tick.symbol, "v": {
+                "lp": tick.ltp,
+                "prev_close_price": prev_close,
+                "ch": round(ch, 4),
+                "chp": round(ch / prev_close * 100, 4) if prev_close else 0.0,
+                "volume": tick.volume if tick.volume is not None else old.get("volume", 0),
+                "tt": tick.exch_ts,
+            }}
+            self.tick_count += 1
+            self.last_tick_at = tick.recv_ts
+            if tick.exch_ts:
+                ms = max(0.0, (tick.recv_ts - tick.exch_ts) * 1000.0)
+                stats = self._latency.get(tick.symbol)
+                if stats is None:
+                    stats = self._latency[tick.symbol] = _Latency()
+                    stats.ewma = ms
+                stats.count += 1
+                stats.last = ms
+                stats.ewma += self.ewma_alpha * (ms - stats.ewma)
+                stats.max = max(stats.max, ms)
+
+    def get(self, symbol: str) -> Optional[Dict]:
+        return self._quotes.get(symbol)
+
+    def quotes_response(self, symbols: List[str]) -> Dict:
+        """Streamed quotes for symbols in the fetch_quotes response shape"""
+        quotes = self._quotes
+        return {"s": "ok", "d": [quotes[s] for s in symbols if s in quotes]}
+
+    def prices(self, symbols: Iterable[str]) -> Dict[str, float]:
+        """{symbol: last price} for symbols that have streamed at least once"""
+        quotes = self._quotes
+        return {s: quotes[s]["v"]["lp"] for s in symbols if s in quotes}
+
+    def latency_stats(self) -> Dict[str, Dict[str, float]]:
+        """{symbol: {count, last_ms, ewma_ms, max_ms}}"""
+        with self._lock:
+            return {s: {"count": l.count, "last_ms": l.last, "ewma_ms": l.ewma, "max_ms": l.max}
+                    for s, l in self._latency.items()}
+
+
+class TickFeed(ABC):
+    """
+    Base class for streaming feeds
+
+    Subclasses implement _run_connection(), which connects, calls
+    _on_connected() once the socket is up, pushes parsed ticks to _emit()
+    and returns (or raises) when the connection drops, plus _send_subscribe()
+    / _send_unsubscribe() for a live connection. The base class owns the
+    subscription set, reconnects with jittered exponential backoff and
+    resubscribes everything after every reconnect.
+    """
+
+    def __init__(self, on_tick: Callable[[Tick], None]):
+        self.on_tick = on_tick
+        self._symbols: Dict[str, None] = {}
+        self._lock = threading.Lock()
+        self._connected = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.reconnects = 0
+
+    @property
+    def connected(self) -> bool:
+        return self._connected.is_set()
+
+    def subscribe(self, symbols: List[str]):
+        with self._lock:
+            new = [s for s in symbols if s not in self._symbols]
+            self._symbols.update(dict.fromkeys(new))
+        if new and self.connected:
+            self._send_subscribe(new)
+
+    def unsubscribe(self, symbols: List[str]):
+        with self._lock:
+            gone = [s for s in symbols if s in self._symbols]
+            for s in gone:
+                del self._symbols[s]
+        if gone and self.connected:
+            self._send_unsubscribe(gone)
+
+    def subscriptions(self) -> List[str]:
+        with self._lock:
+            return list(self._symbols)
+
+    def _on_connected(self):
+        self._connected.set()
+        symbols = self.subscriptions()
+        if symbols:
+            self._send_subscribe(symbols)
+
+    def _emit(self, tick: Optional[Tick]):
+        if tick is not None:
+            self.on_tick(tick)
+
+    @abstractmethod
+    def _run_connection(self):
+        """Connect and stream ticks until the connection drops"""
+
+    @abstractmethod
+    def _send_subscribe(self, symbols: List[str]):
+        """Subscribe symbols on the live connection"""
+
+    @abstractmethod
+    def _send_unsubscribe(self, symbols: List[str]):
+        """Unsubscribe symbols on the live connection"""
+
+    def _close_connection(self):
+        """Ask a running _run_connection() to return"""
+
+    def run_forever(self):
+        """Connect and stay connected until stop() is called"""
+        delay = TICK_RECONNECT_MIN
+        while not self._stop.is_set():
+            started = time.monotonic()
+            try:
+                self._run_connection()
+            except Exception as e:
+                logger.warning("Tick feed connection failed: %s", e)
+            was_up = self._connected.is_set()
+            self._connected.clear()
+            if self._stop.is_set():
+                break
+            # A connection that stayed up for a while resets the backoff
+            if was_up and time.monotonic() - started > TICK_RECONNECT_MAX:
+                delay = TICK_RECONNECT_MIN
+            self.reconnects += 1
+            self._stop.wait(delay * random.uniform(0.5, 1.0))
+            delay = min(delay * 2, TICK_RECONNECT_MAX)
+
+    def start(self):
+        """Run the feed on a daemon thread"""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self.run_forever, name="tick-feed", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._close_connection()
+        if self._thread is not None:
+            self._thread.join()
+
+
+class WebSocketTickFeed(TickFeed):
+    """
+    JSON-over-WebSocket feed, used for the local stand-in / replay server
+
+    Sends {"type": "subscribe" | "unsubscribe", "symbols": [...]} and expects
+    one JSON object (or a list of them) per message with the Fyers data-socket
+    field names: symbol, ltp, prev_close_price, vol_traded_today, exch_feed_time.
+    """
+
+    def __init__(self, url: str, on_tick: Callable[[Tick], None]):
+        super().__init__(on_tick)
+        self.url = url
+        self._app = None
+
+    def _run_connection(self):
+        import websocket
+        self._app = websocket.WebSocketApp(
+            self.url,
+            on_open=lambda ws: self._on_connected(),
+            on_message=lambda ws, msg: self._on_message(msg),
+            on_error=lambda ws, err: logger.warning("Tick feed error: %s", err),
+        )
+        self._app.run_forever(ping_interval=20, ping_timeout=10)
+
+    def _on_message(self, raw: str):
+        recv_ts = time.time()
+        payload = json.loads(raw)
+        for message in payload if isinstance(payload, list) else [payload]:
+            self._emit(Tick.from_message(message, recv_ts))
+
+    def _send(self, kind: str, symbols: List[str]):
+        try:
+            self._app.send(json.dumps({"type": kind, "symbols": symbols}))
+        except Exception as e:
+            logger.warning("Tick feed %s failed: %s", kind, e)
+
+    def _send_subscribe(self, symbols: List[str]):
+        self._send("subscribe", symbols)
+
+    def _send_unsubscribe(self, symbols: List[str]):
+        self._send("unsubscribe", symbols)
+
+    def _close_connection(self):
+        if self._app is not None:
+            self._app.close()
+
+
+class FyersTickFeed(TickFeed):
+    """
+    Adapter for the Fyers data socket (fyers_apiv3 FyersDataSocket)
+
+    The SDK's own reconnect is disabled and forgets subscriptions, so the
+    base class loop reconnects and resubscribes instead.
+    """
+
+    def __init__(self, client_id: str, access_token: str, on_tick: Callable[[Tick], None],
+                 log_path: str = ""):
+        super().__init__(on_tick)
+        self.client_id = client_id
+        self.access_token = access_token
+        self.log_path = log_path
+        self._socket = None
+        self._closed = threading.Event()
+
+    def _run_connection(self):
+        from fyers_apiv3.FyersWebsocket import data_ws
+        self._closed.clear()
+        self._socket = data_ws.FyersDataSocket(
+            access_token=f"{self.client_id}:{self.access_token}",
+            log_path=self.log_path,
+            litemode=False,
+            write_to_file=True,
+            reconnect=False,
+            on_connect=self._on_connected,
+            on_message=lambda message: self._emit(Tick.from_message(message)),
+            on_error=lambda message: logger.warning("Fyers data socket error: %s", message),
+            on_close=lambda message: self._closed.set(),
+        )
+        try:
+            self._socket.connect()
+            while not self._closed.wait(1.0):
+                if self._stop.is_set() or not self._socket.is_connected():
+                    break
+        finally:
+            try:
+                self._socket.close_connection()
+            except Exception:
+                pass
+
+    def _send_subscribe(self, symbols: List[str]):
+        self._socket.subscribe(symbols=symbols, data_type="SymbolUpdate")
+
+    def _send_unsubscribe(self, symbols: List[str]):
+        self._socket.unsubscribe(symbols=symbols, data_type="SymbolUpdate")
+
+    def _close_connection(self):
+        self._closed.set()
+
+
+class MarketStream:
+    """A running tick feed and the last-price table it updates"""
+
+    def __init__(self, feed_factory: Callable[[Callable[[Tick], None]], TickFeed]):
+        self.table = LastPriceTable()
+        self.feed = feed_factory(self.table.update)
+
+    @property
+    def live(self) -> bool:
+        return self.feed.connected
+
+    def start(self):
+        self.feed.start()
+
+    def stop(self):
+        self.feed.stop()
+
+    def quotes(self, symbols: List[str]) -> Optional[Dict]:
+        """
+        Streamed quotes in the fetch_quotes shape, subscribing as needed
+
+        Returns None unless the feed is connected and every symbol has ticked,
+        so callers can fall back to polled quotes.
+        """
+        self.feed.subscribe(symbols)
+        if not self.live:
+            return None
+        resp = self.table.quotes_response(symbols)
+        return resp if len(resp["d"]) == len(symbols) else None
+
+
+_streams: Dict[int, MarketStream] = {}
+_streams_lock = threading.Lock()
+
+
+def get_market_stream(client: FyersClient) -> Optional[MarketStream]:
+    """The process-wide stream for a shared client per TICK_FEED; None when streaming is off"""
+    if not TICK_FEED:
+        return None
+    with _streams_lock:
+        stream = _streams.get(id(client))
+        if stream is None:
+            if TICK_FEED == "local":
+                stream = MarketStream(lambda on_tick: WebSocketTickFeed(TICK_FEED_URL, on_tick))
+            else:
+                stream = MarketStream(lambda on_tick: FyersTickFeed(client.client_id, client.access_token, on_tick))
+            _streams[id(client)] = stream
+            stream.start()
+        return stream
+
+
+def live_quotes(client: Optional[FyersClient], symbols: List[str]) -> Optional[Dict]:
+    """Streamed quotes for symbols, or None when they must be polled instead"""
+    if client is None:
+        return None
+    stream = get_market_stream(client)
+    return stream.quotes(symbols) if stream is not None else None
@@ -4,10 +4,13 @@ Contains reusable Streamlit UI components and styling functions
 """
 
 import streamlit as st
+import numpy as np
 import pandas as pd
+import time
 import uuid
-from typing import Optional
-from config import FYERS_CLIENT_ID, FYERS_CLIENT_SECRET, FYERS_REDIRECT_URI
+from typing import Callable, Dict, Optional
+from config import (FYERS_CLIENT_ID, FYERS_CLIENT_SECRET, FYERS_REDIRECT_URI, SIDEBAR_FUNDS_TTL,
+                    STYLED_TABLE_MAX_ROWS)
 from fyers_client import FyersClient
 
 
@@ -59,6 +62,7 @@ def render_sidebar_auth():
                 if st.button("Disconnect", use_container_width=True):
                     st.session_state.pop("fyers_access_token", None)
                     st.session_state.pop("fyers_client_id", None)
+                    st.session_state.pop("sidebar_funds", None)
                     st.rerun()
             else:
                 st.warning("⚠️ Disconnected")
@@ -73,16 +77,22 @@ def render_sidebar_balance(client: Optional[FyersClient]):
         st.markdown("---")
         st.markdown("## 💰 Account Balance")
         
-        funds_data = client.fetch_funds()
+        # Funds are kept per session, so reruns from other widgets don't refetch them
+        cached = st.session_state.get("sidebar_funds")
+        if cached is None or time.time() - cached[0] >= SIDEBAR_FUNDS_TTL:
+            cached = (time.time(), client.fetch_funds())
+            st.session_state["sidebar_funds"] = cached
+        funds_data = cached[1]
         
         if funds_data and funds_data.get("s") == "ok":
             fund_limit = funds_data.get("fund_limit", [{}])[0]
             st.metric("💵 Total", f"₹{fund_limit.get('equityAmount', 0):,.2f}")
             st.metric("✅ Available", f"₹{fund_limit.get('availablecash', 0):,.2f}")
             st.metric("📊 Used", f"₹{fund_limit.get('utilized_amount', 0):,.2f}")
-            
-            if st.button("🔄 Refresh", use_container_width=True):
-                st.rerun()
+        
+        # Clearing the cache in the callback makes the rerun fetch fresh funds
+        st.button("🔄 Refresh", use_container_width=True,
+                  on_click=lambda: st.session_state.pop("sidebar_funds", None))
 
 
 def render_live_indicator(text: str = "LIVE"):
@@ -94,6 +104,14 @@ def render_live_indicator(text: str = "LIVE"):
     )
 
 
+def render_snapshot_age(snapshot):
+    """Render shared market snapshot version and age"""
+    if snapshot.version == 0:
+        st.caption("📡 Market snapshot loading...")
+    else:
+        st.caption(f"📡 Market snapshot v{snapshot.version} · updated {snapshot.age:.0f}s ago")
+
+
 def render_pnl_card(amount: float, title: str = "Total Profit/Loss"):
     """Render P&L card with styling"""
     pnl_class = "pnl-positive" if amount >= 0 else "pnl-negative"
@@ -118,22 +136,90 @@ def render_styled_metric(label: str, value: float, color: str):
     """, unsafe_allow_html=True)
 
 
+# Cell CSS shared by every table
+POSITIVE_CSS = 'color: #00cc96; font-weight: bold'
+NEGATIVE_CSS = 'color: #ef553b; font-weight: bold'
+NEUTRAL_CSS = 'color: white'
+
+StyleRule = Callable[[np.ndarray], np.ndarray]
+
+# Marker shown in place of a cell color on tables sent without a Styler
+CSS_MARKERS = {POSITIVE_CSS: '🟢', NEGATIVE_CSS: '🔴'}
+
+
+def sign_rule(positive: str = POSITIVE_CSS, negative: str = NEGATIVE_CSS, zero: str = '') -> StyleRule:
+    """Rule coloring a column by sign (booleans count as 1/0, non-numbers get no style)"""
+    def rule(values: np.ndarray) -> np.ndarray:
+        v = pd.to_numeric(pd.Series(values), errors='coerce').to_numpy(dtype=float)
+        return np.select([v > 0, v < 0, v == v], [positive, negative, zero], '')
+    return rule
+
+
+def flag_rule(css: str) -> StyleRule:
+    """Rule styling the truthy cells of a column"""
+    return lambda values: np.where(values.astype(bool), css, '')
+
+
+def constant_rule(css: str) -> StyleRule:
+    """Rule giving every cell of a column the same style"""
+    return lambda values: np.full(len(values), css, dtype=object)
+
+
+def table_css(df: pd.DataFrame, rules: Dict[str, StyleRule]) -> pd.DataFrame:
+    """CSS for every cell of df, one vectorized rule call per styled column"""
+    css = pd.DataFrame('', index=df.index, columns=df.columns)
+    for col, rule in rules.items():
+        css[col] = rule(df[col].to_numpy())
+    return css
+
+
+def style_table(df: pd.DataFrame, rules: Dict[str, StyleRule]):
+    """Styler applying table_css in one call instead of a callback per cell"""
+    css = table_css(df, rules)
+    return df.style.apply(lambda _: css, axis=None)
+
+
+def marked_table(df: pd.DataFrame, rules: Dict[str, StyleRule]) -> pd.DataFrame:
+    """
+    df with each styled cell prefixed by its color's marker (CSS_MARKERS)
+    
+    The markers come from the same rule masks as table_css; styled columns
+    become text, floats shown signed with two decimals and flags as ✓.
+    """
+    marked = df.copy()
+    for col, rule in rules.items():
+        values = df[col]
+        if pd.api.types.is_bool_dtype(values):
+            text = values.map({True: '✓', False: ''})
+        elif pd.api.types.is_float_dtype(values):
+            text = values.map('{:+.2f}'.format)
+        else:
+            text = values.astype(str)
+        marker = pd.Series(rule(values.to_numpy()), index=df.index).map(CSS_MARKERS)
+        marked[col] = (marker + ' ').fillna('') + text
+    return marked
+
+
+def render_styled_table(df: pd.DataFrame, rules: Dict[str, StyleRule], height: int = 400,
+                        max_rows: int = STYLED_TABLE_MAX_ROWS):
+    """
+    Render df with rules as cell colors
+    
+    Styler serialization costs per cell, so tables longer than max_rows are
+    sent as plain data instead, with the colors shown as cell markers.
+    """
+    if len(df) <= max_rows:
+        st.dataframe(style_table(df, rules), use_container_width=True, height=height)
+        return
+    
+    st.dataframe(marked_table(df, rules), use_container_width=True, height=height)
+
+
 def render_dataframe_with_colors(df: pd.DataFrame, color_columns: list, 
                                  height: int = 400) -> None:
     """Render dataframe with colored columns"""
-    def color_cell(val):
-        try:
-            v = float(val)
-            if v > 0:
-                return 'color: #00cc96; font-weight: bold'
-            elif v < 0:
-                return 'color: #ef553b; font-weight: bold'
-            return 'color: white'
-        except:
-            return 'color: white'
-    
-    styled = df.style.applymap(color_cell, subset=color_columns)
-    st.dataframe(styled, use_container_width=True, height=height)
+    rule = sign_rule(zero=NEUTRAL_CSS)
+    render_styled_table(df, {col: rule for col in color_columns}, height=height)
 
 
 def render_navigation():
@@ -177,8 +263,8 @@ def render_search_suggestions(search_term: str, symbol_list: list,
     if suggestions:
         st.markdown("**💡 Suggestions:**")
         
-        # Exact match stars
-        exact_match = [s for s in symbol_list if s == search_term.upper().strip()]
+        # Exact match stars (always ranked first)
+        exact_match = suggestions[:1] if suggestions[0] == search_term.upper().strip() else []
         
         # Display in rows of 5
         for i in range(0, len(suggestions), 5):
@@ -0,0 +1,302 @@
+"""
+Universe Scan Module
+Bull/bear scan over the whole F&O universe, with candle indicators and
+option confirmation sharded across a process pool
+"""
+
+import logging
+import math
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from config import (HISTORY_FETCH_TIMEOUT, QUOTES_BATCH_SIZE, SCAN_HISTORY_DAYS,
+                    UNIVERSE_SCAN_SHARDS_PER_WORKER, UNIVERSE_SCAN_STRIKE_COUNT, UNIVERSE_SCAN_WORKERS)
+from data_processor import (check_resistance_weakening, check_support_weakening, classify_frame_advanced,
+                            fetch_history_batch, fetch_option_chain_batch, frame_from_quotes)
+from fyers_client import FyersClient
+from indicators import IndicatorEngine
+from resampler import TimeframeCache
+from screener import screen_tags
+from symbol_master import SymbolMaster, get_symbol_master
+
+logger = logging.getLogger(__name__)
+
+
+def universe_symbols(master: Optional[SymbolMaster] = None) -> List[str]:
+    """Equity tickers with futures listed; every equity when the master has no F&O segment"""
+    master = master or get_symbol_master()
+    return master.fo_underlyings() or master.tickers("EQ")
+
+
+def _pool_context() -> multiprocessing.context.BaseContext:
+    """
+    Start method for the worker pool
+
+    Forking the multi-threaded dashboard process isn't safe, so workers are
+    forked from a forkserver (spawned where there is none) that has already
+    imported this module and the entry script. Workers import the entry
+    script as __mp_main__ -- under Streamlit that is the dashboard script --
+    so it must keep its work behind `if __name__ == "__main__"`.
+    """
+    if "forkserver" not in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("spawn")
+    context = multiprocessing.get_context("forkserver")
+    context.set_forkserver_preload(["__main__", __name__])
+    return context
+
+
+# Worker process state, set once per process by _init_worker
+_worker_master: Optional[SymbolMaster] = None
+
+
+def _init_worker(master_path: str):
+    global _worker_master
+    _worker_master = SymbolMaster(master_path)
+
+
+def scan_shard(quotes: List[Dict], candles: Dict[str, np.ndarray]) -> Tuple[pd.DataFrame, float, int]:
+    """
+    Scan frame for one shard: indicators, previous day/week bars and breakout tags
+
+    Runs in a worker process on a fresh engine and cache, so nothing is
+    shared between shards. Returns (frame, seconds, worker pid).
+    """
+    start = time.perf_counter()
+    engine, timeframes = IndicatorEngine(), TimeframeCache()
+    for symbol, symbol_candles in candles.items():
+        engine.update(symbol, symbol_candles)
+        timeframes.update(symbol, symbol_candles)
+    df = frame_from_quotes(quotes, engine, timeframes, _worker_master)
+    if not df.empty:
+        df["daily_tag"] = classify_frame_advanced(df)
+        df = df.join(screen_tags(df))
+    return df, time.perf_counter() - start, os.getpid()
+
+
+def confirm_shard(rows: pd.DataFrame, chains: Dict[str, Dict]) -> Tuple[pd.Series, float, int]:
+    """
+    Option-confirmed tags for breakout candidates, each against its own chain
+
+    Candidates without a chain keep their price/volume/OI tag, as in
+    classify_row_advanced. Returns (tags, seconds, worker pid).
+    """
+    start = time.perf_counter()
+    tags = []
+    for _, row in rows.iterrows():
+        chain = chains.get(row["ticker"])
+        check = check_resistance_weakening if row["daily_tag"] == "bull" else check_support_weakening
+        tags.append(row["daily_tag"] if not chain or check(row, chain) else None)
+    return pd.Series(tags, index=rows.index, dtype=object), time.perf_counter() - start, os.getpid()
+
+
+class ShardTiming:
+    """How long one shard's CPU work took, and in which worker"""
+
+    def __init__(self, stage: str, shard: int, symbols: int, seconds: float, pid: int):
+        self.stage = stage
+        self.shard = shard
+        self.symbols = symbols
+        self.seconds = seconds
+        self.pid = pid
+
+    def to_dict(self) -> dict:
+        return {"Stage": self.stage, "Shard": self.shard, "Symbols": self.symbols,
+                "Seconds": round(self.seconds, 3), "Worker": self.pid}
+
+
+class UniverseScanResult:
+    """Merged scan frame of one universe scan plus its per-shard timings"""
+
+    def __init__(self, df: pd.DataFrame, timings: List[ShardTiming], created_at: float,
+                 duration: float, errors: Dict[str, str]):
+        self.df = df
+        self.timings = timings
+        self.created_at = created_at
+        self.duration = duration
+        self.errors = errors
+
+    @property
+    def age(self) -> float:
+        """Seconds since the scan started"""
+        return time.time() - self.created_at
+
+    @property
+    def cpu_seconds(self) -> float:
+        """Worker time summed over all shards"""
+        return sum(t.seconds for t in self.timings)
+
+    def timings_df(self) -> pd.DataFrame:
+        return pd.DataFrame([t.to_dict() for t in self.timings])
+
+
+class UniverseScanner:
+    """
+    Scans a symbol universe with the CPU work in a process pool
+
+    API calls stay in the calling process, where the client's rate limiter
+    and candle store live. The universe is split into shards; while workers
+    compute indicators for one shard the next shard's quotes and candles are
+    fetched. Breakout candidates are then option-confirmed in the pool as
+    well, against a chain fetched only for them. start() runs a scan on a
+    background thread so the dashboard keeps rendering meanwhile.
+    """
+
+    def __init__(self, client: FyersClient, workers: Optional[int] = UNIVERSE_SCAN_WORKERS,
+                 shards_per_worker: int = UNIVERSE_SCAN_SHARDS_PER_WORKER,
+                 strike_count: int = UNIVERSE_SCAN_STRIKE_COUNT):
+        self.client = client
+        self.workers = workers or os.cpu_count() or 1
+        self.shards_per_worker = shards_per_worker
+        self.strike_count = strike_count
+        self.result: Optional[UniverseScanResult] = None
+        self.error: Optional[str] = None
+        self.progress: Tuple[int, int, int] = (0, 0, 0)  # (shards fetched, shards scanned, shards total)
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def _executor(self, master: SymbolMaster) -> ProcessPoolExecutor:
+        """The scanner's worker pool, started on first use"""
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(self.workers, mp_context=_pool_context(),
+                                                 initializer=_init_worker, initargs=(master.path,))
+            return self._pool
+
+    def _fetch(self, symbols: List[str], date_from: str, date_to: str,
+               errors: Dict[str, str]) -> Tuple[List[Dict], Dict[str, np.ndarray]]:
+        """Quotes and 5-minute candles for one shard; symbols without candles are left out and listed in errors"""
+        quotes = []
+        for i in range(0, len(symbols), QUOTES_BATCH_SIZE):
+            resp = self.client.fetch_quotes(symbols[i:i + QUOTES_BATCH_SIZE])
+            if resp.get("s") == "ok":
+                quotes += resp.get("d", [])
+            else:
+                errors["quotes"] = resp.get("message", "Unknown error")
+        # Past the per-minute limit, history requests queue in the scheduler for up to a window or more
+        timeout = HISTORY_FETCH_TIMEOUT + self.client.scheduler.expected_wait("history", len(quotes))
+        history = fetch_history_batch(self.client, [q.get("n") for q in quotes], "5", date_from, date_to,
+                                      timeout=timeout)
+        candles = {}
+        for symbol, resp in history.items():
+            if resp.get("s") != "ok":
+                errors[symbol] = resp.get("message", "Unknown error")
+            elif not len(resp.get("candles", ())):
+                errors[symbol] = "no candles"
+            else:
+                candles[symbol] = resp["candles"]
+        # Without candles the volume average and weekly range would be placeholders; leave those out
+        return [q for q in quotes if q.get("n") in candles], candles
+
+    def scan(self, symbols: Optional[List[str]] = None, confirm_options: bool = True) -> UniverseScanResult:
+        """Run one universe scan (default: universe_symbols()) and return the merged result"""
+        start = time.time()
+        master = get_symbol_master()
+        symbols = list(dict.fromkeys(symbols or universe_symbols(master)))
+        errors, timings = {}, []
+        end_date = datetime.now()
+        date_from = str(int((end_date - timedelta(days=SCAN_HISTORY_DAYS)).timestamp()))
+        date_to = str(int(end_date.timestamp()))
+
+        size = max(1, math.ceil(len(symbols) / (self.workers * self.shards_per_worker)))
+        shards = [symbols[i:i + size] for i in range(0, len(symbols), size)]
+        self.progress = (0, 0, len(shards))
+        pool = self._executor(master)
+        try:
+            # Each shard is submitted as soon as its data is in, overlapping fetches with compute
+            futures = []
+            for shard in shards:
+                futures.append(pool.submit(scan_shard, *self._fetch(shard, date_from, date_to, errors)))
+                self.progress = (len(futures), 0, len(shards))
+            frames = []
+            for k, (future, shard) in enumerate(zip(futures, shards)):
+                df, seconds, pid = future.result()
+                if not df.empty:
+                    frames.append(df)
+                timings.append(ShardTiming("indicators", k, len(shard), seconds, pid))
+                self.progress = (len(shards), k + 1, len(shards))
+            df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+            if confirm_options and not df.empty:
+                self._confirm(pool, df, errors, timings)
+        except BrokenProcessPool:
+            with self._pool_lock:
+                self._pool = None  # A worker died; start a fresh pool next scan
+            raise
+        return UniverseScanResult(df, timings, start, time.time() - start, errors)
+
+    def _confirm(self, pool: ProcessPoolExecutor, df: pd.DataFrame, errors: Dict[str, str],
+                 timings: List[ShardTiming]):
+        """Option-confirm the tagged rows of df in place"""
+        candidates = df[df["daily_tag"].notna()]
+        if candidates.empty:
+            return
+        keys = [(ticker, "", self.strike_count) for ticker in candidates["ticker"]]  # "" = nearest expiry
+        chains = {}
+        for key, resp in fetch_option_chain_batch(self.client, keys).items():
+            if resp.get("s") == "ok":
+                chains[key[0]] = resp
+            else:
+                errors[key[0]] = resp.get("message", "Unknown error")
+
+        size = max(1, math.ceil(len(candidates) / self.workers))
+        parts = [candidates.iloc[i:i + size] for i in range(0, len(candidates), size)]
+        futures = [pool.submit(confirm_shard, rows, {t: chains[t] for t in rows["ticker"] if t in chains})
+                   for rows in parts]
+        for k, (future, rows) in enumerate(zip(futures, parts)):
+            tags, seconds, pid = future.result()
+            df.loc[tags.index, "daily_tag"] = tags
+            timings.append(ShardTiming("options", k, len(rows), seconds, pid))
+
+    def start(self, symbols: Optional[List[str]] = None) -> bool:
+        """Run a scan on a background thread; False if one is already running"""
+        if self.running:
+            return False
+        self.error = None
+
+        def run():
+            try:
+                self.result = self.scan(symbols)
+                logger.info("Universe scan: %d rows in %.2fs (%.2fs worker time)", len(self.result.df),
+                            self.result.duration, self.result.cpu_seconds)
+            except Exception as e:
+                logger.exception("Universe scan failed")
+                self.error = str(e)
+
+        self._thread = threading.Thread(target=run, name="universe-scan", daemon=True)
+        self._thread.start()
+        return True
+
+    def shutdown(self):
+        if self._thread is not None:
+            self._thread.join()
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown()
+                self._pool = None
+
+
+_scanners: Dict[int, UniverseScanner] = {}
+_scanners_lock = threading.Lock()
+
+
+def get_universe_scanner(client: FyersClient) -> UniverseScanner:
+    """The process-wide universe scanner for a shared client"""
+    with _scanners_lock:
+        scanner = _scanners.get(id(client))
+        if scanner is None or scanner.client is not client:
+            scanner = _scanners[id(client)] = UniverseScanner(client)
+        return scanner
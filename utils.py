@@ -3,8 +3,12 @@ Utility Functions Module
 Contains helper functions used across the application
 """
 
-from datetime import datetime, timedelta
-from typing import List
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+
+from symbol_search import get_symbol_index
+
+IST = timezone(timedelta(hours=5, minutes=30))
 
 
 def get_expiry_dates(count: int = 4) -> List[str]:
@@ -30,6 +34,11 @@ def get_expiry_dates(count: int = 4) -> List[str]:
     return expiries
 
 
+def expiry_date(expiry: str) -> str:
+    """IST date ("YYYY-MM-DD") of a Fyers expiry timestamp (epoch seconds, as listed in expiryData)"""
+    return datetime.fromtimestamp(int(expiry), IST).strftime("%Y-%m-%d")
+
+
 def format_large_number(num: float) -> str:
     """Format large numbers with commas and 2 decimal places"""
     return f"{num:,.2f}"
@@ -67,29 +76,18 @@ def format_timestamp(format_str: str = '%H:%M:%S') -> str:
     return datetime.now().strftime(format_str)
 
 
-def search_symbols(search_term: str, symbol_list: List[str], max_results: int = 10) -> List[str]:
+def search_symbols(search_term: str, symbol_list: Optional[List[str]] = None, max_results: int = 10) -> List[str]:
     """
     Smart symbol search with exact match priority
     
     Args:
         search_term: Search string
-        symbol_list: List of available symbols
+        symbol_list: List of available symbols (default: STOCK_UNIVERSE); its
+            index is cached per list object, so pass the same list each time
         max_results: Maximum results to return
         
     Returns:
-        Sorted list of matching symbols (exact, starts_with, contains)
+        Ranked list of matching symbols (exact, starts_with, contains), from
+        the process-wide index for symbol_list (built on first use)
     """
-    if not search_term:
-        return []
-    
-    search_upper = search_term.upper().strip()
-    
-    # Find exact match first
-    exact_match = [s for s in symbol_list if s == search_upper]
-    
-    # Find related matches (starts with or contains)
-    starts_with = [s for s in symbol_list if s.startswith(search_upper) and s not in exact_match]
-    contains = [s for s in symbol_list if search_upper in s and s not in exact_match and s not in starts_with]
-    
-    # Combine: exact first, then starts_with, then contains
-    return (exact_match + starts_with + contains)[:max_results]
+    return get_symbol_index(symbol_list).search(search_term, max_results)